@@ -0,0 +1,43 @@
+"""
+Events/sec through one daemon tick, with and without group commit.
+
+    python -m benchmarks.bench_event_throughput --events 50
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from src.database import Database
+from src.pending_events_repo import enqueue_event
+from src.scheduler import run_loop
+from src.scripts_repo import add_script
+
+def bench(events: int, group_commit: bool, max_workers: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        db = Database(db_path)
+        for i in range(events):
+            sid = add_script(db, name=f"s{i}", command="true")
+            enqueue_event(db, trigger_id="manual", script_id=sid, payload={"n": i})
+        db.close()
+
+        started = time.perf_counter()
+        run_loop(db_path=db_path, tick_seconds=0, once=True, max_workers=max_workers, group_commit=group_commit)
+        return time.perf_counter() - started
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=50)
+    ap.add_argument("--max-workers", type=int, default=4)
+    args = ap.parse_args()
+
+    for group_commit in (False, True):
+        elapsed = bench(args.events, group_commit, args.max_workers)
+        label = "group_commit" if group_commit else "per-statement"
+        print(f"{label:<14} {args.events} events in {elapsed:.3f}s ({args.events / elapsed:.1f} events/s)")
+
+if __name__ == "__main__":
+    main()
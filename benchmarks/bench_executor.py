@@ -0,0 +1,35 @@
+"""
+Compare the subprocess and asyncio executors.
+
+    python -m benchmarks.bench_executor --runs 200 --parallel 50
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.executor import EXECUTORS, get_executor
+
+def bench(name: str, command: str, runs: int, parallel: int) -> float:
+    run = get_executor(name)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        results = list(pool.map(lambda _: run(command), range(runs)))
+    elapsed = time.perf_counter() - started
+    assert all(r.exit_code == 0 for r in results)
+    return elapsed
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=200)
+    ap.add_argument("--parallel", type=int, default=50)
+    ap.add_argument("--command", default="seq 1 20000")
+    args = ap.parse_args()
+
+    for name in EXECUTORS:
+        elapsed = bench(name, args.command, args.runs, args.parallel)
+        print(f"{name:<10} {args.runs} runs in {elapsed:.3f}s ({args.runs / elapsed:.1f} runs/s)")
+
+if __name__ == "__main__":
+    main()
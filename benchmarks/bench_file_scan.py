@@ -0,0 +1,61 @@
+"""
+Cost of one file-trigger scan of an unchanged tree, per watcher backend.
+
+    python -m benchmarks.bench_file_scan --files 100000 --per-dir 100
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from src.file_watcher import FileWatcher
+from src.inotify_watcher import InotifyWatcher
+
+def make_tree(root: Path, files: int, per_dir: int) -> None:
+    for i in range(files):
+        d = root / f"d{i // per_dir // per_dir}" / f"d{i // per_dir}"
+        if i % per_dir == 0:
+            d.mkdir(parents=True, exist_ok=True)
+        (d / f"f{i}.txt").write_bytes(b"x")
+    # Settled directories, as in a tree that isn't being written to.
+    for path, _, _ in os.walk(root):
+        os.utime(path, (1, 1))
+
+def backends() -> Dict[str, Callable[[], Any]]:
+    found: Dict[str, Callable[[], Any]] = {
+        "poll-full": lambda: FileWatcher(stat_budget_seconds=None),
+        "poll": FileWatcher,
+    }
+    if InotifyWatcher.create() is not None:
+        found["inotify"] = InotifyWatcher.create
+    return found
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--files", type=int, default=100_000)
+    ap.add_argument("--per-dir", type=int, default=100)
+    ap.add_argument("--scans", type=int, default=5)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_tree(root, args.files, args.per_dir)
+
+        for name, make in backends().items():
+            watcher = make()
+            started = time.perf_counter()
+            watcher.scan(str(root), True)
+            first = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for _ in range(args.scans):
+                watcher.scan(str(root), True)
+            per_scan = (time.perf_counter() - started) / args.scans
+            print(f"{name:<12} first {first * 1000:9.1f} ms   then {per_scan * 1000:9.3f} ms/scan")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+FileWatchSource poll cost with overlapping triggers: one trigger on a
+tree plus more on its subdirectories, scanned per trigger (as before
+scan_roots) against one shared scan.
+
+    python -m benchmarks.bench_file_triggers --files 50000 --triggers 10
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_file_scan import make_tree
+from src.database import Database
+from src.file_triggers_repo import add_file_trigger
+from src.scripts_repo import add_script
+from src.trigger_sources import file_watch
+from src.trigger_sources.file_watch import FileWatchSource
+
+def per_trigger_roots(dirs):
+    return sorted(set(dirs))
+
+def measure(db: Database, polls: int) -> float:
+    source = FileWatchSource("poll")
+    # Check every file every poll so both sides do the same work per scan.
+    source._watcher.stat_budget_seconds = None
+    source.poll(db)
+    started = time.perf_counter()
+    for _ in range(polls):
+        source.poll(db)
+    return (time.perf_counter() - started) / polls
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--files", type=int, default=50_000)
+    ap.add_argument("--per-dir", type=int, default=100)
+    ap.add_argument("--triggers", type=int, default=10)
+    ap.add_argument("--polls", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "tree"
+        make_tree(root, args.files, args.per_dir)
+        db = Database(Path(tmp) / "bench.db")
+        sid = add_script(db, name="bench", command="true")
+        add_file_trigger(db, sid, str(root), recursive=True)
+        subdirs = sorted(p for p in root.iterdir() if p.is_dir())
+        for i in range(args.triggers - 1):
+            add_file_trigger(db, sid, str(subdirs[i % len(subdirs)]), recursive=True)
+
+        shared = measure(db, args.polls)
+        real = file_watch.scan_roots
+        file_watch.scan_roots = per_trigger_roots
+        try:
+            separate = measure(db, args.polls)
+        finally:
+            file_watch.scan_roots = real
+        print(f"per trigger  {separate * 1000:9.1f} ms/poll")
+        print(f"shared tree  {shared * 1000:9.1f} ms/poll")
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+get_script throughput: rows validated into the old pydantic model against
+the slotted Script row type (no config cache, so every call hits SQLite).
+
+    python -m benchmarks.bench_get_script --calls 20000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+from src.database import Database
+from src.scripts_repo import add_script, get_script
+
+class PydanticScript(BaseModel):
+    """
+    models.Script as it was before it became a dataclass.
+    """
+    id: int
+    name: str
+    command: str
+    working_dir: Optional[str] = None
+    created_at: str
+    updated_at: str
+    concurrency_policy: str = "allow"
+    compress_codec: Optional[str] = None
+    compress_level: Optional[int] = None
+    compress_min_bytes: Optional[int] = None
+    capture_head_bytes: Optional[int] = None
+    capture_tail_bytes: Optional[int] = None
+    mode: str = "process"
+    batch_max_events: Optional[int] = None
+    batch_max_wait_ms: Optional[int] = None
+
+def get_script_pydantic(db: Database, script_id: int) -> Optional[PydanticScript]:
+    db.init()
+    rows = db.query("SELECT * FROM scripts WHERE id = ?", (script_id,))
+    if not rows:
+        return None
+    return PydanticScript(**dict(rows[0]))
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=20_000)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(Path(tmp) / "bench.db")
+        script_id = add_script(db, name="bench", command="true")
+
+        for name, fn in (("pydantic", get_script_pydantic), ("dataclass", get_script)):
+            started = time.perf_counter()
+            for _ in range(args.calls):
+                fn(db, script_id)
+            elapsed = time.perf_counter() - started
+            print(f"{name:<10} {args.calls / elapsed:>10.0f} calls/s  {elapsed / args.calls * 1e6:.1f} us/call")
+        db.close()
+
+if __name__ == "__main__":
+    main()
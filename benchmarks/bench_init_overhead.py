@@ -0,0 +1,57 @@
+"""
+Per-event cost of Database.init(): the old behaviour (schema script plus
+column checks on every repo call) against the cached user_version check.
+
+    python -m benchmarks.bench_init_overhead --events 2000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from src.database import SCHEMA, Database, _migrate_v1_baseline
+from src.locks import release, try_acquire
+from src.runs_repo import create_run, finish_run
+from src.scripts_repo import add_script, get_script
+
+class LegacyInitDatabase(Database):
+    """
+    init() as it was before versioned migrations.
+    """
+
+    def init(self) -> None:
+        if self.in_transaction:
+            return
+        conn = self.connect()
+        conn.executescript(SCHEMA)
+        conn.commit()
+        _migrate_v1_baseline(conn)
+        conn.commit()
+
+def one_event(db: Database, script_id: int) -> None:
+    get_script(db, script_id)
+    try_acquire(db, f"script:{script_id}", "bench")
+    run_id = create_run(db, script_id, trigger="bench")
+    finish_run(db, run_id, "success", 0, stdout="ok\n")
+    release(db, f"script:{script_id}", "bench")
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=2000)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, cls in (("legacy init", LegacyInitDatabase), ("cached init", Database)):
+            db = cls(Path(tmp) / f"{cls.__name__}.db")
+            script_id = add_script(db, name="bench", command="true")
+            started = time.perf_counter()
+            for _ in range(args.events):
+                one_event(db, script_id)
+            elapsed = time.perf_counter() - started
+            print(f"{name:<12} {elapsed / args.events * 1000:.3f} ms/event")
+            db.close()
+
+if __name__ == "__main__":
+    main()
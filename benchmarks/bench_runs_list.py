@@ -0,0 +1,50 @@
+"""
+Time `runs list`-style queries against a large run history.
+
+    python -m benchmarks.bench_runs_list --runs 500000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from src.database import Database
+from src.runs_repo import is_script_running, list_runs
+from src.scripts_repo import add_script
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=500_000)
+    ap.add_argument("--output-bytes", type=int, default=4096)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(Path(tmp) / "bench.db")
+        script_id = add_script(db, name="bench", command="true")
+        blob = "x" * args.output_bytes
+        conn = db.connect()
+        conn.executemany(
+            "INSERT INTO runs (script_id, status, started_at, finished_at, exit_code) VALUES (?, 'success', '', '', 0)",
+            ((script_id,) for _ in range(args.runs)),
+        )
+        conn.executemany(
+            "INSERT INTO run_output_chunks (run_id, stream, seq, data, raw_size) VALUES (?, 'stdout', 0, ?, ?)",
+            ((i, blob, len(blob)) for i in range(1, args.runs + 1)),
+        )
+        conn.commit()
+
+        for name, fn in (
+            ("list_runs", lambda: list_runs(db, limit=10)),
+            ("list_runs(script)", lambda: list_runs(db, limit=10, script_id=script_id)),
+            ("is_script_running", lambda: is_script_running(db, script_id)),
+        ):
+            n = 200
+            started = time.perf_counter()
+            for _ in range(n):
+                fn()
+            print(f"{name:<20} {(time.perf_counter() - started) / n * 1000:.3f} ms/call")
+
+if __name__ == "__main__":
+    main()
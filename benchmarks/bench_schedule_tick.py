@@ -0,0 +1,81 @@
+"""
+Cost of one ScheduleSource tick with many schedules, none of them due:
+the old full scan (every row, a croniter per cron row) against the
+next_run index plus in-memory heap.
+
+    python -m benchmarks.bench_schedule_tick --schedules 100000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.database import Database
+from src.schedules_repo import _iso, next_run_after
+from src.scripts_repo import add_script
+from src.trigger_sources.schedules import ScheduleSource
+
+def full_scan_due(db: Database) -> list:
+    """
+    due_schedules as it was before next_run_at_utc.
+    """
+    now = datetime.now(timezone.utc)
+    due = []
+    for r in db.query("SELECT * FROM schedules"):
+        last_run = datetime.fromisoformat(r["last_run"]) if r["last_run"] else None
+        if next_run_after(r, last_run, now) <= now:
+            due.append(r)
+    return due
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--schedules", type=int, default=100_000)
+    ap.add_argument("--cron-share", type=float, default=0.1)
+    ap.add_argument("--ticks", type=int, default=20)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(Path(tmp) / "bench.db")
+        script_id = add_script(db, name="bench", command="true")
+        now = datetime.now(timezone.utc)
+        n_cron = int(args.schedules * args.cron_share)
+        rows = []
+        for i in range(args.schedules):
+            if i < n_cron:
+                row = {"interval_seconds": None, "cron": "0 3 * * *", "tz": "UTC"}
+            else:
+                row = {"interval_seconds": 86400, "cron": None, "tz": None}
+            rows.append(
+                (script_id, row["interval_seconds"], row["cron"], row["tz"], now.isoformat(),
+                 now.isoformat(), _iso(next_run_after(row, now, now)))
+            )
+        conn = db.connect()
+        conn.executemany(
+            """
+            INSERT INTO schedules (script_id, interval_seconds, cron, tz, last_run, created_at, next_run_at_utc)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        conn.commit()
+
+        started = time.perf_counter()
+        full_scan_due(db)
+        print(f"full scan      {(time.perf_counter() - started) * 1000:9.3f} ms/tick")
+
+        source = ScheduleSource()
+        started = time.perf_counter()
+        source.poll(db)
+        print(f"heap (load)    {(time.perf_counter() - started) * 1000:9.3f} ms, once at daemon start")
+
+        started = time.perf_counter()
+        for _ in range(args.ticks):
+            source.poll(db)
+        print(f"heap           {(time.perf_counter() - started) / args.ticks * 1000:9.3f} ms/tick")
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Dispatch latency and idle CPU of a daemon that polls every tick against
+one that sleeps until notified.
+
+    python -m benchmarks.bench_wakeup_latency --events 20 --tick 2
+"""
+from __future__ import annotations
+
+import argparse
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import psutil
+
+from src.database import Database
+from src.pending_events_repo import enqueue_event
+from src.scripts_repo import add_script
+
+def _run_count(db: Database) -> int:
+    return int(db.query("SELECT COUNT(*) AS n FROM runs")[0]["n"])
+
+def measure(db_path: Path, wakeups: bool, events: int, tick: int, idle_seconds: float) -> None:
+    db = Database(db_path)
+    sid = add_script(db, name=f"bench-{wakeups}", command="true")
+    flag = "--wakeups" if wakeups else "--no-wakeups"
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "src", "daemon", "--db", str(db_path), "--tick", str(tick), flag],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        time.sleep(1.0)
+        cpu = psutil.Process(proc.pid)
+        before = sum(cpu.cpu_times()[:2])
+        time.sleep(idle_seconds)
+        idle_cpu = (sum(cpu.cpu_times()[:2]) - before) / idle_seconds * 100
+
+        latencies = []
+        for _ in range(events):
+            seen = _run_count(db)
+            started = time.perf_counter()
+            enqueue_event(db, trigger_id="bench", script_id=sid)
+            while _run_count(db) == seen:
+                time.sleep(0.0005)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        name = "wakeups" if wakeups else "polling"
+        print(
+            f"{name:<8} dispatch p50 {statistics.median(latencies):8.1f} ms  "
+            f"max {max(latencies):8.1f} ms  idle cpu {idle_cpu:5.2f}%"
+        )
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait()
+        db.close()
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=20)
+    ap.add_argument("--tick", type=int, default=2)
+    ap.add_argument("--idle-seconds", type=float, default=3.0)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for wakeups in (False, True):
+            measure(Path(tmp) / f"bench-{wakeups}.db", wakeups, args.events, args.tick, args.idle_seconds)
+
+if __name__ == "__main__":
+    main()
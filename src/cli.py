@@ -1,24 +1,20 @@
 import click
 import re
+import sqlite3
+import time
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
-from zoneinfo import ZoneInfo
 
 from .database import Database
-from .scripts_repo import add_script, list_scripts, get_script
-from .schedules_repo import add_schedule, list_schedules, add_cron_schedule
-from .scheduler import run_loop
-from .runs_repo import list_runs, get_run
-from .timefmt import to_local_display
-from .config_apply import apply_config
-from .file_triggers_repo import add_file_trigger, list_file_triggers, remove_file_trigger
-from .file_watcher import FileWatcher
-from .webhooks_repo import add_webhook, list_webhooks, remove_webhook
-from .webhook_server import serve as serve_webhooks
-from .config_export import export_config
-from .event_bus_repo import publish_event, subscribe, list_events, list_subscriptions
-from .runs_repo import is_script_running
-from .pending_events_repo import enqueue_queue_one
+
+def _read_db(db_path) -> Database:
+    """
+    Read-only handle for inspection commands, so polling them never
+    competes with the daemon for the write lock.
+    """
+    db = Database(db_path, readonly=True)
+    db.init()
+    return db
 
 @click.group()
 def cli():
@@ -38,7 +34,7 @@ def run_cmd(db_path, script_id):
     db.init()
 
     from .scripts_repo import get_script
-    from .pending_events_repo import enqueue_event, enqueue_queue_one
+    from .pending_events_repo import enqueue_event
 
     s = get_script(db, script_id)
     if s is None:
@@ -68,6 +64,7 @@ def script():
 @click.option("--command", required=True)
 @click.option("--cwd", "working_dir", default=None)
 def script_add(db_path, name, command, working_dir):
+    from .scripts_repo import add_script
     db = Database(db_path)
     script_id = add_script(db, name=name, command=command, working_dir=working_dir)
     click.echo(f"Added script #{script_id}: {name}")
@@ -75,7 +72,8 @@ def script_add(db_path, name, command, working_dir):
 @script.command("list")
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 def script_list(db_path):
-    db = Database(db_path)
+    from .scripts_repo import list_scripts
+    db = _read_db(db_path)
     scripts = list_scripts(db)
     if not scripts:
         click.echo("No scripts found.")
@@ -87,7 +85,10 @@ def script_list(db_path):
 @click.argument("script-id", type=int)
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 def script_show(script_id, db_path):
-    db = Database(db_path)
+    from .output_capture import capture_for
+    from .run_output_repo import compression_for
+    from .scripts_repo import get_script
+    db = _read_db(db_path)
     s = get_script(db, script_id)
     if s is None:
         raise click.ClickException(f"Script {script_id} not found")
@@ -97,6 +98,16 @@ def script_show(script_id, db_path):
     click.echo(f"cwd: {s.working_dir or ''}")
     click.echo(f"created_at: {s.created_at}")
     click.echo(f"updated_at: {s.updated_at}")
+    c = compression_for(s)
+    click.echo(f"output_compression: {c.codec} level={c.level} min_bytes={c.min_bytes}")
+    click.echo(f"mode: {s.mode}")
+    if s.batch_max_events is not None:
+        click.echo(f"batch: max_events={s.batch_max_events} max_wait_ms={s.batch_max_wait_ms or 0}")
+    cap = capture_for(s)
+    if cap.limited:
+        click.echo(f"output_capture: head={cap.head_bytes or 0} bytes tail={cap.tail_bytes or 0} bytes")
+    else:
+        click.echo("output_capture: unlimited")
 
 @cli.group()
 def schedule():
@@ -105,21 +116,95 @@ def schedule():
 
 @cli.command()
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
-@click.option("--tick", "tick_seconds", type=int, default=2)
+@click.option(
+    "--config",
+    "config_path",
+    type=click.Path(dir_okay=False, exists=True, path_type=Path),
+    default=None,
+    help="YAML file whose settings: section supplies defaults for the options below.",
+)
+@click.option("--tick", "tick_seconds", type=int, default=None)
 @click.option("--once", is_flag=True, help="Run a single scheduler tick then exit.")
-def daemon(db_path, tick_seconds, once):
+@click.option("--max-workers", type=int, default=None, help="Max scripts executed in parallel.")
+@click.option("--executor", type=click.Choice(["subprocess", "asyncio"]), default=None, help="How child processes are supervised.")
+@click.option("--group-commit/--no-group-commit", default=None, help="Commit each source's writes per tick in one transaction.")
+@click.option("--config-cache/--no-config-cache", default=True, help="Cache scripts, hooks and triggers between ticks.")
+@click.option("--wakeups/--no-wakeups", default=True, help="Sleep until notified of new work instead of a fixed tick.")
+@click.option(
+    "--poll-interval",
+    "poll_intervals",
+    multiple=True,
+    metavar="SOURCE=SECONDS",
+    help="Poll one trigger source at its own interval, e.g. app_watch=10 or file_watch=30. Repeatable.",
+)
+@click.option("--poll-threads/--no-poll-threads", default=True, help="Poll file/process watchers on their own threads.")
+@click.option(
+    "--file-watch",
+    "file_watch_backend",
+    type=click.Choice(["auto", "inotify", "poll"]),
+    default="auto",
+    help="How file triggers notice changes; use poll on network filesystems.",
+)
+def daemon(
+    db_path, config_path, tick_seconds, once, max_workers, executor, group_commit, config_cache, wakeups,
+    poll_intervals, poll_threads, file_watch_backend,
+):
     """Start the scheduler loop."""
+    from .config import load_settings
+    from .config_cache import ConfigCache
+    from .scheduler import run_loop
+    try:
+        settings = load_settings(config_path)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--config")
+    # Command-line options win over the config file, which wins over defaults.
+    if db_path is None and config_path is not None:
+        db_path = settings.db_path
+    if tick_seconds is None:
+        tick_seconds = settings.tick_seconds
+    if max_workers is None:
+        max_workers = settings.max_workers
+    if executor is None:
+        executor = settings.executor
+    if group_commit is None:
+        group_commit = settings.group_commit
+    intervals = {}
+    for item in poll_intervals:
+        name, sep, seconds = item.partition("=")
+        try:
+            intervals[name.strip()] = float(seconds)
+        except ValueError:
+            sep = ""
+        if not sep:
+            raise click.BadParameter(f"expected SOURCE=SECONDS, got {item!r}", param_hint="--poll-interval")
     if once:
         click.echo(f"Running one tick...")
     else:
-        click.echo(f"Starting scheduler (tick={tick_seconds}s)... Ctrl+C to stop.")
-    run_loop(db_path=db_path, tick_seconds=tick_seconds, once=once)
+        click.echo(f"Starting scheduler (tick={tick_seconds}s, workers={max_workers})... Ctrl+C to stop.")
+    cache = ConfigCache() if config_cache else None
+    run_loop(
+        db_path=db_path,
+        tick_seconds=tick_seconds,
+        once=once,
+        max_workers=max_workers,
+        executor=executor,
+        group_commit=group_commit,
+        config_cache=cache,
+        wakeups=wakeups,
+        poll_intervals=intervals,
+        poll_threads=poll_threads,
+        file_watch_backend=file_watch_backend,
+    )
+    if cache is not None:
+        s = cache.stats()
+        click.echo(f"config cache: hits={s['hits']} misses={s['misses']} invalidations={s['invalidations']}")
 
 @schedule.command("add")
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 @click.option("--script-id", type=int, required=True)
 @click.option("--interval", "interval_seconds", type=int, required=True)
 def schedule_add(db_path, script_id, interval_seconds):
+    from .schedules_repo import add_schedule
     db = Database(db_path)
     sid = add_schedule(db, script_id=script_id, interval_seconds=interval_seconds)
     click.echo(f"Added schedule #{sid} for script {script_id} every {interval_seconds}s")
@@ -130,6 +215,7 @@ def schedule_add(db_path, script_id, interval_seconds):
 @click.option("--cron", required=True, help='Cron like "0 9 * * 1-5" (min hour dom mon dow)')
 @click.option("--tz", default=None, help='IANA timezone like "America/New_York"')
 def schedule_add_cron(db_path, script_id, cron, tz):
+    from .schedules_repo import add_cron_schedule
     db = Database(db_path)
     sid = add_cron_schedule(db, script_id=script_id, cron=cron, tz=tz)
     click.echo(f"Added cron schedule #{sid} for script {script_id}: {cron} ({tz or 'local'})")
@@ -144,7 +230,9 @@ def runs():
 @click.option("--limit", type=int, default=10)
 @click.option("--script-id", type=int, default=None)
 def runs_list(db_path, limit, script_id):
-    db = Database(db_path)
+    from .runs_repo import list_runs
+    from .timefmt import to_local_display
+    db = _read_db(db_path)
     rows = list_runs(db, limit=limit, script_id=script_id)
     if not rows:
         click.echo("No runs found.")
@@ -162,13 +250,16 @@ def runs_list(db_path, limit, script_id):
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 @click.option("--max", "max_chars", type=int, default=4000, help="Max chars to display for stdout/stderr.")
 def runs_show(run_id, db_path, max_chars):
-    db = Database(db_path)
+    from .run_output_repo import output_stats, read_output
+    from .runs_repo import get_run
+    from .timefmt import to_local_display
+    db = _read_db(db_path)
     r = get_run(db, run_id)
     if r is None:
         raise click.ClickException(f"Run {run_id} not found")
     
-    def clip(s: str) -> str:
-        s = s or ""
+    def clip(stream: str) -> str:
+        s = read_output(db, run_id, stream, limit=max_chars + 1)
         return s if len(s) <= max_chars else s[:max_chars] + "\n...[truncated]"
     
     click.echo(f"id: {r['id']}")
@@ -177,30 +268,138 @@ def runs_show(run_id, db_path, max_chars):
     click.echo(f"exit_code: {r['exit_code']}")
     click.echo(f"started: {to_local_display(r['started_at'])}")
     click.echo(f"finished: {to_local_display(r['finished_at'])}")
+    click.echo(f"output: {_format_ratio(output_stats(db, run_id=run_id))}")
     click.echo(f"\n--- stdout ---")
-    click.echo(clip(r["stdout"]))
+    click.echo(clip("stdout"))
     click.echo(f"\n--- stderr ---")
-    click.echo(clip(r["stderr"]))
+    click.echo(clip("stderr"))
+
+def _format_ratio(stats) -> str:
+    raw, stored = stats["raw_bytes"], stats["stored_bytes"]
+    ratio = f"{raw / stored:.1f}x" if stored else "n/a"
+    return f"{raw} bytes raw, {stored} bytes stored ({ratio})"
+
+@runs.command("output-stats")
+@click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
+@click.option("--script-id", type=int, default=None)
+def runs_output_stats(db_path, script_id):
+    """Show how well stored run output compresses."""
+    from .run_output_repo import output_stats
+    db = _read_db(db_path)
+    stats = output_stats(db, script_id=script_id)
+    click.echo(f"chunks: {stats['chunks']}")
+    click.echo(f"output: {_format_ratio(stats)}")
+
+@runs.command("search-index")
+@click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
+@click.option("--enable/--disable", default=True, help="Create (and backfill) or drop the FTS5 index.")
+def runs_search_index(db_path, enable):
+    """Manage the optional full-text index over run output."""
+    db = Database(db_path)
+    db.init()
+    from .run_search_repo import disable_search_index, enable_search_index
+    if not enable:
+        disable_search_index(db)
+        click.echo("Run output search index disabled.")
+        return
+    try:
+        n = enable_search_index(db)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Run output search index enabled ({n} chunks indexed).")
+
+@runs.command("search")
+@click.argument("query")
+@click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
+@click.option("--script-id", type=int, default=None)
+@click.option("--since", "since_str", default=None, help='Duration like "2h" or an ISO datetime')
+@click.option("--limit", type=int, default=20)
+def runs_search(query, db_path, script_id, since_str, limit):
+    """Find runs whose output matches an FTS5 QUERY."""
+    from .timefmt import to_local_display
+    db = _read_db(db_path)
+    from .run_search_repo import search_index_enabled, search_runs
+    if not search_index_enabled(db):
+        raise click.ClickException("Search index is disabled. Run `runs search-index --enable` first.")
+
+    since_iso = None
+    if since_str is not None:
+        if re.fullmatch(r"\d+[smhd]", since_str.strip().lower()):
+            since_iso = (datetime.now(timezone.utc) - _parse_in(since_str)).isoformat()
+        else:
+            try:
+                since = datetime.fromisoformat(since_str)
+            except ValueError:
+                raise click.ClickException('Invalid --since. Use "2h" or ISO like "2026-02-16T21:30"')
+            since_iso = since.astimezone(timezone.utc).isoformat()
+
+    try:
+        rows = search_runs(db, query, script_id=script_id, since_iso=since_iso, limit=limit)
+    except sqlite3.OperationalError as e:
+        raise click.ClickException(f"Invalid search query: {e}")
+    if not rows:
+        click.echo("No matching runs.")
+        return
+    click.echo("run\tscript\tstatus\tstarted\tstream\tsnippet")
+    for r in rows:
+        click.echo(
+            f"{r['run_id']}\t{r['script_id']}\t{r['status']}\t{to_local_display(r['started_at'])}\t"
+            f"{r['stream']}\t{r['snippet']}"
+        )
+
+@runs.command("tail")
+@click.argument("run_id", type=int)
+@click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
+@click.option("--follow", "-f", is_flag=True, help="Keep streaming until the run finishes.")
+@click.option("--interval", type=float, default=0.2, help="Poll interval in seconds while following.")
+def runs_tail(run_id, db_path, follow, interval):
+    from .run_output_repo import chunks_after
+    from .runs_repo import get_run
+    db = _read_db(db_path)
+    r = get_run(db, run_id)
+    if r is None:
+        raise click.ClickException(f"Run {run_id} not found")
+
+    last_id = 0
+    while True:
+        rows = chunks_after(db, run_id, after_id=last_id, limit=64)
+        for c in rows:
+            click.echo(c["data"], nl=False, err=c["stream"] == "stderr")
+            last_id = int(c["id"])
+        if rows:
+            continue
+
+        r = get_run(db, run_id)
+        if not follow or r is None or r["status"] != "running":
+            # The writer flushes before finish_run, so one more empty read
+            # after the run finished means we have everything.
+            if follow and r is not None and chunks_after(db, run_id, after_id=last_id, limit=1):
+                continue
+            break
+        time.sleep(interval)
 
 @schedule.command("list")
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 def schedule_list(db_path):
-    db = Database(db_path)
+    from .schedules_repo import list_schedules
+    from .timefmt import to_local_display
+    db = _read_db(db_path)
     rows = list_schedules(db)
 
     if not rows:
         click.echo("No schedules found.")
         return
 
-    click.echo("id\tscript\tkind\tspec\ttz\tlast_run")
+    click.echo("id\tscript\tkind\tspec\ttz\tlast_run\tnext_run")
     for r in rows:
         kind = "cron" if r["cron"] else "interval"
         spec = r["cron"] if r["cron"] else f"{r['interval_seconds']}s"
         tz = r["tz"] or ""
         last_run = to_local_display(r["last_run"]) if r["last_run"] else ""
+        next_run = to_local_display(r["next_run_at_utc"]) if r["next_run_at_utc"] else ""
 
         click.echo(
-            f"{r['id']}\t{r['script_name']}\t{kind}\t{spec}\t{tz}\t{last_run}"
+            f"{r['id']}\t{r['script_name']}\t{kind}\t{spec}\t{tz}\t{last_run}\t{next_run}"
         )
 
 @cli.command("runs-clear")
@@ -209,6 +408,8 @@ def runs_clear(db_path):
     db = Database(db_path)
     db.init()
     db.execute("delete from runs;")
+    from .run_search_repo import clear_search_index
+    clear_search_index(db)
     click.echo("Cleared all runs.")
 
 @cli.group()
@@ -220,6 +421,8 @@ def config():
 @click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 def config_apply(path, db_path):
+    # Imported here: only config files need pydantic.
+    from .config_apply import apply_config
     db = Database(db_path)
     apply_config(db, path)
     click.echo(f"Applied config: {path}")
@@ -228,7 +431,8 @@ def config_apply(path, db_path):
 @click.argument("path", type=click.Path(dir_okay=False, path_type=Path))
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 def config_export(path, db_path):
-    db = Database(db_path)
+    from .config_export import export_config
+    db = _read_db(db_path)
     export_config(db, path)
     click.echo(f"Exported config to: {path}")
 @cli.group()
@@ -241,39 +445,52 @@ def trigger():
 @click.option("--script-id", type=int, required=True)
 @click.option("--path", required=True)
 @click.option("--recursive", is_flag=True)
-def trigger_add_file(db_path, script_id, path, recursive):
+@click.option("--include", multiple=True, help='Only files matching this glob count, e.g. "*.py". Repeatable.')
+@click.option("--exclude", multiple=True, help='Skip matching files and directories, e.g. "node_modules". Repeatable.')
+def trigger_add_file(db_path, script_id, path, recursive, include, exclude):
+    from .file_triggers_repo import add_file_trigger
     db = Database(db_path)
-    tid = add_file_trigger(db, script_id=script_id, path=path, recursive=recursive)
+    tid = add_file_trigger(
+        db, script_id=script_id, path=path, recursive=recursive, include=list(include), exclude=list(exclude)
+    )
     click.echo(f"Added file trigger #{tid} watching {path}")
 
 @trigger.command("list")
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 def trigger_list(db_path):
-    db = Database(db_path)
+    from .file_triggers_repo import globs, list_file_triggers
+    db = _read_db(db_path)
     rows = list_file_triggers(db)
     if not rows:
         click.echo("No file triggers.")
         return
     
-    click.echo("id\tscript\tpath\trecursive")
+    click.echo("id\tscript\tpath\trecursive\tinclude\texclude")
     for r in rows:
         click.echo(
-            f"{r['id']}\t{r['script_name']}\t{r['path']}\t{bool(r['recursive'])}"
+            f"{r['id']}\t{r['script_name']}\t{r['path']}\t{bool(r['recursive'])}\t"
+            f"{','.join(globs(r['include_globs']))}\t{','.join(globs(r['exclude_globs']))}"
         )
 
 @trigger.command("debug-scan")
 @click.option("--path", required=True)
 @click.option("--recursive", is_flag=True)
-def trigger_debug_scan(path, recursive):
+@click.option("--include", multiple=True)
+@click.option("--exclude", multiple=True)
+def trigger_debug_scan(path, recursive, include, exclude):
+    from .file_watcher import FileWatcher
+    from .path_filter import make_filter
     w = FileWatcher()
-    first = w.scan(path, recursive)
-    second = w.scan(path, recursive)
+    path_filter = make_filter(include, exclude)
+    first = w.scan(path, recursive, path_filter)
+    second = w.scan(path, recursive, path_filter)
     click.echo(f"first_scan_changed={first} second_scan_changed={second}")
 
 @trigger.command("remove")
 @click.argument("trigger_id", type=int)
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 def trigger_remove(trigger_id, db_path):
+    from .file_triggers_repo import remove_file_trigger
     db = Database(db_path)
     n = remove_file_trigger(db, trigger_id)
     if n == 0:
@@ -290,6 +507,7 @@ def webhook():
 @click.option("--name", required=True)
 @click.option("--script-id", type=int, required=True)
 def webhook_add(db_path, name, script_id):
+    from .webhooks_repo import add_webhook
     db = Database(db_path)
     wid = add_webhook(db, name=name, script_id=script_id)
     click.echo(f"Added webhooks #{wid}: {name} -> script {script_id}")
@@ -297,7 +515,8 @@ def webhook_add(db_path, name, script_id):
 @webhook.command("list")
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 def webhook_list(db_path):
-    db = Database(db_path)
+    from .webhooks_repo import list_webhooks
+    db = _read_db(db_path)
     rows = list_webhooks(db)
     if not rows:
         click.echo("No webhooks.")
@@ -310,6 +529,7 @@ def webhook_list(db_path):
 @click.argument("name")
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 def webhook_remove(name, db_path):
+    from .webhooks_repo import remove_webhook
     db = Database(db_path)
     n = remove_webhook(db, name)
     if n == 0:
@@ -321,6 +541,7 @@ def webhook_remove(name, db_path):
 @click.option("--host", default="127.0.0.1")
 @click.option("--port", type=int, default=5055)
 def webhook_serve(db_path, host, port):
+    from .webhook_server import serve as serve_webhooks
     serve_webhooks(db_path=db_path, host=host, port=port)
 
 def _parse_in(s: str) -> timedelta:
@@ -348,6 +569,7 @@ def oneshot():
 @click.option("--tz", "tz_str", type=str, default="America/New_York")
 @click.option("--in", "in_str", type=str, default=None, help='Delay like "15m", "2h"')
 def oneshot_add(db_path, script_id: int, at_str: str | None, tz_str: str, in_str: str | None):
+    from zoneinfo import ZoneInfo
     if (at_str is None) == (in_str is None):
         raise click.ClickException("Provide exactly one of --at or --in")
     
@@ -384,8 +606,7 @@ def oneshot_add(db_path, script_id: int, at_str: str | None, tz_str: str, in_str
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 @click.option("--all", "include_fired", is_flag=True, default=False)
 def oneshot_list(db_path, include_fired: bool):
-    db = Database(db_path)
-    db.init()
+    db = _read_db(db_path)
 
     from .oneshots_repo import list_one_shots
     rows = list_one_shots(db, include_fired=include_fired)
@@ -421,6 +642,7 @@ def event():
 @click.option("--topic", required=True)
 @click.option("--payload", "payload_json", default=None, help="JSON string payload")
 def event_publish(db_path, topic, payload_json):
+    from .event_bus_repo import publish_event
     db = Database(db_path)
     db.init()
 
@@ -432,6 +654,7 @@ def event_publish(db_path, topic, payload_json):
 @click.option("--topic", required=True)
 @click.option("--script-id", type=int, required=True)
 def event_subscribe(db_path, topic, script_id):
+    from .event_bus_repo import subscribe
     db = Database(db_path)
     db.init()
 
@@ -442,8 +665,8 @@ def event_subscribe(db_path, topic, script_id):
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 @click.option("--limit", type=int, default=20)
 def event_list(db_path, limit):
-    db = Database(db_path)
-    db.init()
+    from .event_bus_repo import list_events
+    db = _read_db(db_path)
 
     rows = list_events(db, limit=limit)
     if not rows:
@@ -457,8 +680,8 @@ def event_list(db_path, limit):
 @event.command("subscriptions")
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 def event_subscriptions(db_path):
-    db = Database(db_path)
-    db.init()
+    from .event_bus_repo import list_subscriptions
+    db = _read_db(db_path)
 
     rows = list_subscriptions(db)
     if not rows:
@@ -489,8 +712,7 @@ def hook_add(db_path, on_script_id, on_status, target_script_id):
 @hook.command("list")
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 def hook_list(db_path):
-    db = Database(db_path)
-    db.init()
+    db = _read_db(db_path)
     from .run_hooks_repo import list_hooks
     rows = list_hooks(db)
     if not rows:
@@ -530,7 +752,7 @@ def daemon_hook_add(db_path, event, script_id):
 @daemon_hook.command("list")
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 def daemon_hook_list(db_path):
-    db = Database(db_path); db.init()
+    db = _read_db(db_path)
     from .daemon_hooks_repo import list_daemon_hooks
     rows = list_daemon_hooks(db)
     if not rows:
@@ -567,7 +789,7 @@ def signal_hook_add(db_path, sig, script_id):
 @signal_hook.command("list")
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 def signal_hook_list(db_path):
-    db = Database(db_path); db.init()
+    db = _read_db(db_path)
     from .signal_hooks_repo import list_signal_hooks
     rows = list_signal_hooks(db)
     if not rows:
@@ -605,7 +827,7 @@ def app_trigger_add(db_path, process_name, on_event, script_id):
 @app_trigger.command("list")
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 def app_trigger_list(db_path):
-    db = Database(db_path); db.init()
+    db = _read_db(db_path)
     from .app_triggers_repo import list_app_triggers
     rows = list_app_triggers(db)
     if not rows:
@@ -636,6 +858,80 @@ def script_set_policy(db_path, script_id, policy):
     set_concurrency_policy(db, script_id=script_id, policy=policy)
     click.echo(f"Set script {script_id} concurrency_policy={policy}")
 
+@script.command("set-compression")
+@click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
+@click.option("--id", "script_id", type=int, required=True)
+@click.option("--codec", type=click.Choice(["zlib", "lzma", "none", "default"]), required=True)
+@click.option("--level", type=click.IntRange(0, 9), default=None)
+@click.option("--min-bytes", type=int, default=None, help="Store smaller chunks uncompressed.")
+def script_set_compression(db_path, script_id, codec, level, min_bytes):
+    db = Database(db_path); db.init()
+    from .scripts_repo import set_output_compression
+    n = set_output_compression(
+        db,
+        script_id=script_id,
+        codec=None if codec == "default" else codec,
+        level=level,
+        min_bytes=min_bytes,
+    )
+    if n == 0:
+        raise click.ClickException(f"Script {script_id} not found")
+    click.echo(f"Set script {script_id} output compression={codec}")
+
+@script.command("set-mode")
+@click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
+@click.option("--id", "script_id", type=int, required=True)
+@click.option("--mode", type=click.Choice(["process", "worker"]), required=True,
+              help="worker keeps one long-lived process fed NDJSON requests on stdin.")
+def script_set_mode(db_path, script_id, mode):
+    db = Database(db_path); db.init()
+    from .scripts_repo import set_mode
+    if set_mode(db, script_id=script_id, mode=mode) == 0:
+        raise click.ClickException(f"Script {script_id} not found")
+    click.echo(f"Set script {script_id} mode={mode}")
+
+@script.command("set-batch")
+@click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
+@click.option("--id", "script_id", type=int, required=True)
+@click.option("--max-events", type=click.IntRange(1), default=None, help="Events handed to one invocation.")
+@click.option("--max-wait-ms", type=click.IntRange(0), default=0, help="Longest an event waits for its batch to fill.")
+@click.option("--off", is_flag=True, help="Run one invocation per event again.")
+def script_set_batch(db_path, script_id, max_events, max_wait_ms, off):
+    if off == (max_events is not None):
+        raise click.ClickException("Provide --max-events or --off")
+    db = Database(db_path); db.init()
+    from .scripts_repo import set_batch
+    if set_batch(db, script_id=script_id, max_events=max_events, max_wait_ms=max_wait_ms) == 0:
+        raise click.ClickException(f"Script {script_id} not found")
+    if off:
+        click.echo(f"Disabled batching for script {script_id}")
+    else:
+        click.echo(f"Set script {script_id} batch max_events={max_events} max_wait_ms={max_wait_ms}")
+
+@script.command("set-capture")
+@click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
+@click.option("--id", "script_id", type=int, required=True)
+@click.option("--head-kb", type=click.IntRange(0), default=None, help="Keep the first N KB of each stream.")
+@click.option("--tail-kb", type=click.IntRange(0), default=None, help="Keep the last M KB of each stream.")
+@click.option("--unlimited", is_flag=True, help="Keep all output (the default).")
+def script_set_capture(db_path, script_id, head_kb, tail_kb, unlimited):
+    if unlimited == (head_kb is not None or tail_kb is not None):
+        raise click.ClickException("Provide --head-kb/--tail-kb or --unlimited")
+    db = Database(db_path); db.init()
+    from .scripts_repo import set_capture_policy
+    n = set_capture_policy(
+        db,
+        script_id=script_id,
+        head_bytes=None if unlimited else (head_kb or 0) * 1024,
+        tail_bytes=None if unlimited else (tail_kb or 0) * 1024,
+    )
+    if n == 0:
+        raise click.ClickException(f"Script {script_id} not found")
+    if unlimited:
+        click.echo(f"Set script {script_id} output capture=unlimited")
+    else:
+        click.echo(f"Set script {script_id} output capture head={head_kb or 0}KB tail={tail_kb or 0}KB")
+
 @cli.group("dctl")
 def dctl():
     """Daemon control _ status"""
@@ -644,7 +940,7 @@ def dctl():
 @dctl.command("status")
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 def dctl_status(db_path):
-    db = Database(db_path); db.init()
+    db = _read_db(db_path)
     from .daemon_lock_repo import get_daemon_lock
     lock = get_daemon_lock(db)
     if not lock:
@@ -655,6 +951,26 @@ def dctl_status(db_path):
     click.echo(f"pid: {lock['pid']}")
     click.echo(f"acquired_at_utc: {lock['acquired_at_utc']}")
 
+@dctl.command("sources")
+@click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
+def dctl_sources(db_path):
+    """Poll cost per trigger source in the running (or last) daemon."""
+    db = _read_db(db_path)
+    from .source_stats_repo import list_source_stats
+    rows = list_source_stats(db)
+    if not rows:
+        click.echo("No source stats yet.")
+        return
+    click.echo("source\tinterval\tpolls\tevents\tavg_ms\tmax_ms\ttotal_ms\tlag_ms\tmax_lag_ms\tlast_poll")
+    for r in rows:
+        interval = "wakeup" if r["interval_seconds"] is None else f"{r['interval_seconds']:g}s"
+        avg = r["total_ms"] / r["polls"] if r["polls"] else 0.0
+        click.echo(
+            f"{r['name']}\t{interval}\t{r['polls']}\t{r['events']}\t{avg:.2f}\t"
+            f"{r['max_ms']:.2f}\t{r['total_ms']:.1f}\t{r['last_lag_ms']:.1f}\t{r['max_lag_ms']:.1f}\t"
+            f"{r['last_poll_at_utc'] or ''}"
+        )
+
 @dctl.command("unlock")
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 @click.option("--force", is_flag=True, help="Clear daemon lock row unconditionally")
@@ -675,7 +991,7 @@ def pending():
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 @click.option("--script-id", type=int, default=None)
 def penidng_stats_cmd(db_path, script_id):
-    db = Database(db_path); db.init()
+    db = _read_db(db_path)
     from .pending_events_repo import pending_stats
     s = pending_stats(db, script_id=script_id)
     click.echo(f"inflight={s['inflight']} waiting{s['waiting']} processed={s['processed']}")
@@ -685,7 +1001,7 @@ def penidng_stats_cmd(db_path, script_id):
 @click.option("--script-id", type=int, default=None)
 @click.option("--limit", type=int, default=30)
 def pending_list_cmd(db_path, script_id, limit):
-    db = Database(db_path); db.init()
+    db = _read_db(db_path)
     from .pending_events_repo import list_pending
     rows = list_pending(db, script_id=script_id, limit=limit)
     if not rows:
@@ -710,7 +1026,7 @@ def pending_clear_cmd(db_path, script_id):
 @cli.command("status")
 @click.option("--db", "db_path", type=click.Path(dir_okay=False, path_type=Path), default=None)
 def status_cmd(db_path):
-    db = Database(db_path); db.init()
+    db = _read_db(db_path)
     from .scripts_repo import list_scripts
     from .pending_events_repo import pending_stats
     from .runs_repo import is_script_running
@@ -5,10 +5,16 @@ from pathlib import Path
 from typing import Optional, Any
 import yaml
 
+from .executor import DEFAULT_EXECUTOR, EXECUTORS
+from .worker_pool import DEFAULT_MAX_WORKERS
+
 @dataclass(frozen=True)
 class Settings:
     db_path: Path = Path.cwd() / "scripter.db"
     tick_seconds: int = 2
+    max_workers: int = DEFAULT_MAX_WORKERS
+    executor: str = DEFAULT_EXECUTOR
+    group_commit: bool = True
 
     file_quiet_seconds: int = 3
     file_min_interval_seconds: int = 30
@@ -16,6 +22,19 @@ class Settings:
     webhook_host: str = "127.0.0.1"
     webhook_port: int = 5055
 
+def _as_bool(value: Any) -> bool:
+    """
+    A YAML boolean, or one written as a string ("false", "off", "0").
+    """
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("1", "true", "yes", "on"):
+        return True
+    if text in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"Not a boolean: {value!r}")
+
 def load_settings(path: Optional[Path]) -> Settings:
     """
     Load settings from a YAML file. Missing values fall back to defaults.
@@ -27,9 +46,16 @@ def load_settings(path: Optional[Path]) -> Settings:
     data: dict[str, Any] = yaml.safe_load(path.read_text()) or {}
     s = data.get("settings", {})
 
+    executor = str(s.get("executor", Settings().executor))
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor: {executor!r} (expected one of {', '.join(EXECUTORS)})")
+
     return Settings(
         db_path=Path(s.get("db_path", Settings().db_path)),
         tick_seconds=int(s.get("tick_seconds", Settings().tick_seconds)),
+        max_workers=int(s.get("max_workers", Settings().max_workers)),
+        executor=executor,
+        group_commit=_as_bool(s.get("group_commit", Settings().group_commit)),
         file_quiet_seconds=int(s.get("file_quiet_seconds", Settings().file_quiet_seconds)),
         file_min_interval_seconds=int(s.get("file_min_interval_seconds", Settings().file_min_interval_seconds)),
         webhook_host=str(s.get("webhook_host", Settings().webhook_host)),
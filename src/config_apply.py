@@ -4,12 +4,28 @@ from pathlib import Path
 from typing import Any
 import yaml
 
+from .config_models import CompressionConfig, ScriptConfig
 from .database import Database
-from .scripts_repo import add_script, list_scripts
+from .scripts_repo import (
+    add_script,
+    list_scripts,
+    set_batch,
+    set_capture_policy,
+    set_mode,
+    set_output_compression,
+)
 from .schedules_repo import add_schedule, add_cron_schedule
 from .file_triggers_repo import add_file_trigger
 from .webhooks_repo import add_webhook
 
+def _glob_list(value: Any) -> list[str]:
+    # A single pattern or a list of them.
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return [str(v) for v in value]
+
 def apply_config(db: Database, path: Path) -> None:
     db.init()
     data = yaml.safe_load(path.read_text()) or {}
@@ -20,14 +36,40 @@ def apply_config(db: Database, path: Path) -> None:
     existing = {s.name: s.id for s in list_scripts(db)}
 
     name_to_id: dict[str, int] = {}
-    for s in data.get("scripts", []):
+    for entry in data.get("scripts", []):
+        s = ScriptConfig.model_validate(entry)
         sid = add_script(
             db,
-            name=s["name"],
-            command=s["command"],
-            working_dir=s.get("cwd"),
+            name=s.name,
+            command=s.command,
+            working_dir=s.cwd,
+        )
+        name_to_id[s.name] = sid
+
+        # Every setting is written, so ones left out of the file go back
+        # to their defaults instead of keeping an earlier value.
+        set_mode(db, script_id=sid, mode=s.mode)
+        set_batch(
+            db,
+            script_id=sid,
+            max_events=s.batch.max_events if s.batch else None,
+            max_wait_ms=s.batch.max_wait_ms if s.batch else None,
+        )
+        compression = s.compression or CompressionConfig()
+        set_output_compression(
+            db,
+            script_id=sid,
+            codec=compression.codec,
+            level=compression.level,
+            min_bytes=compression.min_bytes,
+        )
+        # e.g. {head_kb: 64, tail_kb: 64}; without it output is kept whole.
+        set_capture_policy(
+            db,
+            script_id=sid,
+            head_bytes=s.capture.head_kb * 1024 if s.capture else None,
+            tail_bytes=s.capture.tail_kb * 1024 if s.capture else None,
         )
-        name_to_id[s["name"]] = sid
 
     def resolve_script(ref):
         # ref can be a name ("hello") or an int id
@@ -60,6 +102,8 @@ def apply_config(db: Database, path: Path) -> None:
             script_id=script_id,
             path=ft["path"],
             recursive=bool(ft.get("recursive", False)),
+            include=_glob_list(ft.get("include")),
+            exclude=_glob_list(ft.get("exclude")),
         )
 
     for w in data.get("webhooks", []):
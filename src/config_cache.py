@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+class ConfigCache:
+    """
+    Read-through cache of configuration rows (scripts, hooks, triggers,
+    webhooks) for long-running processes. Set it as db.config_cache and the
+    repo functions that read those tables go through it.
+
+    refresh() is cheap enough to call every tick: PRAGMA data_version only
+    changes when another connection committed, and only then is the
+    config_version counter (bumped by triggers on the config tables) read.
+    Cached values are shared between threads; callers must not mutate them.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._data: Dict[Hashable, Any] = {}
+        self._version: int | None = None
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, load: Callable[[], T]) -> T:
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            epoch = self._epoch
+        value = load()
+        with self._lock:
+            # Don't keep a value loaded across an invalidation.
+            if epoch == self._epoch:
+                self._data[key] = value
+        return value
+
+    def refresh(self, db: Any) -> bool:
+        """
+        Drops everything if the configuration changed since the last call.
+        Returns True when it did.
+        """
+        conn = db.connect()
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        seen = (id(conn), data_version)
+        if getattr(self._local, "seen", None) == seen:
+            return False
+        self._local.seen = seen
+        version = conn.execute("SELECT version FROM config_version WHERE id = 1").fetchone()[0]
+        with self._lock:
+            if version == self._version:
+                return False
+            self._version = version
+            self._data.clear()
+            self._epoch += 1
+            self.invalidations += 1
+        return True
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._epoch += 1
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "entries": len(self._data),
+            }
+
+def config_version(db: Any) -> int:
+    """
+    The counter bumped by every configuration change.
+    """
+    rows = db.query("SELECT version FROM config_version WHERE id = 1")
+    return int(rows[0]["version"]) if rows else 0
+
+def cached(db: Any, key: Hashable, load: Callable[[], T]) -> T:
+    """
+    load() through db.config_cache when one is set, directly otherwise.
+    """
+    cache = getattr(db, "config_cache", None)
+    if cache is None:
+        return load()
+    return cache.get(key, load)
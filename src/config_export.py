@@ -5,11 +5,18 @@ from typing import Any
 import yaml
 
 from .database import Database
+from .file_triggers_repo import globs
 
 def export_config(db: Database, path: Path) -> None:
     db.init()
 
-    scripts = db.query("SELECT id, name, command, working_dir FROM scripts ORDER BY id ASC")
+    scripts = db.query(
+        """
+        SELECT id, name, command, working_dir, compress_codec, compress_level, compress_min_bytes,
+               capture_head_bytes, capture_tail_bytes, mode, batch_max_events, batch_max_wait_ms
+        FROM scripts ORDER BY id ASC
+        """
+    )
     schedules = db.query("SELECT * FROM schedules ORDER BY id ASC")
     file_triggers = db.query("SELECT * FROM file_triggers ORDER BY id ASC")
     webhooks = db.query("SELECT * FROM webhooks ORDER BY id ASC")
@@ -17,15 +24,35 @@ def export_config(db: Database, path: Path) -> None:
     id_to_name = {s["id"]: s["name"] for s in scripts}
 
     out: dict[str, Any] = {
-        "scripts": [
-            {"name": s["name"], "command": s["command"], "cwd": s["working_dir"] or None}
-            for s in scripts
-        ],
+        "scripts": [],
         "schedules": [],
         "file_triggers": [],
         "webhooks": [],
     }
 
+    for s in scripts:
+        entry: dict[str, Any] = {"name": s["name"], "command": s["command"], "cwd": s["working_dir"] or None}
+        if s["mode"] and s["mode"] != "process":
+            entry["mode"] = s["mode"]
+        if s["batch_max_events"] is not None:
+            entry["batch"] = {
+                "max_events": int(s["batch_max_events"]),
+                "max_wait_ms": int(s["batch_max_wait_ms"] or 0),
+            }
+        if s["compress_codec"] or s["compress_level"] is not None or s["compress_min_bytes"] is not None:
+            comp = {
+                "codec": s["compress_codec"],
+                "level": s["compress_level"],
+                "min_bytes": s["compress_min_bytes"],
+            }
+            entry["compression"] = {k: v for k, v in comp.items() if v is not None}
+        if s["capture_head_bytes"] is not None or s["capture_tail_bytes"] is not None:
+            entry["capture"] = {
+                "head_kb": (s["capture_head_bytes"] or 0) // 1024,
+                "tail_kb": (s["capture_tail_bytes"] or 0) // 1024,
+            }
+        out["scripts"].append(entry)
+
     for sch in schedules:
         script_ref = id_to_name.get(sch["script_id"], str(sch["script_id"]))
 
@@ -50,13 +77,16 @@ def export_config(db: Database, path: Path) -> None:
             )
     
     for ft in file_triggers:
-        out["file_triggers"].append(
-            {
+        entry = {
             "script": id_to_name.get(ft["script_id"], str(ft["script_id"])),
             "path": ft["path"],
             "recursive": bool(ft["recursive"]),
-            }
-        )
+        }
+        if globs(ft["include_globs"]):
+            entry["include"] = globs(ft["include_globs"])
+        if globs(ft["exclude_globs"]):
+            entry["exclude"] = globs(ft["exclude_globs"])
+        out["file_triggers"].append(entry)
     
     for w in webhooks:
         out["webhooks"].append(
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+# Validation for YAML config files only. Runtime code uses the plain row
+# types in models.py so the daemon never imports pydantic.
+
+class BatchConfig(BaseModel):
+    max_events: int
+    max_wait_ms: int = 0
+
+class CompressionConfig(BaseModel):
+    # Same choices as `script set-compression`; None is the global default.
+    codec: Optional[Literal["zlib", "lzma", "none"]] = None
+    level: Optional[int] = Field(default=None, ge=0, le=9)
+    min_bytes: Optional[int] = Field(default=None, ge=0)
+
+class CaptureConfig(BaseModel):
+    # A missing side keeps nothing.
+    head_kb: int = Field(0, ge=0)
+    tail_kb: int = Field(0, ge=0)
+
+class ScriptConfig(BaseModel):
+    name: str
+    command: str
+    cwd: Optional[str] = None
+    mode: Literal["process", "worker"] = "process"
+    batch: Optional[BatchConfig] = None
+    compression: Optional[CompressionConfig] = None
+    capture: Optional[CaptureConfig] = None
@@ -1,5 +1,6 @@
 from __future__ import annotations
 from datetime import datetime, timezone
+from .config_cache import cached
 from .database import Database
 
 def add_daemon_hook(db: Database, event: str, script_id: int) -> int:
@@ -19,8 +20,11 @@ def list_daemon_hooks(db: Database) -> list[dict]:
     return [dict(r) for r in rows]
 
 def hooks_for_event(db: Database, event: str) -> list[int]:
-    rows = db.query("SELECT script_id FROM daemon_hooks WHERE event = ? ORDER BY id", (event,))
-    return [int(r["script_id"]) for r in rows]
+    def load() -> list[int]:
+        rows = db.query("SELECT script_id FROM daemon_hooks WHERE event = ? ORDER BY id", (event,))
+        return [int(r["script_id"]) for r in rows]
+
+    return cached(db, ("daemon_hooks", event), load)
 
 def remove_daemon_hook(db: Database, hook_id: int) -> int:
     cur = db.execute("DELETE FROM daemon_hooks WHERE id = ?", (hook_id,))
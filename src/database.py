@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Iterable, Any, Sequence
+from typing import Optional, Iterable, Any, Callable, Iterator, Sequence
 
 DEFAULT_DB_PATH = Path.cwd() / "scripter.db"
+DEFAULT_CACHED_STATEMENTS = 256
+DEFAULT_MAX_READERS = 4
 
 SCHEMA = """
 PRAGMA foreign_keys = ON;
@@ -16,7 +20,15 @@ CREATE TABLE IF NOT EXISTS scripts (
     working_dir TEXT,
     created_at TEXT NOT NULL,
     updated_at TEXT NOT NULL,
-    concurrency_policy TEXT NOT NULL DEFAULT 'allow'
+    concurrency_policy TEXT NOT NULL DEFAULT 'allow',
+    compress_codec TEXT,
+    compress_level INTEGER,
+    compress_min_bytes INTEGER,
+    capture_head_bytes INTEGER,
+    capture_tail_bytes INTEGER,
+    mode TEXT NOT NULL DEFAULT 'process',
+    batch_max_events INTEGER,
+    batch_max_wait_ms INTEGER
 );
 
 CREATE TABLE IF NOT EXISTS runs (
@@ -26,12 +38,29 @@ CREATE TABLE IF NOT EXISTS runs (
     started_at TEXT,
     finished_at TEXT,
     exit_code INTEGER,
-    stdout TEXT,
-    stderr TEXT,
     trigger TEXT,
     FOREIGN KEY (script_id) REFERENCES scripts(id) ON DELETE CASCADE
 );
 
+CREATE INDEX IF NOT EXISTS idx_runs_script
+    ON runs(script_id);
+
+CREATE INDEX IF NOT EXISTS idx_runs_running
+    ON runs(script_id) WHERE status = 'running';
+
+CREATE TABLE IF NOT EXISTS run_output_chunks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL,
+    stream TEXT NOT NULL,              -- stdout | stderr
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,                -- text, or a BLOB when codec is set
+    codec TEXT,                        -- NULL | zlib | lzma
+    raw_size INTEGER,
+    elided INTEGER,                    -- bytes dropped by the capture policy before this chunk
+    UNIQUE(run_id, stream, seq),
+    FOREIGN KEY (run_id) REFERENCES runs(id) ON DELETE CASCADE
+);
+
 CREATE TABLE IF NOT EXISTS schedules (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     script_id INTEGER NOT NULL,
@@ -141,15 +170,10 @@ CREATE TABLE IF NOT EXISTS pending_events (
     claimed_at_utc TEXT,
     claimed_by TEXT,
     processed_at_utc TEXT,
+    queue_tag TEXT,
     FOREIGN KEY(script_id) REFERENCES scripts(id)
 );
 
-CREATE UNIQUE INDEX IF NOT EXISTS ux_pending_waiting_queue_one
-ON pending_events(script_id)
-WHERE queue_tag='queue_one'
-  AND processed_at_utc IS NULL
-  AND claimed_at_utc IS NULL;
-
 CREATE INDEX IF NOT EXISTS idx_pending_events_ready
     ON pending_events(processed_at_utc, claimed_at_utc, id);
 
@@ -198,72 +222,463 @@ CREATE TABLE IF NOT EXISTS daemon_lock (
 );
 """
 
+def _move_legacy_output(conn: sqlite3.Connection) -> None:
+    """
+    Older databases kept output in runs.stdout/stderr. Move it into
+    run_output_chunks so the runs table only holds metadata.
+    """
+    for stream in ("stdout", "stderr"):
+        conn.execute(
+            f"""
+            INSERT OR IGNORE INTO run_output_chunks (run_id, stream, seq, data, raw_size)
+            SELECT id, '{stream}', 0, {stream}, LENGTH(CAST({stream} AS BLOB))
+            FROM runs
+            WHERE {stream} IS NOT NULL AND {stream} != ''
+            """
+        )
+    conn.execute("ALTER TABLE runs DROP COLUMN stdout")
+    conn.execute("ALTER TABLE runs DROP COLUMN stderr")
+
+def _migrate_v1_baseline(conn: sqlite3.Connection) -> None:
+    """
+    Brings a fresh database, or one created before versioned migrations,
+    to the current schema. Every step checks before it alters.
+    """
+    conn.executescript(SCHEMA)
+
+    cols = [r["name"] for r in conn.execute("PRAGMA table_info(runs)").fetchall()]
+    if "trigger" not in cols:
+        conn.execute("ALTER TABLE runs ADD COLUMN trigger TEXT")
+    if "stdout" in cols:
+        _move_legacy_output(conn)
+
+    s_cols = [r["name"] for r in conn.execute("PRAGMA table_info(schedules)").fetchall()]
+    if "cron" not in s_cols:
+        conn.execute("ALTER TABLE schedules ADD COLUMN cron TEXT")
+    if "tz" not in s_cols:
+        conn.execute("ALTER TABLE schedules ADD COLUMN tz TEXT")
+
+    sc_cols = [r["name"] for r in conn.execute("PRAGMA table_info(scripts)").fetchall()]
+    for col, decl in (
+        ("compress_codec", "TEXT"),
+        ("compress_level", "INTEGER"),
+        ("compress_min_bytes", "INTEGER"),
+        ("capture_head_bytes", "INTEGER"),
+        ("capture_tail_bytes", "INTEGER"),
+        ("mode", "TEXT NOT NULL DEFAULT 'process'"),
+        ("batch_max_events", "INTEGER"),
+        ("batch_max_wait_ms", "INTEGER"),
+    ):
+        if col not in sc_cols:
+            conn.execute(f"ALTER TABLE scripts ADD COLUMN {col} {decl}")
+
+    c_cols = [r["name"] for r in conn.execute("PRAGMA table_info(run_output_chunks)").fetchall()]
+    if "codec" not in c_cols:
+        conn.execute("ALTER TABLE run_output_chunks ADD COLUMN codec TEXT")
+    if "raw_size" not in c_cols:
+        conn.execute("ALTER TABLE run_output_chunks ADD COLUMN raw_size INTEGER")
+    if "elided" not in c_cols:
+        conn.execute("ALTER TABLE run_output_chunks ADD COLUMN elided INTEGER")
+
+    p_cols = [r["name"] for r in conn.execute("PRAGMA table_info(pending_events)").fetchall()]
+    if "queue_tag" not in p_cols:
+        conn.execute("ALTER TABLE pending_events ADD COLUMN queue_tag TEXT")
+    conn.execute("""
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_pending_waiting_queue_one
+    ON pending_events(script_id)
+    WHERE queue_tag='queue_one'
+    AND processed_at_utc IS NULL
+    AND claimed_at_utc IS NULL;
+    """)
+
+CONFIG_TABLES = (
+    "scripts",
+    "run_hooks",
+    "file_triggers",
+    "app_triggers",
+    "webhooks",
+    "subscriptions",
+    "daemon_hooks",
+    "signal_hooks",
+)
+
+def _migrate_v2_config_version(conn: sqlite3.Connection) -> None:
+    """
+    A counter that every write to a configuration table bumps, so caches
+    can tell cheaply whether they are stale.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS config_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute("INSERT OR IGNORE INTO config_version (id, version) VALUES (1, 0)")
+    for table in CONFIG_TABLES:
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{op.lower()}_config_version
+                AFTER {op} ON {table}
+                BEGIN
+                    UPDATE config_version SET version = version + 1 WHERE id = 1;
+                END
+                """
+            )
+
+def _migrate_v3_schedule_next_run(conn: sqlite3.Connection) -> None:
+    """
+    Persist each schedule's next fire time so the daemon can find due
+    schedules through an index. Existing rows start NULL and are filled in
+    by schedules_repo the first time the daemon loads them. Definition
+    changes bump config_version so ScheduleSource reloads its heap.
+    """
+    cols = [r["name"] for r in conn.execute("PRAGMA table_info(schedules)").fetchall()]
+    if "next_run_at_utc" not in cols:
+        conn.execute("ALTER TABLE schedules ADD COLUMN next_run_at_utc TEXT")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_schedules_next_run ON schedules(next_run_at_utc)"
+    )
+    for name, event in (
+        ("insert", "INSERT"),
+        ("delete", "DELETE"),
+        # Firing a schedule only touches last_run/next_run_at_utc.
+        ("update", "UPDATE OF script_id, interval_seconds, cron, tz"),
+    ):
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_schedules_{name}_config_version
+            AFTER {event} ON schedules
+            BEGIN
+                UPDATE config_version SET version = version + 1 WHERE id = 1;
+            END
+            """
+        )
+
+def _migrate_v4_source_stats(conn: sqlite3.Connection) -> None:
+    """
+    Poll timings per trigger source, written by the daemon so the CLI can
+    show what each source costs.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS source_stats (
+            name TEXT PRIMARY KEY,
+            interval_seconds REAL,
+            polls INTEGER NOT NULL DEFAULT 0,
+            events INTEGER NOT NULL DEFAULT 0,
+            total_ms REAL NOT NULL DEFAULT 0,
+            max_ms REAL NOT NULL DEFAULT 0,
+            last_ms REAL NOT NULL DEFAULT 0,
+            last_poll_at_utc TEXT
+        )
+        """
+    )
+
+def _migrate_v5_source_lag(conn: sqlite3.Connection) -> None:
+    """
+    How late each trigger source's events reach dispatch.
+    """
+    cols = [r["name"] for r in conn.execute("PRAGMA table_info(source_stats)").fetchall()]
+    for col in ("max_lag_ms", "last_lag_ms"):
+        if col not in cols:
+            conn.execute(f"ALTER TABLE source_stats ADD COLUMN {col} REAL NOT NULL DEFAULT 0")
+
+def _migrate_v6_file_trigger_globs(conn: sqlite3.Connection) -> None:
+    """
+    include/exclude glob lists (JSON arrays) of file triggers.
+    """
+    cols = [r["name"] for r in conn.execute("PRAGMA table_info(file_triggers)").fetchall()]
+    for col in ("include_globs", "exclude_globs"):
+        if col not in cols:
+            conn.execute(f"ALTER TABLE file_triggers ADD COLUMN {col} TEXT")
+
+def _migrate_v7_schedule_changes(conn: sqlite3.Connection) -> None:
+    """
+    Log of schedule ids whose definition changed, so ScheduleSource can
+    re-key just those rows instead of reloading its heap on every
+    config_version bump (webhook or hook edits included).
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schedule_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            schedule_id INTEGER NOT NULL
+        )
+        """
+    )
+    for name, event, row in (
+        ("insert", "INSERT", "NEW"),
+        ("delete", "DELETE", "OLD"),
+        # As in v3, firing a schedule (last_run/next_run_at_utc) is not a change.
+        ("update", "UPDATE OF script_id, interval_seconds, cron, tz", "NEW"),
+    ):
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_schedules_{name}_changes
+            AFTER {event} ON schedules
+            BEGIN
+                INSERT INTO schedule_changes (schedule_id) VALUES ({row}.id);
+            END
+            """
+        )
+
+# Schema changes go here as new functions; never edit a released step.
+# A database's PRAGMA user_version is the number of steps applied.
+MIGRATIONS: list[Callable[[sqlite3.Connection], None]] = [
+    _migrate_v1_baseline,
+    _migrate_v2_config_version,
+    _migrate_v3_schedule_next_run,
+    _migrate_v4_source_stats,
+    _migrate_v5_source_lag,
+    _migrate_v6_file_trigger_globs,
+    _migrate_v7_schedule_changes,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+class _ThreadConnection:
+    """
+    One thread's writer connection and its transaction depth. It lives in
+    a threading.local, so the connection is closed when its thread exits.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, generation: int, registry: dict, lock: threading.Lock) -> None:
+        self.conn = conn
+        self.generation = generation
+        self.tx_depth = 0
+        self._registry = registry
+        self._lock = lock
+        with lock:
+            registry[id(self)] = conn
+
+    def __del__(self) -> None:
+        with self._lock:
+            self._registry.pop(id(self), None)
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
 class Database:
-    def __init__(self, path: Optional[Path] = None):
+    """
+    Connection pool for one database file, safe to share between threads.
+
+    Each thread writes through its own connection (connect()); query()
+    borrows one of up to max_readers read-only connections, unless the
+    calling thread has a transaction open, in which case it reads through
+    its writer so it sees its own changes. cached_statements is the
+    prepared-statement cache size of every connection.
+
+    With readonly=True every connection is opened mode=ro with
+    PRAGMA query_only, writes fail, and init() only checks the schema
+    version, so readers never compete with the daemon for the write lock.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        cached_statements: int = DEFAULT_CACHED_STATEMENTS,
+        max_readers: int = DEFAULT_MAX_READERS,
+        readonly: bool = False,
+    ):
         self.path = path or DEFAULT_DB_PATH
-        self._conn: Optional[sqlite3.Connection] = None
-
-    def connect(self) -> sqlite3.Connection:
-        if self._conn is None:
-            self.path.parent.mkdir(parents=True, exist_ok=True)
-            conn = sqlite3.connect(self.path, timeout=5.0)
+        self.readonly = readonly
+        self.cached_statements = cached_statements
+        self.max_readers = max(1, int(max_readers))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._reader_free = threading.Condition(self._lock)
+        self._init_lock = threading.Lock()
+        self._writers: dict[int, sqlite3.Connection] = {}
+        self._idle_readers: list[sqlite3.Connection] = []
+        self._reader_count = 0
+        self._generation = 0
+        self._initialized = False
+        # A config_cache.ConfigCache, set by long-running processes.
+        self.config_cache = None
+
+    def _open(self, readonly: bool = False) -> sqlite3.Connection:
+        if readonly:
+            conn = sqlite3.connect(
+                Path(self.path).resolve().as_uri() + "?mode=ro",
+                uri=True,
+                timeout=5.0,
+                check_same_thread=False,
+                cached_statements=self.cached_statements,
+            )
             conn.row_factory = sqlite3.Row
-            conn.execute("PRAGMA foreign_keys = ON;")
             conn.execute("PRAGMA busy_timeout = 5000;")
-            # Recommended for multi-connection/multi-process durability & less locking pain
-            conn.execute("PRAGMA journal_mode = WAL;")
-            self._conn = conn
-        return self._conn
+            conn.execute("PRAGMA query_only = ON;")
+            return conn
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            self.path,
+            timeout=5.0,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON;")
+        conn.execute("PRAGMA busy_timeout = 5000;")
+        # Recommended for multi-connection/multi-process durability & less locking pain
+        conn.execute("PRAGMA journal_mode = WAL;")
+        return conn
+
+    def _writer(self) -> Optional[_ThreadConnection]:
+        holder = getattr(self._local, "writer", None)
+        if holder is not None and holder.generation != self._generation:
+            holder = self._local.writer = None
+        return holder
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        The calling thread's writer connection (read-only in readonly mode).
+        """
+        holder = self._writer()
+        if holder is None:
+            conn = self._open(readonly=self.readonly)
+            holder = _ThreadConnection(conn, self._generation, self._writers, self._lock)
+            self._local.writer = holder
+        return holder.conn
 
     def init(self) -> None:
+        """
+        Makes sure the schema is current. Only the first call per pool
+        looks at the database; later calls return immediately.
+        """
+        if self._initialized or self.in_transaction:
+            # Inside a transaction a migration would COMMIT it early; the
+            # schema is already in place by the time one is opened.
+            return
+        with self._init_lock:
+            if self._initialized:
+                return
+            if self.readonly:
+                self._init_readonly()
+                return
+            conn = self.connect()
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                self.migrate()
+            self._initialized = True
+
+    def _init_readonly(self) -> None:
+        # A missing or outdated database is the only case that needs a
+        # writable connection, and only once.
+        if not self.path.exists() or (
+            self.connect().execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION
+        ):
+            writable = Database(self.path)
+            writable.init()
+            writable.close()
+        self._initialized = True
+
+    @property
+    def in_transaction(self) -> bool:
+        holder = self._writer()
+        return holder is not None and holder.tx_depth > 0
+
+    @contextmanager
+    def transaction(self) -> Iterator["Database"]:
+        """
+        Groups every write this thread makes through this Database into one
+        commit. Nested calls join the outer transaction; an exception rolls
+        the whole unit back.
+        """
         conn = self.connect()
-        conn.executescript(SCHEMA)
-        conn.commit()
-        self.migrate()
+        holder = self._local.writer
+        holder.tx_depth += 1
+        try:
+            yield self
+        except BaseException:
+            holder.tx_depth -= 1
+            if holder.tx_depth == 0:
+                conn.rollback()
+            raise
+        holder.tx_depth -= 1
+        if holder.tx_depth == 0:
+            conn.commit()
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        holder = self._writer()
+        if (holder is not None and (holder.tx_depth or holder.conn.in_transaction)) or not self.path.exists():
+            yield self.connect()
+            return
+
+        with self._reader_free:
+            while not self._idle_readers and self._reader_count >= self.max_readers:
+                self._reader_free.wait()
+            conn = self._idle_readers.pop() if self._idle_readers else None
+            if conn is None:
+                self._reader_count += 1
+            generation = self._generation
+        if conn is None:
+            try:
+                conn = self._open(readonly=True)
+            except BaseException:
+                with self._reader_free:
+                    self._reader_count -= 1
+                    self._reader_free.notify()
+                raise
+        try:
+            yield conn
+        finally:
+            with self._reader_free:
+                if generation == self._generation:
+                    self._idle_readers.append(conn)
+                else:
+                    conn.close()
+                    self._reader_count -= 1
+                self._reader_free.notify()
+
+    def _commit(self, conn: sqlite3.Connection) -> None:
+        if not self.in_transaction:
+            conn.commit()
 
     def execute(self, sql: str, params: Iterable[Any] = ()) -> sqlite3.Cursor:
         conn = self.connect()
         cur = conn.execute(sql, tuple(params))
-        conn.commit()
+        self._commit(conn)
         return cur
 
     def query(self, sql: str, params: Iterable[Any] = ()) -> list[sqlite3.Row]:
-        conn = self.connect()
-        cur = conn.execute(sql, tuple(params))
-        return list(cur.fetchall())
+        with self._reader() as conn:
+            cur = conn.execute(sql, tuple(params))
+            return list(cur.fetchall())
 
     def execute_returning(self, sql: str, params: Sequence[Any] = ()) -> list[sqlite3.Row]:
         conn = self.connect()
         cur = conn.execute(sql, params)
         rows = cur.fetchall()
-        conn.commit()
+        self._commit(conn)
         return rows
 
     def migrate(self) -> None:
+        """
+        Runs every migration newer than the database's PRAGMA user_version,
+        in order, recording the version after each step.
+        """
         conn = self.connect()
-        cols = [r["name"] for r in conn.execute("PRAGMA table_info(runs)").fetchall()]
-        if "trigger" not in cols:
-            conn.execute("ALTER TABLE runs ADD COLUMN trigger TEXT")
-
-        s_cols = [r["name"] for r in conn.execute("PRAGMA table_info(schedules)").fetchall()]
-        if "cron" not in s_cols:
-            conn.execute("ALTER TABLE schedules ADD COLUMN cron TEXT")
-        if "tz" not in s_cols:
-            conn.execute("ALTER TABLE schedules ADD COLUMN tz TEXT")
-
-        p_cols = [r["name"] for r in conn.execute("PRAGMA table_info(pending_events)").fetchall()]
-        if "queue_tag" not in p_cols:
-            conn.execute("ALTER TABLE pending_events ADD COLUMN queue_tag TEXT")
-        conn.execute("""
-        CREATE UNIQUE INDEX IF NOT EXISTS ux_pending_waiting_queue_one
-        ON pending_events(script_id)
-        WHERE queue_tag='queue_one'
-        AND processed_at_utc IS NULL
-        AND claimed_at_utc IS NULL;
-        """)
-        conn.commit()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for target, step in enumerate(MIGRATIONS[version:], start=version + 1):
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
 
     def close(self) -> None:
-        if self._conn is not None:
-            self._conn.close()
-            self._conn = None
\ No newline at end of file
+        """
+        Closes every connection of the pool. Threads that use it again get
+        fresh connections.
+        """
+        with self._lock:
+            self._generation += 1
+            conns = list(self._writers.values()) + self._idle_readers
+            self._writers.clear()
+            self._reader_count -= len(self._idle_readers)
+            self._idle_readers = []
+            self._initialized = False
+        self._local.writer = None
+        for conn in conns:
+            conn.close()
\ No newline at end of file
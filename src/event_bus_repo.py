@@ -4,6 +4,7 @@ from typing import Any, Dict, List, Optional
 from datetime import datetime, timezone
 
 from .database import Database
+from .wakeup import notify_daemon
 
 def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
@@ -28,6 +29,7 @@ def publish_event(db: Database, topic: str, payload_json: Optional[str]) -> int:
         """,
         (event_id, topic),
     )
+    notify_daemon(db)
     return event_id
 
 def list_events(db: Database):
@@ -105,6 +107,11 @@ def claim_ready_deliveries(db: Database, owner: str, limit: int = 50) -> List[Di
             FROM deliveries d
             WHERE d.processed_at_utc IS NULL
                 AND d.claimed_at_utc IS NULL
+                AND d.subscription_id NOT IN (
+                    SELECT s.id FROM subscriptions s
+                    JOIN scripts sc ON sc.id = s.script_id
+                    WHERE sc.batch_max_events IS NOT NULL
+                )
             ORDER BY d.id ASC
             LIMIT ?
         )
@@ -143,4 +150,65 @@ def mark_delivery_processed(db: Database, delivery_id: int) -> None:
         UPDATE deliveries SET processed_at_utc = ? WHERE id = ?
         """,
         (now, delivery_id),
-    )
\ No newline at end of file
+    )
+
+def waiting_delivery_summary(db: Database, script_id: int) -> Dict[str, Any]:
+    """
+    Count and oldest event time of unclaimed deliveries for a script.
+    """
+    rows = db.query(
+        """
+        SELECT COUNT(*) AS n, MIN(e.created_at_utc) AS oldest
+        FROM deliveries d
+        JOIN subscriptions s ON s.id = d.subscription_id
+        JOIN events e ON e.id = d.event_id
+        WHERE s.script_id = ?
+          AND d.processed_at_utc IS NULL
+          AND d.claimed_at_utc IS NULL
+        """,
+        (script_id,),
+    )
+    r = dict(rows[0]) if rows else {}
+    return {"count": int(r.get("n") or 0), "oldest": r.get("oldest")}
+
+def claim_delivery_batch(db: Database, script_id: int, owner: str, limit: int) -> List[Dict[str, Any]]:
+    """
+    Claim up to `limit` unclaimed deliveries of one script, oldest first.
+    """
+    if limit <= 0:
+        return []
+    now = _utc_now_iso()
+    rows = db.execute_returning(
+        """
+        UPDATE deliveries
+        SET claimed_at_utc = ?, claimed_by = ?
+        WHERE id IN (
+            SELECT d.id
+            FROM deliveries d
+            JOIN subscriptions s ON s.id = d.subscription_id
+            WHERE s.script_id = ?
+                AND d.processed_at_utc IS NULL
+                AND d.claimed_at_utc IS NULL
+            ORDER BY d.id ASC
+            LIMIT ?
+        )
+        RETURNING id
+        """,
+        (now, owner, script_id, limit),
+    )
+    if not rows:
+        return []
+
+    delivery_ids = [int(r["id"]) for r in rows]
+    qmarks = ",".join("?" for _ in delivery_ids)
+    found = db.query(
+        f"""
+        SELECT d.id AS delivery_id, d.event_id, e.topic, e.payload_json
+        FROM deliveries d
+        JOIN events e ON e.id = d.event_id
+        WHERE d.id IN ({qmarks})
+        ORDER BY d.id ASC
+        """,
+        tuple(delivery_ids),
+    )
+    return [dict(r) for r in found]
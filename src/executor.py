@@ -1,8 +1,18 @@
 from __future__ import annotations
 
+import asyncio
+import codecs
 import subprocess
+import threading
+import traceback
+from concurrent.futures import Future
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, Optional
+
+EXECUTORS = ("subprocess", "asyncio")
+DEFAULT_EXECUTOR = "subprocess"
+
+READ_CHUNK_BYTES = 64 * 1024
 
 @dataclass
 class ExecResult:
@@ -10,17 +20,243 @@ class ExecResult:
     stdout: str
     stderr: str
 
-def run_command(command: str, working_dir: Optional[str] = None, timeout: int = 60) -> ExecResult:
+OutputCallback = Callable[[str], None]
+
+def deliver(on_chunk: Optional[OutputCallback], text: str) -> None:
+    """
+    Hands text to on_chunk, logging rather than raising its errors: the
+    pipe must keep being drained or the child blocks once it fills up.
+    """
+    if not on_chunk:
+        return
+    try:
+        on_chunk(text)
+    except Exception:
+        traceback.print_exc()
+
+def _read_pipe(pipe, parts: Optional[list[str]], on_chunk: Optional[OutputCallback]) -> None:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with pipe:
+        while True:
+            data = pipe.read1(READ_CHUNK_BYTES)
+            text = decoder.decode(data, final=not data)
+            if text:
+                if parts is not None:
+                    parts.append(text)
+                deliver(on_chunk, text)
+            if not data:
+                return
+
+def _feed_stdin(pipe, data: str) -> None:
+    try:
+        with pipe:
+            pipe.write(data.encode("utf-8"))
+    except BrokenPipeError:
+        pass
+
+def _run_streaming(
+    command: str,
+    working_dir: Optional[str],
+    timeout: int,
+    on_stdout: Optional[OutputCallback],
+    on_stderr: Optional[OutputCallback],
+    capture: bool,
+    stdin_data: Optional[str],
+) -> ExecResult:
+    proc = subprocess.Popen(
+        command,
+        shell=True,
+        cwd=working_dir,
+        stdin=subprocess.PIPE if stdin_data is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    out: Optional[list[str]] = [] if capture else None
+    err: Optional[list[str]] = [] if capture else None
+    readers = [
+        threading.Thread(target=_read_pipe, args=(proc.stdout, out, on_stdout), daemon=True),
+        threading.Thread(target=_read_pipe, args=(proc.stderr, err, on_stderr), daemon=True),
+    ]
+    if stdin_data is not None:
+        readers.append(threading.Thread(target=_feed_stdin, args=(proc.stdin, stdin_data), daemon=True))
+    for t in readers:
+        t.start()
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        for t in readers:
+            t.join()
+    return ExecResult(
+        exit_code=proc.returncode,
+        stdout="".join(out or []),
+        stderr="".join(err or []),
+    )
+
+def run_command(
+    command: str,
+    working_dir: Optional[str] = None,
+    timeout: int = 60,
+    on_stdout: Optional[OutputCallback] = None,
+    on_stderr: Optional[OutputCallback] = None,
+    capture: bool = True,
+    stdin_data: Optional[str] = None,
+) -> ExecResult:
+    """
+    Runs a shell command and waits for it. When on_stdout/on_stderr are given,
+    output is handed over chunk by chunk as it arrives; with capture=False it
+    is not also accumulated into the returned ExecResult. stdin_data, if set,
+    is written to the child's stdin.
+    """
+    if on_stdout or on_stderr or not capture:
+        return _run_streaming(command, working_dir, timeout, on_stdout, on_stderr, capture, stdin_data)
+
     proc = subprocess.run(
-        command, 
+        command,
         shell=True,
         cwd=working_dir,
         capture_output=True,
         text=True,
         timeout=timeout,
+        input=stdin_data,
     )
     return ExecResult(
         exit_code=proc.returncode,
         stdout=proc.stdout or "",
         stderr=proc.stderr or "",
-    )
\ No newline at end of file
+    )
+
+async def _pump(stream: asyncio.StreamReader, parts: Optional[list[str]], on_chunk: Optional[OutputCallback]) -> None:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        data = await stream.read(READ_CHUNK_BYTES)
+        text = decoder.decode(data, final=not data)
+        if text:
+            if parts is not None:
+                parts.append(text)
+            if on_chunk:
+                # Off the loop: the callback may store output, and while it
+                # does, this pipe isn't read, so the child waits for us.
+                await asyncio.to_thread(deliver, on_chunk, text)
+        if not data:
+            return
+
+async def _feed(stream: Optional[asyncio.StreamWriter], data: Optional[str]) -> None:
+    if stream is None or data is None:
+        return
+    try:
+        stream.write(data.encode("utf-8"))
+        await stream.drain()
+        stream.close()
+    except (BrokenPipeError, ConnectionResetError):
+        pass
+
+async def run_command_async(
+    command: str,
+    working_dir: Optional[str] = None,
+    timeout: int = 60,
+    on_stdout: Optional[OutputCallback] = None,
+    on_stderr: Optional[OutputCallback] = None,
+    capture: bool = True,
+    stdin_data: Optional[str] = None,
+) -> ExecResult:
+    """
+    asyncio counterpart of run_command. stdout/stderr are read incrementally
+    and each decoded chunk is handed to on_stdout/on_stderr as it arrives.
+    """
+    proc = await asyncio.create_subprocess_shell(
+        command,
+        cwd=working_dir,
+        stdin=asyncio.subprocess.PIPE if stdin_data is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    out: Optional[list[str]] = [] if capture else None
+    err: Optional[list[str]] = [] if capture else None
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(
+                _feed(proc.stdin, stdin_data),
+                _pump(proc.stdout, out, on_stdout),
+                _pump(proc.stderr, err, on_stderr),
+                proc.wait(),
+            ),
+            timeout=timeout,
+        )
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise subprocess.TimeoutExpired(command, timeout, "".join(out or []), "".join(err or []))
+    return ExecResult(exit_code=proc.returncode, stdout="".join(out or []), stderr="".join(err or []))
+
+class AsyncioRunner:
+    """
+    Owns one background event loop that supervises every child process.
+    submit() returns a Future without blocking; run() waits on it. The
+    loop does the pipe I/O; output callbacks run on worker threads, one
+    chunk at a time per pipe.
+    """
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                t = threading.Thread(target=loop.run_forever, name="scripter-asyncio", daemon=True)
+                t.start()
+                self._loop = loop
+            return self._loop
+
+    def submit(self, command: str, working_dir: Optional[str] = None, timeout: int = 60, **kwargs) -> Future:
+        return asyncio.run_coroutine_threadsafe(
+            run_command_async(command, working_dir=working_dir, timeout=timeout, **kwargs),
+            self._ensure_loop(),
+        )
+
+    def run(self, command: str, working_dir: Optional[str] = None, timeout: int = 60, **kwargs) -> ExecResult:
+        return self.submit(command, working_dir=working_dir, timeout=timeout, **kwargs).result()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
+
+_asyncio_runner = AsyncioRunner()
+
+def get_executor(name: str = DEFAULT_EXECUTOR) -> Callable[..., ExecResult]:
+    """
+    Returns a blocking run_command-compatible callable for the named executor.
+    """
+    if name == "subprocess":
+        return run_command
+    if name == "asyncio":
+        return _asyncio_runner.run
+    raise ValueError(f"Unknown executor: {name!r} (expected one of {', '.join(EXECUTORS)})")
+
+def call_as_future(fn: Callable[..., ExecResult], *args, **kwargs) -> Future:
+    """
+    Runs fn now and returns its result (or exception) as a done Future.
+    """
+    fut: Future = Future()
+    try:
+        fut.set_result(fn(*args, **kwargs))
+    except Exception as e:
+        fut.set_exception(e)
+    return fut
+
+def submit_command(name: str, command: str, **kwargs) -> Future:
+    """
+    get_executor(name)(command, ...) as a Future of the ExecResult. With
+    the asyncio executor this returns at once and the child runs on the
+    shared loop; subprocess runs the command before returning.
+    """
+    if name == "asyncio":
+        return _asyncio_runner.submit(command, **kwargs)
+    return call_as_future(get_executor(name), command, **kwargs)
@@ -1,33 +1,63 @@
 from __future__ import annotations
 
+import json
 from datetime import datetime, timezone
+from typing import Any, List, Optional, Sequence
+
+from .config_cache import cached
 from .database import Database
+from .path_filter import PathFilter, make_filter
 
 def _now_iso():
     return datetime.now(timezone.utc).isoformat()
 
-def add_file_trigger(db: Database, script_id: int, path: str, recursive: bool = False) -> int:
+def _globs_json(patterns: Optional[Sequence[str]]) -> Optional[str]:
+    patterns = [p for p in (patterns or []) if p]
+    return json.dumps(patterns) if patterns else None
+
+def globs(value: Optional[str]) -> List[str]:
+    """
+    A stored include_globs/exclude_globs column as a list.
+    """
+    return list(json.loads(value)) if value else []
+
+def add_file_trigger(
+    db: Database,
+    script_id: int,
+    path: str,
+    recursive: bool = False,
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+) -> int:
     db.init()
     cur = db.execute(
         """
-        INSERT INTO file_triggers (script_id, path, recursive, created_at)
-        VALUES (?, ?, ?, ?)
+        INSERT INTO file_triggers (script_id, path, recursive, created_at, include_globs, exclude_globs)
+        VALUES (?, ?, ?, ?, ?, ?)
         """,
-        (script_id, path, int(recursive), _now_iso()),
+        (script_id, path, int(recursive), _now_iso(), _globs_json(include), _globs_json(exclude)),
     )
     return int(cur.lastrowid)
 
 def list_file_triggers(db: Database):
     db.init()
-    return db.query(
-        """
-        SELECT ft.id, ft.script_id, s.name as script_name, ft.path, ft.recursive
-        FROM file_triggers ft
-        JOIN scripts s ON s.id = ft.script_id
-        ORDER BY ft.id ASC"""
+    return cached(
+        db,
+        ("file_triggers",),
+        lambda: db.query(
+            """
+            SELECT ft.id, ft.script_id, s.name as script_name, ft.path, ft.recursive,
+                   ft.include_globs, ft.exclude_globs
+            FROM file_triggers ft
+            JOIN scripts s ON s.id = ft.script_id
+            ORDER BY ft.id ASC"""
+        ),
     )
 
+def file_trigger_filter(row: Any) -> Optional[PathFilter]:
+    return make_filter(globs(row["include_globs"]), globs(row["exclude_globs"]))
+
 def remove_file_trigger(db: Database, trigger_id: int) -> int:
     db.init()
     cur = db.execute("DELETE FROM file_triggers WHERE id = ?", (trigger_id,))
-    return cur.rowcount
\ No newline at end of file
+    return cur.rowcount
@@ -1,60 +1,220 @@
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Dict
-import os 
+import os
+import sys
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .path_filter import PathFilter
+
+# Per scan() call, how long to spend stat()ing files of directories whose
+# listing didn't change. Directories are still checked every scan.
+DEFAULT_STAT_BUDGET_SECONDS = 0.05
+
+# A directory modified this recently may change again within the same
+# timestamp tick (coarse on some filesystems), so it isn't trusted yet.
+_RACY_NS = 2_000_000_000
+
+# A watched base: (path, recursive, filter).
+Key = Tuple[str, bool, Optional[PathFilter]]
+
+class _Dir:
+    """
+    One directory's listing: sorted file names (interned) with parallel
+    arrays of st_mtime_ns and st_size, plus subdirectory names.
+    """
+
+    __slots__ = ("mtime_ns", "names", "mtimes", "sizes", "subdirs")
+
+    def __init__(self, mtime_ns: int, names: Tuple[str, ...], mtimes: array, sizes: array, subdirs: Tuple[str, ...]) -> None:
+        self.mtime_ns = mtime_ns
+        self.names = names
+        self.mtimes = mtimes
+        self.sizes = sizes
+        self.subdirs = subdirs
+
+    def same_files(self, other: "_Dir") -> bool:
+        return self.names == other.names and self.mtimes == other.mtimes and self.sizes == other.sizes
+
+class _Tree:
+    __slots__ = ("dirs", "order", "cursor")
+
+    def __init__(self) -> None:
+        self.dirs: Dict[str, _Dir] = {}
+        self.order: List[str] = []
+        self.cursor = 0
 
 class FileWatcher:
-    def __init__(self):
-        self._state: Dict[str, Dict[str, float]] = {}
-    
-    def scan(self, base_path: str, recursive: bool) -> bool:
+    """
+    Polling change detection for file triggers.
+
+    Directories are listed with os.scandir and only re-listed when their
+    own mtime changes, which covers files being added, removed or renamed.
+    In-place writes don't touch the directory, so files are also stat()ed
+    round-robin, for at most stat_budget_seconds per scan: small trees are
+    fully checked every scan, huge ones over a few. None checks every file
+    every scan. A PathFilter's excluded directories are never listed.
+    """
+
+    def __init__(self, stat_budget_seconds: Optional[float] = DEFAULT_STAT_BUDGET_SECONDS) -> None:
+        self.stat_budget_seconds = stat_budget_seconds
+        self._trees: Dict[Key, _Tree] = {}
+        self._files: Dict[str, Tuple[int, int]] = {}
+
+    def scan(self, base_path: str, recursive: bool, path_filter: Optional[PathFilter] = None) -> bool:
         """
         Returns True if any file changed since last scan.
         """
-        base = Path(base_path)
-        
-        if not base.exists():
-            self._state.pop(base_path, None)
-            return False
-        
-        files: list[Path] = []
-
-        if base.is_file():
-            file = [base]
-
-        elif base.is_dir():
-            if recursive:
-                for root, _, filenames in os.walk(base):
-                    for name in filenames:
-                        files.append(Path(root) / name)
-            else:
-                files = [p for p in base.iterdir() if p.is_file()]
-        else:
-            return False
-        
-
-        current: Dict[str, float] = {}
-        for p in files:
+        return bool(self.changes(base_path, recursive, path_filter))
+
+    def changes(self, base_path: str, recursive: bool, path_filter: Optional[PathFilter] = None) -> Set[str]:
+        """
+        The directories under base_path whose files changed since the last
+        call (base_path itself for a file).
+        """
+        key = (base_path, bool(recursive), path_filter)
+        try:
+            st = os.stat(base_path)
+        except OSError:
+            self.forget(key)
+            return set()
+
+        if os.path.isdir(base_path):
+            self._files.pop(base_path, None)
+            changed: Set[str] = set()
+            tree = self._trees.get(key)
+            if tree is None:
+                tree = self._trees[key] = _Tree()
+                self._walk(tree, key, changed)
+                return set()
+            self._walk(tree, key, changed)
+            self._check_files(tree, changed)
+            return changed
+
+        self._trees.pop(key, None)
+        current = (st.st_mtime_ns, st.st_size)
+        previous = self._files.get(base_path)
+        self._files[base_path] = current
+        return {base_path} if previous is not None and previous != current else set()
+
+    def retain(self, keys: Iterable[Key]) -> None:
+        """
+        Drops the state of bases that are no longer in keys.
+        """
+        keep = set(keys)
+        for key in [k for k in self._trees if k not in keep]:
+            del self._trees[key]
+        paths = {key[0] for key in keep}
+        for path in [p for p in self._files if p not in paths]:
+            del self._files[path]
+
+    def forget(self, key: Key) -> None:
+        self._trees.pop(key, None)
+        self._files.pop(key[0], None)
+
+    def _walk(self, tree: _Tree, key: Key, changed: Set[str]) -> None:
+        """
+        Re-lists directories whose mtime changed, adding those whose
+        listing differs from what was recorded to changed.
+        """
+        base, recursive, path_filter = key
+        now_ns = time.time_ns()
+        order: List[str] = []
+        stack = [(base, "")]
+        while stack:
+            path, rel = stack.pop()
+            old = tree.dirs.get(path)
             try:
-                current[str(p)] = p.stat().st_mtime
+                mtime_ns = os.stat(path).st_mtime_ns
             except OSError:
                 continue
+            if old is None or old.mtime_ns != mtime_ns:
+                listing = _read_dir(path, rel, recursive, path_filter, mtime_ns, now_ns)
+                if listing is None:
+                    continue
+                # A new directory only matters if it brought files along.
+                if listing.names if old is None else not old.same_files(listing):
+                    changed.add(path)
+                tree.dirs[path] = listing
+                old = listing
+            order.append(path)
+            for name in reversed(old.subdirs):
+                stack.append((os.path.join(path, name), f"{rel}/{name}" if rel else name))
+
+        if len(order) != len(tree.dirs):
+            kept = set(order)
+            for path in [p for p in tree.dirs if p not in kept]:
+                if tree.dirs.pop(path).names:
+                    changed.add(path)
+        if order != tree.order:
+            tree.order = order
+            tree.cursor = 0
+
+    def _check_files(self, tree: _Tree, changed: Set[str]) -> None:
+        """
+        stat()s files round-robin from where the last scan stopped.
+        """
+        if not tree.order:
+            return
+        deadline = None
+        if self.stat_budget_seconds is not None:
+            deadline = time.perf_counter() + self.stat_budget_seconds
+
+        cursor = tree.cursor % len(tree.order)
+        for _ in range(len(tree.order)):
+            path = tree.order[cursor]
+            cursor = (cursor + 1) % len(tree.order)
+            listing = tree.dirs[path]
+            for i, name in enumerate(listing.names):
+                try:
+                    st = os.stat(os.path.join(path, name))
+                except OSError:
+                    # Removed since the listing: re-list on the next scan.
+                    listing.mtime_ns = -1
+                    changed.add(path)
+                    break
+                if st.st_mtime_ns != listing.mtimes[i] or st.st_size != listing.sizes[i]:
+                    listing.mtimes[i] = st.st_mtime_ns
+                    listing.sizes[i] = st.st_size
+                    changed.add(path)
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        tree.cursor = cursor
+
+def _read_dir(
+    path: str, rel: str, recursive: bool, path_filter: Optional[PathFilter], mtime_ns: int, now_ns: int
+) -> Optional[_Dir]:
+    files: List[Tuple[str, int, int]] = []
+    subdirs: List[str] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    child = f"{rel}/{entry.name}" if rel else entry.name
+                    if entry.is_dir():
+                        # Like os.walk: symlinked directories aren't followed.
+                        if recursive and not entry.is_symlink():
+                            if path_filter is None or not path_filter.excludes_dir(child):
+                                subdirs.append(sys.intern(entry.name))
+                    elif entry.is_file():
+                        if path_filter is not None and not path_filter.wants_file(child):
+                            continue
+                        st = entry.stat()
+                        files.append((sys.intern(entry.name), st.st_mtime_ns, st.st_size))
+                except OSError:
+                    continue
+    except OSError:
+        return None
 
-        previous = self._state.get(base_path)
-        
-        if previous is None:
-            self._state[base_path] = current
-            return False
-        
-        if current.keys() != previous.keys():
-            self._state[base_path] = current
-            return True
-        
-        for path_str, mtime in current.items():
-            if previous.get(path_str) != mtime:
-                self._state[base_path] = current
-                return True
-
-        self._state[base_path] = current
-        return False
\ No newline at end of file
+    files.sort()
+    subdirs.sort()
+    if now_ns - mtime_ns < _RACY_NS:
+        mtime_ns = -1
+    return _Dir(
+        mtime_ns,
+        tuple(f[0] for f in files),
+        array("q", (f[1] for f in files)),
+        array("q", (f[2] for f in files)),
+        tuple(subdirs),
+    )
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import ctypes
+import errno
+import os
+import struct
+import sys
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .path_filter import PathFilter
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+
+DIR_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    | IN_DELETE_SELF | IN_MOVE_SELF | IN_DONT_FOLLOW | IN_EXCL_UNLINK
+)
+FILE_MASK = IN_MODIFY | IN_ATTRIB | IN_DELETE_SELF | IN_MOVE_SELF
+
+_EVENT = struct.Struct("iIII")
+
+# A watched base: (path, recursive, filter), as in file_triggers.
+Key = Tuple[str, bool, Optional[PathFilter]]
+
+class InotifyWatcher:
+    """
+    FileWatcher.scan() backed by Linux inotify: directories are watched
+    once and scan() only drains the kernel's event queue, so a tick costs
+    a read() instead of a stat() per file.
+
+    Like the polling scan, the first scan of a path records a baseline and
+    returns False, directory-only changes of non-recursive triggers don't
+    count, and a path that doesn't exist is retried on later scans.
+    Directories a PathFilter excludes get no watch.
+    add_watch failures (e.g. ENOSPC past fs.inotify.max_user_watches) are
+    raised as OSError so the caller can poll that path instead.
+    """
+
+    def __init__(self, libc: ctypes.CDLL, fd: int) -> None:
+        self._libc = libc
+        self._fd = fd
+        self._paths: Dict[int, str] = {}
+        self._wds: Dict[str, int] = {}
+        self._keys: Dict[int, Set[Key]] = {}
+        self._bases: Dict[Key, Set[int]] = {}
+        # Per base, the directories (or the file) that changed.
+        self._dirty: Dict[Key, Set[str]] = {}
+
+    @classmethod
+    def create(cls) -> Optional["InotifyWatcher"]:
+        """
+        None where inotify isn't available.
+        """
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        except (OSError, AttributeError):
+            return None
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        return cls(libc, fd)
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def scan(self, base_path: str, recursive: bool, path_filter: Optional[PathFilter] = None) -> bool:
+        """
+        Returns True if anything under base_path changed since last scan.
+        """
+        return bool(self.changes(base_path, recursive, path_filter))
+
+    def changes(self, base_path: str, recursive: bool, path_filter: Optional[PathFilter] = None) -> Set[str]:
+        """
+        The directories under base_path whose files changed since the last
+        call (base_path itself for a file).
+        """
+        self._read_events()
+        key = (base_path, bool(recursive), path_filter)
+        changed = self._dirty.pop(key, set())
+        if key not in self._bases and os.path.exists(base_path):
+            self._watch_base(key)
+        return changed
+
+    def retain(self, keys: Iterable[Key]) -> None:
+        """
+        Stops watching bases that are no longer in keys.
+        """
+        keep = set(keys)
+        for key in [k for k in self._bases if k not in keep]:
+            self.forget(key)
+            self._dirty.pop(key, None)
+
+    def forget(self, key: Key) -> None:
+        for wd in self._bases.pop(key, set()):
+            self._release(wd, key)
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __del__(self) -> None:
+        self.close()
+
+    def _watch_base(self, key: Key) -> None:
+        base, recursive, _ = key
+        self._bases[key] = set()
+        try:
+            if not os.path.isdir(base):
+                self._add(key, base, FILE_MASK)
+            elif recursive:
+                self._watch_tree(key, base)
+            else:
+                self._add(key, base, DIR_MASK)
+        except OSError:
+            self.forget(key)
+            raise
+
+    def _watch_tree(self, key: Key, top: str) -> List[str]:
+        """
+        Watches top and every directory below it. Returns the directories
+        that already hold files, which watches added now have missed.
+        """
+        path_filter = key[2]
+        with_files = []
+        for root, dirs, files in os.walk(top):
+            self._add(key, root, DIR_MASK)
+            if path_filter is not None:
+                rel = _rel(key[0], root)
+                # Pruned here, so excluded trees are never walked or watched.
+                dirs[:] = [d for d in dirs if not path_filter.excludes_dir(_join(rel, d))]
+                files = [f for f in files if path_filter.wants_file(_join(rel, f))]
+            if files:
+                with_files.append(root)
+        return with_files
+
+    def _mark(self, key: Key, path: str) -> None:
+        self._dirty.setdefault(key, set()).add(path)
+
+    def _watched_dirs(self, key: Key) -> List[str]:
+        return [self._paths[wd] for wd in self._bases.get(key, ()) if wd in self._paths]
+
+    def _add(self, key: Key, path: str, mask: int) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):
+                # Gone before we got to it; its parent's event covers it.
+                return
+            raise OSError(err, os.strerror(err), path)
+        old = self._paths.get(wd)
+        if old is not None and old != path:
+            self._wds.pop(old, None)
+        self._paths[wd] = path
+        self._wds[path] = wd
+        self._keys.setdefault(wd, set()).add(key)
+        self._bases[key].add(wd)
+
+    def _release(self, wd: int, key: Key) -> None:
+        keys = self._keys.get(wd)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            self._libc.inotify_rm_watch(self._fd, wd)
+            self._drop(wd)
+
+    def _drop(self, wd: int) -> None:
+        path = self._paths.pop(wd, None)
+        if path is not None and self._wds.get(path) == wd:
+            del self._wds[path]
+        for key in self._keys.pop(wd, set()):
+            wds = self._bases.get(key)
+            if wds is not None:
+                wds.discard(wd)
+
+    def _read_events(self) -> None:
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                self._handle(wd, mask, os.fsdecode(name))
+
+    def _handle(self, wd: int, mask: int, name: str) -> None:
+        if mask & IN_Q_OVERFLOW:
+            # Events were lost; report everything as changed.
+            for key in self._bases:
+                self._dirty.setdefault(key, set()).update(self._watched_dirs(key) or [key[0]])
+            return
+        path = self._paths.get(wd)
+        keys = set(self._keys.get(wd, ()))
+        if path is None or not keys:
+            return
+
+        if mask & IN_IGNORED:
+            self._drop(wd)
+        if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+            for key in keys:
+                if key[0] == path:
+                    # The base itself went away: re-established by a later scan.
+                    self._dirty.setdefault(key, set()).update(self._watched_dirs(key) or [path])
+                    self.forget(key)
+            return
+
+        if not mask & IN_ISDIR:
+            for key in keys:
+                # No name: the event is about a watched file itself.
+                if not name or key[2] is None or key[2].wants_file(_join(_rel(key[0], path), name)):
+                    self._mark(key, path)
+            return
+
+        child = os.path.join(path, name)
+        for key in keys:
+            if not key[1]:
+                continue
+            if key[2] is not None and key[2].excludes_dir(_join(_rel(key[0], path), name)):
+                continue
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                try:
+                    for found in self._watch_tree(key, child):
+                        self._mark(key, found)
+                except OSError:
+                    # Out of watches: report it, at least.
+                    self._mark(key, child)
+            elif mask & IN_MOVED_FROM:
+                # Its files left the tree; watches below it are stale.
+                for gone in self._unwatch_below(key, child):
+                    self._mark(key, gone)
+
+    def _unwatch_below(self, key: Key, top: str) -> List[str]:
+        prefix = top + os.sep
+        gone = [top]
+        for path, wd in list(self._wds.items()):
+            if path == top or path.startswith(prefix):
+                self._bases.get(key, set()).discard(wd)
+                self._release(wd, key)
+                gone.append(path)
+        return gone
+
+def _rel(base: str, path: str) -> str:
+    """
+    path relative to base, "/"-separated as PathFilter expects.
+    """
+    if path == base:
+        return ""
+    return path[len(base):].lstrip(os.sep).replace(os.sep, "/")
+
+def _join(rel: str, name: str) -> str:
+    return f"{rel}/{name}" if rel else name
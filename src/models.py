@@ -1,12 +1,28 @@
 from __future__ import annotations
-from pydantic import BaseModel
+from dataclasses import dataclass, fields
 from typing import Optional
 
-class Script(BaseModel):
+@dataclass(frozen=True, slots=True)
+class Script:
+    """
+    One scripts row. Built straight from SELECT SCRIPT_COLUMNS without
+    validation; the database schema is the contract.
+    """
     id: int
     name: str
     command: str
     working_dir: Optional[str] = None
-    created_at: str
-    updated_at: str
+    created_at: str = ""
+    updated_at: str = ""
     concurrency_policy: str = "allow"
+    compress_codec: Optional[str] = None
+    compress_level: Optional[int] = None
+    compress_min_bytes: Optional[int] = None
+    capture_head_bytes: Optional[int] = None
+    capture_tail_bytes: Optional[int] = None
+    mode: str = "process"
+    batch_max_events: Optional[int] = None
+    batch_max_wait_ms: Optional[int] = None
+
+# Column order matches the Script fields, so a row maps positionally.
+SCRIPT_COLUMNS = ", ".join(f.name for f in fields(Script))
@@ -4,6 +4,7 @@ from typing import Any, Dict, List, Optional
 from datetime import datetime, timezone
 
 from .database import Database
+from .wakeup import notify_daemon
 
 def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
@@ -17,31 +18,46 @@ def add_one_shot(db: Database, script_id: int, run_at_utc_iso: str, tz: Optional
         """,
         (script_id, run_at_utc_iso, tz, created),
     )
+    # The daemon may be asleep until a later one-shot.
+    notify_daemon(db)
     return int(cur.lastrowid)
 
 def list_one_shots(db: Database, include_fired: bool = False) -> List[Dict[str, Any]]:
     if include_fired:
-        cur = db.execute(
+        rows = db.query(
             """
             SELECT id, script_id, run_at_utc, tz, fired_at_utc, created_at_utc FROM one_shots
             ORDER BY run_at_utc ASC
             """
         )
     else:
-        cur = db.execute(
+        rows = db.query(
             """
             SELECT id, script_id, run_at_utc, tz, fired_at_utc, created_at_utc
             FROM one_shots
-            WHERE fired_at_utc IS NULLL
+            WHERE fired_at_utc IS NULL
             ORDER BY run_at_utc ASC
             """
         )
-    return [dict(r) for r in cur.fetchall()]
+    return [dict(r) for r in rows]
 
 def remove_one_shot(db: Database, one_shot_id: int) -> int:
     cur = db.execute("DELETE FROM one_shots WHERE id = ?", (one_shot_id,))
     return int(cur.rowcount)
 
+def next_one_shot_at(db: Database) -> Optional[datetime]:
+    rows = db.query(
+        """
+        SELECT MIN(run_at_utc) AS run_at_utc
+        FROM one_shots
+        WHERE fired_at_utc IS NULL
+        """
+    )
+    if not rows or rows[0]["run_at_utc"] is None:
+        return None
+    at = datetime.fromisoformat(rows[0]["run_at_utc"])
+    return at if at.tzinfo else at.replace(tzinfo=timezone.utc)
+
 def claim_due_one_shots(db: Database, now_utc_iso: str, limit: int = 50) -> List[Dict[str, Any]]:
     """
     Atomically claim due one-shots so they fire only once.
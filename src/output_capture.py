@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+class RingBuffer:
+    """
+    Fixed-size byte ring that keeps the last `size` bytes written to it.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._size = max(0, int(size))
+        self._buf = bytearray(self._size)
+        self._pos = 0
+        self._len = 0
+
+    def write(self, data: bytes) -> int:
+        """
+        Appends data and returns how many older bytes fell out of the ring.
+        """
+        n = len(data)
+        size = self._size
+        dropped = max(0, self._len + n - size)
+        if size == 0:
+            return dropped
+
+        if n >= size:
+            self._buf[:] = data[n - size:]
+            self._pos = 0
+            self._len = size
+            return dropped
+
+        end = self._pos + n
+        if end <= size:
+            self._buf[self._pos:end] = data
+        else:
+            first = size - self._pos
+            self._buf[self._pos:] = data[:first]
+            self._buf[:n - first] = data[first:]
+        self._pos = end % size
+        self._len = min(size, self._len + n)
+        return dropped
+
+    def getvalue(self) -> bytes:
+        if self._len < self._size:
+            return bytes(self._buf[:self._len])
+        return bytes(self._buf[self._pos:] + self._buf[:self._pos])
+
+@dataclass(frozen=True)
+class CapturePolicy:
+    """
+    Keep the first head_bytes and last tail_bytes of a stream. None for
+    both means keep everything.
+    """
+    head_bytes: Optional[int] = None
+    tail_bytes: Optional[int] = None
+
+    @property
+    def limited(self) -> bool:
+        return self.head_bytes is not None or self.tail_bytes is not None
+
+UNLIMITED = CapturePolicy()
+
+def capture_for(script: Any) -> CapturePolicy:
+    head = getattr(script, "capture_head_bytes", None)
+    tail = getattr(script, "capture_tail_bytes", None)
+    return CapturePolicy(
+        head_bytes=None if head is None else int(head),
+        tail_bytes=None if tail is None else int(tail),
+    )
+
+def _char_start(raw: bytes, i: int) -> int:
+    """
+    i moved back to the start of the UTF-8 character it falls in.
+    """
+    while 0 < i < len(raw) and raw[i] & 0xC0 == 0x80:
+        i -= 1
+    return i
+
+class HeadTailCapture:
+    """
+    Per-stream capture state. feed() returns the part of the text that is
+    still within the head budget; everything after it goes through the
+    tail ring, and finish() returns that tail plus the bytes dropped.
+    Both are cut on character boundaries, so a budget may keep a few
+    bytes less than asked but never splits a character.
+    """
+
+    def __init__(self, policy: CapturePolicy) -> None:
+        self._head_left = max(0, policy.head_bytes or 0)
+        self._tail = RingBuffer(policy.tail_bytes or 0)
+        self.dropped = 0
+
+    def feed(self, text: str) -> str:
+        raw = text.encode("utf-8", errors="replace")
+        cut = _char_start(raw, min(self._head_left, len(raw)))
+        if cut == len(raw):
+            self._head_left -= cut
+            return text
+        # Whatever doesn't fit ends the head, even if a later, shorter
+        # character would: the head must stay in order.
+        self._head_left = 0
+        self.dropped += self._tail.write(raw[cut:])
+        return raw[:cut].decode("utf-8")
+
+    def finish(self) -> tuple[str, int]:
+        raw = self._tail.getvalue()
+        start = 0
+        if self.dropped:
+            # The ring may begin inside a character whose lead byte fell out.
+            while start < len(raw) and raw[start] & 0xC0 == 0x80:
+                start += 1
+        return raw[start:].decode("utf-8", errors="replace"), self.dropped + start
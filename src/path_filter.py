@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from typing import Iterable, Optional, Tuple
+
+@dataclass(frozen=True, slots=True)
+class PathFilter:
+    """
+    include/exclude globs of a file trigger, matched against paths
+    relative to the trigger's path ("src/app.py").
+
+    A pattern without "/" matches a single name at any depth, so
+    "node_modules" or "*.tmp" work anywhere in the tree; one with "/"
+    matches the whole relative path. Excluded directories aren't walked
+    at all. include only applies to files: with include patterns, files
+    that match none of them are ignored.
+    """
+
+    include: Tuple[str, ...] = ()
+    exclude: Tuple[str, ...] = ()
+
+    @property
+    def position_independent(self) -> bool:
+        """
+        True if matching doesn't depend on where the tree is rooted, so
+        nested triggers with this filter can share one scan.
+        """
+        return not any("/" in p for p in self.include + self.exclude)
+
+    def excludes_dir(self, rel: str) -> bool:
+        return _matches(rel, self.exclude)
+
+    def wants_file(self, rel: str) -> bool:
+        if _matches(rel, self.exclude):
+            return False
+        return not self.include or _matches(rel, self.include)
+
+def make_filter(include: Iterable[str] = (), exclude: Iterable[str] = ()) -> Optional[PathFilter]:
+    """
+    None when there is nothing to filter.
+    """
+    inc = tuple(p.strip().strip("/") for p in include if p and p.strip().strip("/"))
+    exc = tuple(p.strip().strip("/") for p in exclude if p and p.strip().strip("/"))
+    if not inc and not exc:
+        return None
+    return PathFilter(inc, exc)
+
+def _matches(rel: str, patterns: Tuple[str, ...]) -> bool:
+    name = rel.rsplit("/", 1)[-1]
+    for pattern in patterns:
+        if fnmatch(rel if "/" in pattern else name, pattern):
+            return True
+    return False
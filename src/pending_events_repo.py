@@ -7,6 +7,7 @@ from .scripts_repo import get_script
 import sqlite3
 
 from .database import Database
+from .wakeup import notify_daemon
 
 def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
@@ -30,9 +31,12 @@ def enqueue_event(db: Database, trigger_id: str, script_id: int, payload: Option
                 """,
                 (trigger_id, script_id, payload_json, now),
             )
-            return int(rows[0]["id"]) if rows else None
         except sqlite3.IntegrityError:
             return None
+        if not rows:
+            return None
+        notify_daemon(db)
+        return int(rows[0]["id"])
 
     cur = db.execute(
         """
@@ -43,6 +47,7 @@ def enqueue_event(db: Database, trigger_id: str, script_id: int, payload: Option
         """,
         (trigger_id, script_id, payload_json, now),
     )
+    notify_daemon(db)
     return int(cur.lastrowid)
 
 def claim_ready_events(db: Database, owner: str, limit: int = 50) -> List[Dict[str, Any]]:
@@ -54,6 +59,7 @@ def claim_ready_events(db: Database, owner: str, limit: int = 50) -> List[Dict[s
             FROM pending_events
             WHERE processed_at_utc IS NULL
               AND claimed_at_utc IS NULL
+              AND script_id NOT IN (SELECT id FROM scripts WHERE batch_max_events IS NOT NULL)
             GROUP BY script_id
             ORDER BY MIN(id) ASC
             LIMIT ?
@@ -166,9 +172,12 @@ def enqueue_event_if_none_waiting(db: Database, trigger_id: str, script_id: int,
             """,
             (trigger_id, script_id, payload_json, now),
         )
-        return int(row[0]["id"]) if row else None
     except sqlite3.IntegrityError:
         return None
+    if not row:
+        return None
+    notify_daemon(db)
+    return int(row[0]["id"])
 
 def has_claimed_unprocessed_event(db: Database, script_id: int) -> bool:
     rows = db.query(
@@ -208,7 +217,10 @@ def enqueue_event_if_under_cap(
         """,
         (trigger_id, script_id, payload_json, now, script_id, cap),
     )
-    return int(row[0]["id"]) if row else None
+    if not row:
+        return None
+    notify_daemon(db)
+    return int(row[0]["id"])
 
 import sqlite3, json
 from typing import Optional, Dict, Any
@@ -286,4 +298,46 @@ def clear_pending(db: Database, script_id: Optional[int] = None) -> int:
         cur = db.execute("DELETE FROM pending_events")
     else:
         cur = db.execute("DELETE FROM pending_events WHERE script_id = ?", (script_id,))
-    return int(cur.rowcount)
\ No newline at end of file
+    return int(cur.rowcount)
+
+def waiting_summary(db: Database, script_id: int) -> Dict[str, Any]:
+    """
+    Count and oldest created_at_utc of waiting (unclaimed) events for a script.
+    """
+    rows = db.query(
+        """
+        SELECT COUNT(*) AS n, MIN(created_at_utc) AS oldest
+        FROM pending_events
+        WHERE script_id = ?
+          AND processed_at_utc IS NULL
+          AND claimed_at_utc IS NULL
+        """,
+        (script_id,),
+    )
+    r = dict(rows[0]) if rows else {}
+    return {"count": int(r.get("n") or 0), "oldest": r.get("oldest")}
+
+def claim_batch(db: Database, script_id: int, owner: str, limit: int) -> List[Dict[str, Any]]:
+    """
+    Claim up to `limit` waiting events of one script, oldest first.
+    """
+    if limit <= 0:
+        return []
+    now = _utc_now_iso()
+    rows = db.execute_returning(
+        """
+        UPDATE pending_events
+        SET claimed_at_utc = ?, claimed_by = ?
+        WHERE id IN (
+            SELECT id FROM pending_events
+            WHERE script_id = ?
+              AND processed_at_utc IS NULL
+              AND claimed_at_utc IS NULL
+            ORDER BY id ASC
+            LIMIT ?
+        )
+        RETURNING id, trigger_id, script_id, payload_json
+        """,
+        (now, owner, script_id, limit),
+    )
+    return sorted((dict(r) for r in rows), key=lambda r: r["id"])
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import json
+import queue
+import subprocess
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .executor import ExecResult, OutputCallback, deliver
+
+MODES = ("process", "worker")
+WORKER_IDLE_SECONDS = 300
+WORKER_TIMEOUT_SECONDS = 60
+
+class WorkerProcess:
+    """
+    A long-lived child speaking NDJSON over stdin/stdout.
+
+    Request:  {"id": <run_id>, "trigger": "...", "payload": {...}}
+    Response: {"id": <run_id>, "status": "success"|"failed",
+               "exit_code": 0, "stdout": "...", "stderr": "..."}
+
+    Other stdout lines are treated as log output of the current request;
+    stderr is forwarded the same way. Output between requests is dropped.
+    """
+
+    def __init__(self, command: str, working_dir: Optional[str] = None) -> None:
+        self.command = command
+        self.working_dir = working_dir
+        self.proc = subprocess.Popen(
+            command,
+            shell=True,
+            cwd=working_dir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            # One bad byte must not kill the reader threads.
+            errors="replace",
+            bufsize=1,
+        )
+        self.last_used = time.monotonic()
+        self.busy = False
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._on_stderr: Optional[OutputCallback] = None
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+        threading.Thread(target=self._read_stderr, daemon=True).start()
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def _read_stdout(self) -> None:
+        try:
+            for line in self.proc.stdout:
+                # Lines printed between requests belong to no run.
+                if self.busy:
+                    self._lines.put(line)
+        finally:
+            self._lines.put(None)
+
+    def _read_stderr(self) -> None:
+        for line in self.proc.stderr:
+            deliver(self._on_stderr, line)
+
+    def request(
+        self,
+        request: Dict[str, Any],
+        timeout: float = WORKER_TIMEOUT_SECONDS,
+        on_stdout: Optional[OutputCallback] = None,
+        on_stderr: Optional[OutputCallback] = None,
+    ) -> Dict[str, Any]:
+        self._on_stderr = on_stderr
+        self.busy = True
+        try:
+            self._discard_stale_lines()
+            self.proc.stdin.write(json.dumps(request) + "\n")
+            self.proc.stdin.flush()
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise subprocess.TimeoutExpired(self.command, timeout)
+                try:
+                    line = self._lines.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+                if line is None:
+                    raise RuntimeError(f"worker exited with code {self.proc.wait()}")
+                response = _parse_response(line, request["id"])
+                if response is not None:
+                    return response
+                if on_stdout:
+                    on_stdout(line)
+        finally:
+            self._on_stderr = None
+            self.busy = False
+            self.last_used = time.monotonic()
+
+    def _discard_stale_lines(self) -> None:
+        """
+        Drops output queued before this request (e.g. the tail of one that
+        timed out), keeping the end-of-stream marker.
+        """
+        while True:
+            try:
+                line = self._lines.get_nowait()
+            except queue.Empty:
+                return
+            if line is None:
+                self._lines.put(None)
+                return
+
+    def stop(self) -> None:
+        if not self.alive():
+            return
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=5)
+        except Exception:
+            self.proc.kill()
+            self.proc.wait()
+
+def _parse_response(line: str, request_id: Any) -> Optional[Dict[str, Any]]:
+    line = line.strip()
+    if not line.startswith("{"):
+        return None
+    try:
+        obj = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(obj, dict) or obj.get("id") != request_id:
+        return None
+    return obj
+
+class WorkerManager:
+    """
+    Keeps one WorkerProcess per script. Crashed workers are replaced on the
+    next request; workers idle for longer than idle_seconds are stopped by
+    reap_idle(), which the daemon calls every tick.
+    """
+
+    def __init__(self, idle_seconds: float = WORKER_IDLE_SECONDS) -> None:
+        self.idle_seconds = idle_seconds
+        self._workers: Dict[int, WorkerProcess] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, script: Any) -> WorkerProcess:
+        with self._lock:
+            w = self._workers.get(script.id)
+            if w is not None and (
+                not w.alive() or w.command != script.command or w.working_dir != script.working_dir
+            ):
+                w.stop()
+                w = None
+            if w is None:
+                w = WorkerProcess(script.command, working_dir=script.working_dir)
+                self._workers[script.id] = w
+            return w
+
+    def run(
+        self,
+        script: Any,
+        run_id: int,
+        trigger: str,
+        payload: Dict[str, Any],
+        on_stdout: Optional[OutputCallback] = None,
+        on_stderr: Optional[OutputCallback] = None,
+        timeout: float = WORKER_TIMEOUT_SECONDS,
+    ) -> ExecResult:
+        w = self._get(script)
+        try:
+            response = w.request(
+                {"id": run_id, "trigger": trigger, "payload": payload},
+                timeout=timeout,
+                on_stdout=on_stdout,
+                on_stderr=on_stderr,
+            )
+        except Exception:
+            # Never reuse a worker that crashed or hung mid-request.
+            self._discard(script.id, w)
+            raise
+
+        if response.get("stdout") and on_stdout:
+            on_stdout(str(response["stdout"]))
+        if response.get("stderr") and on_stderr:
+            on_stderr(str(response["stderr"]))
+
+        exit_code = response.get("exit_code")
+        if exit_code is None:
+            exit_code = 0 if response.get("status", "success") == "success" else 1
+        return ExecResult(exit_code=int(exit_code), stdout="", stderr="")
+
+    def _discard(self, script_id: int, w: WorkerProcess) -> None:
+        with self._lock:
+            if self._workers.get(script_id) is w:
+                del self._workers[script_id]
+        if w.alive():
+            w.proc.kill()
+            w.proc.wait()
+
+    def reap_idle(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            stale = [
+                (sid, w) for sid, w in self._workers.items()
+                if not w.alive() or (not w.busy and now - w.last_used > self.idle_seconds)
+            ]
+            for sid, _ in stale:
+                del self._workers[sid]
+        for _, w in stale:
+            w.stop()
+        return len(stale)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for w in workers:
+            w.stop()
+
+workers = WorkerManager()
@@ -3,6 +3,7 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Any, Dict, List
 
+from .config_cache import cached
 from .database import Database
 
 def _utc_now_iso() -> str:
@@ -26,14 +27,14 @@ def add_hook(db: Database, on_script_id: int, on_status: str, target_script_id:
     return int(row["id"])
 
 def list_hooks(db: Database) -> List[Dict[str, Any]]:
-    cur = db.execute(
+    rows = db.query(
         """
         SELECT id, on_script_id, on_status, target_script_id, created_at_utc
         FROM run_hooks
         ORDER BY id ASC
         """
     )
-    return [dict(r) for r in cur.fetchall()]
+    return [dict(r) for r in rows]
 
 def remove_hook(db: Database, hook_id: int) -> int:
     cur = db.execute("DELETE FROM run_hooks WHERE id = ?", (hook_id,))
@@ -43,13 +44,16 @@ def hooks_for(db: Database, on_script_id: int, status: str) -> List[Dict[str, An
     """
     status is the finished run status: 'success' or 'failed'
     """
-    cur = db.execute(
-        """
-        SELECT id, target_script_id, on_status
-        FROM run_hooks
-        WHERE on_script_id = ?
-            AND (on_status = ? OR on_status = 'any')
-        """,
-        (on_script_id, status),
-    )
-    return [dict(r) for r in cur.fetchall()]
\ No newline at end of file
+    def load() -> List[Dict[str, Any]]:
+        rows = db.query(
+            """
+            SELECT id, target_script_id, on_status
+            FROM run_hooks
+            WHERE on_script_id = ?
+                AND (on_status = ? OR on_status = 'any')
+            """,
+            (on_script_id, status),
+        )
+        return [dict(r) for r in rows]
+
+    return cached(db, ("run_hooks", on_script_id, status), load)
\ No newline at end of file
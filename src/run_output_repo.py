@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import lzma
+import threading
+import time
+import traceback
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional, Set
+
+from .database import Database
+from .output_capture import UNLIMITED, CapturePolicy, HeadTailCapture
+from .run_search_repo import index_chunk, search_index_enabled
+
+STREAMS = ("stdout", "stderr")
+CODECS = ("zlib", "lzma", "none")
+
+CHUNK_CHARS = 64 * 1024
+FLUSH_INTERVAL_SECONDS = 0.5
+READ_BATCH = 16
+
+@dataclass(frozen=True)
+class Compression:
+    """
+    How output chunks are stored. Chunks smaller than min_bytes, or that
+    do not shrink, are kept as plain text.
+    """
+    codec: str = "zlib"
+    level: int = 6
+    min_bytes: int = 1024
+
+DEFAULT_COMPRESSION = Compression()
+
+def compression_for(script: Any) -> Compression:
+    """
+    Per-script settings (scripts.compress_*) over the global defaults.
+    """
+    codec = getattr(script, "compress_codec", None)
+    level = getattr(script, "compress_level", None)
+    min_bytes = getattr(script, "compress_min_bytes", None)
+    return Compression(
+        codec=codec or DEFAULT_COMPRESSION.codec,
+        level=DEFAULT_COMPRESSION.level if level is None else int(level),
+        min_bytes=DEFAULT_COMPRESSION.min_bytes if min_bytes is None else int(min_bytes),
+    )
+
+def _encode(data: str, compression: Compression) -> tuple[Any, Optional[str], int]:
+    raw = data.encode("utf-8", errors="surrogateescape")
+    if compression.codec == "none" or len(raw) < compression.min_bytes:
+        return data, None, len(raw)
+    if compression.codec == "zlib":
+        packed = zlib.compress(raw, compression.level)
+    elif compression.codec == "lzma":
+        packed = lzma.compress(raw, preset=compression.level)
+    else:
+        raise ValueError(f"Unknown codec: {compression.codec!r}")
+    if len(packed) >= len(raw):
+        return data, None, len(raw)
+    return packed, compression.codec, len(raw)
+
+def elided_marker(n: int) -> str:
+    return f"\n[{n} bytes elided]\n"
+
+def _decode(row) -> str:
+    codec = row["codec"]
+    if codec is None:
+        text = row["data"]
+    elif codec == "zlib":
+        text = zlib.decompress(row["data"]).decode("utf-8", errors="surrogateescape")
+    elif codec == "lzma":
+        text = lzma.decompress(row["data"]).decode("utf-8", errors="surrogateescape")
+    else:
+        raise ValueError(f"Unknown codec: {codec!r}")
+    if row["elided"]:
+        return elided_marker(int(row["elided"])) + text
+    return text
+
+def append_chunk(
+    db: Database,
+    run_id: int,
+    stream: str,
+    data: str,
+    compression: Compression = DEFAULT_COMPRESSION,
+    elided: int = 0,
+    indexed: Optional[bool] = None,
+) -> None:
+    """
+    Appends one chunk. `elided` records how many bytes the capture policy
+    dropped right before this chunk. `indexed` says whether the search
+    index is enabled; callers appending many chunks look it up once, None
+    checks it here.
+    """
+    if not data and not elided:
+        return
+    stored, codec, raw_size = _encode(data, compression)
+    if indexed is None:
+        indexed = bool(data) and search_index_enabled(db)
+    with db.transaction():
+        cur = db.execute(
+            """
+            INSERT INTO run_output_chunks (run_id, stream, seq, data, codec, raw_size, elided)
+            SELECT ?, ?, COALESCE(MAX(seq), -1) + 1, ?, ?, ?, ?
+            FROM run_output_chunks
+            WHERE run_id = ? AND stream = ?
+            """,
+            (run_id, stream, stored, codec, raw_size, elided or None, run_id, stream),
+        )
+        if data and indexed:
+            index_chunk(db, int(cur.lastrowid), data)
+
+def output_stats(db: Database, run_id: Optional[int] = None, script_id: Optional[int] = None) -> Dict[str, int]:
+    """
+    raw vs stored bytes of chunked output, for one run, one script or everything.
+    """
+    where, params = "", ()
+    if run_id is not None:
+        where, params = "WHERE c.run_id = ?", (run_id,)
+    elif script_id is not None:
+        where, params = "JOIN runs r ON r.id = c.run_id WHERE r.script_id = ?", (script_id,)
+    rows = db.query(
+        f"""
+        SELECT
+            COUNT(*) AS chunks,
+            SUM(c.raw_size) AS raw_bytes,
+            SUM(LENGTH(CAST(c.data AS BLOB))) AS stored_bytes
+        FROM run_output_chunks c
+        {where}
+        """,
+        params,
+    )
+    r = dict(rows[0]) if rows else {}
+    return {k: int(r.get(k) or 0) for k in ("chunks", "raw_bytes", "stored_bytes")}
+
+def iter_output(db: Database, run_id: int, stream: str) -> Iterator[str]:
+    """
+    Yields a run's output chunk by chunk, fetching a few rows at a time so
+    callers that stop early never load the rest.
+    """
+    if stream not in STREAMS:
+        raise ValueError(f"Unknown stream: {stream!r}")
+    last_seq = -1
+    while True:
+        rows = db.query(
+            """
+            SELECT seq, data, codec, elided FROM run_output_chunks
+            WHERE run_id = ? AND stream = ? AND seq > ?
+            ORDER BY seq ASC
+            LIMIT ?
+            """,
+            (run_id, stream, last_seq, READ_BATCH),
+        )
+        if not rows:
+            return
+        for r in rows:
+            last_seq = int(r["seq"])
+            yield _decode(r)
+
+def chunks_after(db: Database, run_id: int, after_id: int = 0, limit: int = READ_BATCH):
+    """
+    Returns up to `limit` chunks (both streams, in write order) with an id
+    greater than `after_id`. Feed the last returned id back in to resume.
+    """
+    rows = db.query(
+        """
+        SELECT id, stream, data, codec, elided FROM run_output_chunks
+        WHERE run_id = ? AND id > ?
+        ORDER BY id ASC
+        LIMIT ?
+        """,
+        (run_id, after_id, limit),
+    )
+    return [{"id": int(r["id"]), "stream": r["stream"], "data": _decode(r)} for r in rows]
+
+def read_output(db: Database, run_id: int, stream: str, limit: Optional[int] = None) -> str:
+    """
+    Returns up to `limit` chars of a stream (all of it when limit is None).
+    """
+    parts: list[str] = []
+    size = 0
+    for data in iter_output(db, run_id, stream):
+        parts.append(data)
+        size += len(data)
+        if limit is not None and size >= limit:
+            break
+    out = "".join(parts)
+    return out if limit is None else out[:limit]
+
+class _Flusher:
+    """
+    One thread that stores the output of writers that have gone quiet for
+    their flush interval. Full chunks are stored by the thread that wrote
+    them, so this thread never has to keep up with a chatty script.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._writers: Set["RunOutputWriter"] = set()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, writer: "RunOutputWriter") -> None:
+        with self._cond:
+            self._writers.add(writer)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="scripter-output", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def remove(self, writer: "RunOutputWriter") -> None:
+        with self._cond:
+            self._writers.discard(writer)
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                intervals = [w._flush_interval for w in self._writers]
+                self._cond.wait(timeout=min(intervals) if intervals else None)
+                writers = list(self._writers)
+            for writer in writers:
+                self._run(writer._flush_if_quiet)
+
+    @staticmethod
+    def _run(step: Callable[[], None]) -> None:
+        try:
+            step()
+        except Exception:
+            traceback.print_exc()
+
+_flusher = _Flusher()
+
+class RunOutputWriter:
+    """
+    Buffers a running script's output and appends it to run_output_chunks
+    once a stream has CHUNK_CHARS buffered or FLUSH_INTERVAL_SECONDS have
+    passed, so memory per run stays bounded. With a limited CapturePolicy
+    only the head is streamed; the tail is kept in a ring buffer and stored
+    on close(). write() may be called from any thread; it stores full
+    chunks itself, through the caller's Database, so a script can't print
+    faster than its output is stored. A shared thread stores what quiet
+    scripts leave buffered.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        run_id: int,
+        chunk_chars: int = CHUNK_CHARS,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS,
+        compression: Compression = DEFAULT_COMPRESSION,
+        capture: CapturePolicy = UNLIMITED,
+    ) -> None:
+        self._db = db
+        self._run_id = run_id
+        self._compression = compression
+        self._captures: Dict[str, HeadTailCapture] = (
+            {s: HeadTailCapture(capture) for s in STREAMS} if capture.limited else {}
+        )
+        self._chunk_chars = chunk_chars
+        self._flush_interval = flush_interval
+        self._lock = threading.Lock()
+        # Held while storing, so chunks land in the order they were cut.
+        self._io_lock = threading.Lock()
+        self._buf: Dict[str, list[str]] = {s: [] for s in STREAMS}
+        self._size: Dict[str, int] = {s: 0 for s in STREAMS}
+        self._pending: list[tuple[str, str, int]] = []
+        self._last_flush = time.monotonic()
+        # Enabling or dropping the index mid-run takes effect from the next run.
+        self._indexed = search_index_enabled(db)
+        _flusher.add(self)
+
+    def write(self, stream: str, text: str) -> None:
+        with self._lock:
+            if self._captures:
+                text = self._captures[stream].feed(text)
+                if not text:
+                    return
+            self._buf[stream].append(text)
+            self._size[stream] += len(text)
+            if self._size[stream] >= self._chunk_chars:
+                self._cut(stream)
+            elif time.monotonic() - self._last_flush >= self._flush_interval:
+                self._cut_all()
+            else:
+                return
+        self._drain()
+
+    def stdout(self, text: str) -> None:
+        self.write("stdout", text)
+
+    def stderr(self, text: str) -> None:
+        self.write("stderr", text)
+
+    def close(self) -> None:
+        _flusher.remove(self)
+        with self._lock:
+            self._cut_all()
+            for stream, cap in self._captures.items():
+                tail, dropped = cap.finish()
+                self._pending.append((stream, tail, dropped))
+        self._drain()
+
+    def _flush_if_quiet(self) -> None:
+        with self._lock:
+            if not any(self._size.values()) or time.monotonic() - self._last_flush < self._flush_interval:
+                return
+            # Make sure quiet scripts still show up for `runs tail -f`.
+            self._cut_all()
+        self._drain()
+
+    def _cut_all(self) -> None:
+        for stream in STREAMS:
+            self._cut(stream)
+        self._last_flush = time.monotonic()
+
+    def _cut(self, stream: str) -> None:
+        if not self._buf[stream]:
+            return
+        self._pending.append((stream, "".join(self._buf[stream]), 0))
+        self._buf[stream] = []
+        self._size[stream] = 0
+
+    def _drain(self) -> None:
+        # Another thread draining holds up this one too, which keeps
+        # _pending to the chunks cut meanwhile (one per stream).
+        with self._io_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            for stream, data, elided in pending:
+                append_chunk(
+                    self._db, self._run_id, stream, data, self._compression, elided=elided, indexed=self._indexed
+                )
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+from .database import Database
+
+FTS_TABLE = "run_output_fts"
+SNIPPET_CONTEXT = 40
+BACKFILL_BATCH = 500
+
+# Contentless: the index only stores tokens, never a second copy of the
+# (possibly compressed) output. rowid is run_output_chunks.id.
+FTS_DDL = f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(data, content='')"
+
+def search_index_enabled(db: Database) -> bool:
+    rows = db.query(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (FTS_TABLE,),
+    )
+    return bool(rows)
+
+def index_chunk(db: Database, chunk_id: int, text: str) -> None:
+    db.execute(f"INSERT INTO {FTS_TABLE} (rowid, data) VALUES (?, ?)", (chunk_id, text))
+
+def enable_search_index(db: Database) -> int:
+    """
+    Creates the FTS5 index and backfills it from existing chunks.
+    Returns the number of chunks indexed.
+    """
+    from .run_output_repo import _decode
+
+    db.init()
+    try:
+        db.execute(FTS_DDL)
+    except sqlite3.OperationalError as e:
+        raise RuntimeError(f"SQLite FTS5 is not available: {e}") from e
+    db.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('delete-all')")
+
+    indexed = 0
+    last_id = 0
+    while True:
+        rows = db.query(
+            """
+            SELECT id, data, codec, elided FROM run_output_chunks
+            WHERE id > ?
+            ORDER BY id ASC
+            LIMIT ?
+            """,
+            (last_id, BACKFILL_BATCH),
+        )
+        if not rows:
+            return indexed
+        conn = db.connect()
+        conn.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, data) VALUES (?, ?)",
+            [(int(r["id"]), _decode(r)) for r in rows],
+        )
+        conn.commit()
+        indexed += len(rows)
+        last_id = int(rows[-1]["id"])
+
+def disable_search_index(db: Database) -> None:
+    db.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+def clear_search_index(db: Database) -> None:
+    if search_index_enabled(db):
+        db.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('delete-all')")
+
+def _snippet(text: str, query: str) -> str:
+    terms = [t for t in re.findall(r"\w+", query) if t.upper() not in ("AND", "OR", "NOT", "NEAR")]
+    pos = -1
+    lowered = text.lower()
+    for t in terms:
+        pos = lowered.find(t.lower())
+        if pos >= 0:
+            break
+    if pos < 0:
+        pos = 0
+    start = max(0, pos - SNIPPET_CONTEXT)
+    end = min(len(text), pos + SNIPPET_CONTEXT)
+    out = text[start:end].replace("\n", " ")
+    return ("..." if start else "") + out + ("..." if end < len(text) else "")
+
+def search_runs(
+    db: Database,
+    query: str,
+    script_id: Optional[int] = None,
+    since_iso: Optional[str] = None,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """
+    Newest runs whose output matches an FTS5 query, one row per run with a
+    snippet from its most recent matching chunk. Matches are walked newest
+    first and the walk stops as soon as `limit` runs were found.
+    """
+    from .run_output_repo import _decode
+
+    where = [f"{FTS_TABLE} MATCH ?"]
+    params: list[Any] = [query]
+    if script_id is not None:
+        where.append("r.script_id = ?")
+        params.append(script_id)
+    if since_iso is not None:
+        where.append("r.started_at >= ?")
+        params.append(since_iso)
+
+    cur = db.connect().execute(
+        f"""
+        SELECT r.id AS run_id, r.script_id, r.status, r.started_at,
+               c.stream, c.data, c.codec, c.elided
+        FROM {FTS_TABLE} f
+        JOIN run_output_chunks c ON c.id = f.rowid
+        JOIN runs r ON r.id = c.run_id
+        WHERE {" AND ".join(where)}
+        ORDER BY f.rowid DESC
+        """,
+        params,
+    )
+
+    results: List[Dict[str, Any]] = []
+    seen: set[int] = set()
+    for r in cur:
+        run_id = int(r["run_id"])
+        if run_id in seen:
+            continue
+        seen.add(run_id)
+        results.append(
+            {
+                "run_id": run_id,
+                "script_id": int(r["script_id"]),
+                "status": r["status"],
+                "started_at": r["started_at"],
+                "stream": r["stream"],
+                "snippet": _snippet(_decode(r), query),
+            }
+        )
+        if len(results) >= limit:
+            break
+    cur.close()
+    return results
@@ -1,49 +1,155 @@
 from __future__ import annotations
+import json
+from concurrent.futures import Future
 from typing import Callable, Optional
 
 from .database import Database
-from .executor import run_command
+from .executor import DEFAULT_EXECUTOR, call_as_future, submit_command
 from .locks import try_acquire, release
 from .runs_repo import create_run, finish_run
+from .run_output_repo import RunOutputWriter, compression_for
+from .output_capture import capture_for
+from .persistent_workers import workers
 from .scripts_repo import get_script
 from .triggers.base import TriggerEvent
 from .run_hooks_repo import hooks_for
 from .triggers.base import TriggerEvent
 from .pending_events_repo import enqueue_event
 
-def execute_event(db: Database, event: TriggerEvent, owner: str, on_finished: Optional[Callable[[str, int | None], None]] = None):
+class StartedRun:
+    """
+    A run that submit_event() started. future resolves to the child's
+    ExecResult; finish() (which waits for it) records the outcome, runs
+    hooks and releases the script lock, so call it from a thread that may
+    do database I/O rather than from a future callback.
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        event: TriggerEvent,
+        owner: str,
+        run_id: int,
+        output: RunOutputWriter,
+        future: Future,
+        on_finished: Optional[Callable[[str, int | None], None]],
+    ) -> None:
+        self.db = db
+        self.event = event
+        self.owner = owner
+        self.run_id = run_id
+        self.output = output
+        self.future = future
+        self.on_finished = on_finished
+
+    def finish(self) -> None:
+        db, event, owner, run_id = self.db, self.event, self.owner, self.run_id
+        on_finished = self.on_finished
+        lock_key = f"script:{event.script_id}"
+        released = False
+        try:
+            try:
+                result = self.future.result()
+            finally:
+                self.output.close()
+            status = "success" if result.exit_code == 0 else "failed"
+            with db.transaction():
+                finish_run(db, run_id, status, result.exit_code)
+
+                for hook in hooks_for(db, on_script_id=event.script_id, status=status):
+                    enqueue_event(
+                        db,
+                        trigger_id=f"hook:{event.script_id}:{status}",
+                        script_id=int(hook["target_script_id"]),
+                        payload={
+                            "from_script_id": event.script_id,
+                            "status": status,
+                            "hook_id": int(hook["id"]),
+                        },
+                    )
+
+                if on_finished:
+                    on_finished(status, run_id)
+                release(db, lock_key, owner)
+            released = True
+        except Exception as e:
+            with db.transaction():
+                finish_run(db, run_id, "failed", None, "", f"{type(e).__name__}: {e}")
+                if on_finished:
+                    on_finished("failed", run_id)
+                release(db, lock_key, owner)
+            released = True
+        finally:
+            if not released:
+                release(db, lock_key, owner)
+
+def submit_event(
+    db: Database,
+    event: TriggerEvent,
+    owner: str,
+    on_finished: Optional[Callable[[str, int | None], None]] = None,
+    executor: str = DEFAULT_EXECUTOR,
+) -> Optional[StartedRun]:
+    """
+    Creates the run and starts the script. With the asyncio executor this
+    returns while the child is still running; otherwise the child has
+    exited by the time it returns. None if the script is gone or already
+    running.
+    """
     script = get_script(db, event.script_id)
     if script is None:
-        return
+        return None
     
+    # Each side of the script execution is one unit of work (one commit);
+    # no transaction is held while the script itself runs.
     lock_key = f"script:{event.script_id}"
-    if not try_acquire(db, lock_key, owner):
-        return
-    
-    run_id = create_run(db, event.script_id, trigger=event.trigger_id)
-
-    try:
-        result = run_command(script.command, working_dir=script.working_dir)
-        status = "success" if result.exit_code == 0 else "failed"
-        finish_run(db, run_id, status, result.exit_code, result.stdout, result.stderr)
-
-        for hook in hooks_for(db, on_script_id=event.script_id, status=status):
-            enqueue_event(
-                db,
-                trigger_id=f"hook:{event.script_id}:{status}",
-                script_id=int(hook["target_script_id"]),
-                payload={
-                    "from_script_id": event.script_id,
-                    "status": status,
-                    "hook_id": int(hook["id"]),
-                },
-            )
-
-        if on_finished:
-            on_finished(status, run_id)
-    except Exception as e:
-        finish_run(db, run_id, "failed", None, "", f"{type(e).__name__}: {e}")
-        if on_finished:
-            on_finished("failed", run_id)
-    finally:
-        release(db, lock_key, owner)
\ No newline at end of file
+    with db.transaction():
+        if not try_acquire(db, lock_key, owner):
+            return None
+        run_id = create_run(db, event.script_id, trigger=event.trigger_id)
+
+    output = RunOutputWriter(
+        db,
+        run_id,
+        compression=compression_for(script),
+        capture=capture_for(script),
+    )
+
+    batch = event.payload.get("batch")
+    stdin_data = None
+    if batch is not None:
+        # Coalesced events go to a single invocation as NDJSON on stdin.
+        stdin_data = "".join(json.dumps(item) + "\n" for item in batch)
+
+    if getattr(script, "mode", "process") == "worker":
+        future = call_as_future(
+            workers.run,
+            script,
+            run_id,
+            trigger=event.trigger_id,
+            payload=event.payload,
+            on_stdout=output.stdout,
+            on_stderr=output.stderr,
+        )
+    else:
+        future = submit_command(
+            executor,
+            script.command,
+            working_dir=script.working_dir,
+            on_stdout=output.stdout,
+            on_stderr=output.stderr,
+            capture=False,
+            stdin_data=stdin_data,
+        )
+    return StartedRun(db, event, owner, run_id, output, future, on_finished)
+
+def execute_event(
+    db: Database,
+    event: TriggerEvent,
+    owner: str,
+    on_finished: Optional[Callable[[str, int | None], None]] = None,
+    executor: str = DEFAULT_EXECUTOR,
+):
+    started = submit_event(db, event, owner, on_finished=on_finished, executor=executor)
+    if started is not None:
+        started.finish()
@@ -3,6 +3,7 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Optional
 from .database import Database
+from .run_output_repo import append_chunk
 
 def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -23,33 +24,41 @@ def finish_run(
     run_id: int,
     status: str,
     exit_code: Optional[int],
-    stdout: str,
-    stderr: str,
+    stdout: str = "",
+    stderr: str = "",
 ) -> None:
+    """
+    Marks a run finished. Output normally streams into run_output_chunks
+    while the script runs; any stdout/stderr passed here is appended to it.
+    """
+    append_chunk(db, run_id, "stdout", stdout)
+    append_chunk(db, run_id, "stderr", stderr)
     db.execute(
         """
         UPDATE runs
-        SET status = ?, finished_at = ?, exit_code = ?, stdout = ?, stderr = ?
+        SET status = ?, finished_at = ?, exit_code = ?
         WHERE id = ?
         """,
-        (status, _now_iso(), exit_code, stdout, stderr, run_id),
+        (status, _now_iso(), exit_code, run_id),
     )
 
+RUN_COLUMNS = "id, script_id, status, started_at, finished_at, exit_code, trigger"
+
 def list_runs(db: Database, limit: int = 20, script_id: Optional[int] = None):
     db.init()
     if script_id is None:
         return db.query(
-            "SELECT * FROM runs ORDER BY id DESC LIMIT ?",
+            f"SELECT {RUN_COLUMNS} FROM runs ORDER BY id DESC LIMIT ?",
             (limit,),
         )
     return db.query(
-        "SELECT * FROM runs WHERE script_id = ? ORDER BY id DESC LIMIT ?",
+        f"SELECT {RUN_COLUMNS} FROM runs WHERE script_id = ? ORDER BY id DESC LIMIT ?",
         (script_id, limit),
     )
 
 def get_run(db: Database, run_id: int):
     db.init()
-    rows = db.query("SELECT * FROM runs WHERE id = ?", (run_id,))
+    rows = db.query(f"SELECT {RUN_COLUMNS} FROM runs WHERE id = ?", (run_id,))
     return rows[0] if rows else None
 
 def is_script_running(db: Database, script_id: int) -> bool:
@@ -1,27 +1,49 @@
 from __future__ import annotations
 
+import queue
 import signal
 import time
+from contextlib import nullcontext
 from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Dict, Iterable, Optional
 
+from .config_cache import ConfigCache
 from .database import Database
 from .daemon_hooks_repo import hooks_for_event
-from .event_bus_repo import mark_delivery_processed
+from .executor import DEFAULT_EXECUTOR
 from .locks import owner_id
-from .pending_events_repo import mark_processed
-from .run_service import execute_event
+from .persistent_workers import workers
+from .pending_events_repo import (
+    enqueue_queue_one,
+    has_other_pending_event,
+    mark_processed,
+    unclaim_event,
+)
 from .runs_repo import is_script_running
 from .scripts_repo import get_script
 from .signal_hooks_repo import hooks_for_signal
+from .source_pollers import PolledBatch, SourcePoller
+from .source_stats_repo import SourceStats, clear_source_stats, save_source_stats
 from .trigger_sources.app_watch import AppWatchSource
 from .trigger_sources.base import TriggerSource
+from .trigger_sources.batch import BatchSource
 from .trigger_sources.event_bus import EventBusSource
 from .trigger_sources.file_watch import FileWatchSource
 from .trigger_sources.internal_queue import InternalQueueSource
 from .trigger_sources.one_shots import OneShotSource
 from .trigger_sources.schedules import ScheduleSource
+from .triggers.base import TriggerEvent
+from .wakeup import Waker
+from .worker_pool import DEFAULT_MAX_WORKERS, WorkerPool
+
+# Without polling sources the daemon still looks around this often, in
+# case something wrote to the database without notifying it.
+IDLE_POLL_SECONDS = 60.0
+MIN_POLL_SECONDS = 0.1
+# How often poll timings are written to source_stats for `dctl sources`.
+STATS_FLUSH_SECONDS = 10.0
 
 
 @dataclass
@@ -36,18 +58,80 @@ def run_loop(
     tick_seconds: int = 2,
     once: bool = False,
     sources: Optional[Iterable[TriggerSource]] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    executor: str = DEFAULT_EXECUTOR,
+    group_commit: bool = True,
+    config_cache: Optional[ConfigCache] = None,
+    wakeups: bool = True,
+    poll_intervals: Optional[Dict[str, float]] = None,
+    poll_threads: bool = True,
+    file_watch_backend: str = "auto",
 ) -> None:
+    """
+    With wakeups the loop blocks between ticks until notify_daemon(), a
+    signal, a finished run or the next due schedule/one-shot, instead of
+    sleeping a fixed tick.
+
+    poll_intervals maps source names to seconds between polls, overriding
+    what the source declares. Sources that don't need polling are polled
+    on every wakeup regardless; an interval also polls them that often.
+
+    With poll_threads each source that needs polling gets its own thread
+    feeding a dispatch queue, so slow scans don't make timers fire late.
+    Dispatch itself always happens on the daemon thread.
+
+    file_watch_backend is FileWatchSource's: "auto" (inotify when
+    available), "inotify" or "poll" (e.g. for network filesystems).
+    """
     from .pending_events_repo import enqueue_event
 
+    owner = owner_id()
+
+    # Build sources
+    active_sources: list[TriggerSource] = list(
+        sources
+        if sources is not None
+        else [
+            ScheduleSource(),
+            OneShotSource(),
+            EventBusSource(owner),
+            AppWatchSource(),
+            InternalQueueSource(owner),
+            BatchSource(owner),
+            FileWatchSource(file_watch_backend),
+        ]
+    )
+    intervals = dict(poll_intervals or {})
+    unknown = sorted(set(intervals) - {s.name for s in active_sources})
+    if unknown:
+        raise ValueError(f"Unknown trigger source(s): {', '.join(unknown)}")
+
+    def _interval(source: TriggerSource) -> Optional[float]:
+        seconds = intervals.get(source.name, source.poll_interval)
+        if seconds is None and source.needs_polling:
+            seconds = tick_seconds
+        return None if seconds is None else max(MIN_POLL_SECONDS, float(seconds))
+
+    plan = [(source, _interval(source)) for source in active_sources]
+    threaded = [poll_threads and not once and source.needs_polling for source in active_sources]
+    next_poll = [time.monotonic()] * len(plan)
+    stats = [SourceStats(source.name, interval) for source, interval in plan]
+
     db = Database(db_path)
     db.init()
+    db.config_cache = config_cache
 
-    owner = owner_id()
+    def refresh_config() -> None:
+        # Picks up CLI edits within one tick.
+        if config_cache is not None:
+            config_cache.refresh(db)
 
     # Single-daemon guard (DB-backed)
     from .daemon_lock_repo import acquire_daemon_lock, release_daemon_lock
 
     acquire_daemon_lock(db, owner)
+    clear_source_stats(db)
+    waker = Waker(db.path) if wakeups and not once else None
 
     ctl = _DaemonControl()
 
@@ -90,140 +174,191 @@ def run_loop(
     if hasattr(signal, "SIGHUP"):
         signal.signal(signal.SIGHUP, _handle)
 
-    # Build sources
-    active_sources: list[TriggerSource] = list(
-        sources
-        if sources is not None
-        else [
-            ScheduleSource(),
-            OneShotSource(),
-            EventBusSource(owner),
-            AppWatchSource(),
-            InternalQueueSource(owner),
-            FileWatchSource(),
-        ]
+    pool = WorkerPool(
+        db_path,
+        owner,
+        max_workers=max_workers,
+        executor=executor,
+        config_cache=config_cache,
+        on_done=waker.wake if waker is not None else None,
     )
 
+    def tick_unit():
+        # Group commit: a source's claims, marks and enqueues land in one commit.
+        return db.transaction() if group_commit else nullcontext()
+
+    ready: "queue.Queue[PolledBatch]" = queue.Queue()
+    pollers = [
+        SourcePoller(
+            i,
+            source,
+            interval,
+            db,
+            ready,
+            stats[i],
+            on_ready=waker.wake if waker is not None else None,
+            group_commit=group_commit,
+        )
+        for i, (source, interval) in enumerate(plan)
+        if threaded[i]
+    ]
+
+    def _poll(i: int, due: float) -> None:
+        source = plan[i][0]
+        started = time.monotonic()
+        lateness = started - due
+        due_at = source.next_due(db)
+        if due_at is not None:
+            lateness = max(lateness, (datetime.now(timezone.utc) - due_at).total_seconds())
+        with tick_unit():
+            events = source.poll(db) or []
+            elapsed_ms = (time.monotonic() - started) * 1000
+            for event in events:
+                _dispatch(event)
+        stats[i].record(elapsed_ms, len(events))
+        if events:
+            stats[i].record_lag(lateness * 1000 + elapsed_ms)
+
+    def _poll_due(force: bool = False) -> None:
+        now = time.monotonic()
+        for i, (source, interval) in enumerate(plan):
+            if not force and (threaded[i] or (source.needs_polling and now < next_poll[i])):
+                continue
+            due = next_poll[i] if interval is not None else now
+            if interval is not None:
+                next_poll[i] = now + interval
+            _poll(i, due)
+
+    def _dispatch_ready() -> None:
+        while True:
+            try:
+                batch = ready.get_nowait()
+            except queue.Empty:
+                return
+            with tick_unit():
+                for event in batch.events:
+                    _dispatch(event)
+            stats[batch.index].record_lag((time.monotonic() - batch.due) * 1000)
+
+    def _stop_pollers() -> None:
+        for poller in pollers:
+            poller.stop()
+
+    def _wait_timeout() -> float:
+        timeout = IDLE_POLL_SECONDS
+        now_mono = time.monotonic()
+        for i, (_, interval) in enumerate(plan):
+            if interval is not None and not threaded[i]:
+                timeout = min(timeout, next_poll[i] - now_mono)
+        now = datetime.now(timezone.utc)
+        for s in active_sources:
+            due = s.next_due(db)
+            if due is not None:
+                timeout = min(timeout, (due - now).total_seconds())
+        return max(0.0, timeout)
+
+    def _is_running(script_id: int) -> bool:
+        return pool.is_busy(script_id) or is_script_running(db, script_id)
+
+    def _dispatch(event: TriggerEvent) -> None:
+        if "batch" in event.payload:
+            # BatchSource only claims for idle scripts; policies don't apply.
+            pool.submit(event)
+            return
+
+        script = get_script(db, event.script_id)
+        policy = getattr(script, "concurrency_policy", "allow") or "allow"
+
+        # --- Concurrency policies ---
+        if policy == "skip":
+            if _is_running(event.script_id):
+                pending_id = event.payload.get("_pending_id")
+                if pending_id is not None:
+                    mark_processed(db, int(pending_id))
+                return
+
+        elif policy == "queue_one":
+            if _is_running(event.script_id):
+                pending_id = event.payload.get("_pending_id")
+
+                # If this event came from pending_events and script is still running,
+                # keep at most one waiting row and unclaim/mark accordingly.
+                if pending_id is not None:
+                    if has_other_pending_event(db, event.script_id, exclude_id=int(pending_id)):
+                        mark_processed(db, int(pending_id))
+                    else:
+                        unclaim_event(db, int(pending_id))
+                    return
+
+                # Event came from a "real" source while script is running:
+                # atomically enqueue at most one waiting pending_events row.
+                enqueue_queue_one(
+                    db,
+                    trigger_id=event.trigger_id,
+                    script_id=event.script_id,
+                    payload=event.payload,
+                )
+                return
+
+        # Normal execution path: hand off to the worker pool so the loop keeps polling.
+        pool.submit(event)
+
     try:
+        refresh_config()
         _enqueue_daemon_event("start")
 
+        for poller in pollers:
+            poller.start()
+
+        next_flush = time.monotonic() + STATS_FLUSH_SECONDS
         while not ctl.stop:
+            refresh_config()
             if ctl.reload:
                 ctl.reload = False
                 _enqueue_daemon_event("reload")
 
-            for source in active_sources:
-                events = source.poll(db) or []
-                for event in events:
-                    script = get_script(db, event.script_id)
-                    policy = getattr(script, "concurrency_policy", "allow") or "allow"
-
-                    # --- Concurrency policies ---
-                    if policy == "skip":
-                        if is_script_running(db, event.script_id):
-                            pending_id = event.payload.get("_pending_id")
-                            if pending_id is not None:
-                                mark_processed(db, int(pending_id))
-                            continue
-
-                    elif policy == "queue_one":
-                        if is_script_running(db, event.script_id):
-                            pending_id = event.payload.get("_pending_id")
-
-                            # If this event came from pending_events and script is still running,
-                            # keep at most one waiting row and unclaim/mark accordingly.
-                            if pending_id is not None:
-                                from .pending_events_repo import has_other_pending_event, unclaim_event
-
-                                if has_other_pending_event(db, event.script_id, exclude_id=int(pending_id)):
-                                    mark_processed(db, int(pending_id))
-                                else:
-                                    unclaim_event(db, int(pending_id))
-                                continue
-
-                            # Event came from a "real" source while script is running:
-                            # atomically enqueue at most one waiting pending_events row.
-                            from .pending_events_repo import enqueue_queue_one, trim_queue_one
-
-                            enqueue_queue_one(
-                                db,
-                                trigger_id=event.trigger_id,
-                                script_id=event.script_id,
-                                payload=event.payload,
-                            )
-                            continue
-
-                    # Normal execution path
-                    pending_id = event.payload.get("_pending_id")
-
-                    def on_finished(status, run_id):
-                        if pending_id is not None:
-                            mark_processed(db, int(pending_id))
-                        delivery_id = event.payload.get("delivery_id")
-                        if delivery_id is not None:
-                            mark_delivery_processed(db, int(delivery_id))
-
-                    execute_event(db, event, owner, on_finished=on_finished)
+            _poll_due(force=once)
+            _dispatch_ready()
+
+            workers.reap_idle()
+
+            if time.monotonic() >= next_flush:
+                save_source_stats(db, stats)
+                next_flush = time.monotonic() + STATS_FLUSH_SECONDS
 
             if once:
+                pool.wait_idle()
                 return
 
+            if waker is not None:
+                waker.wait(_wait_timeout())
+                continue
+
             # Sleep in small increments so SIGINT/SIGTERM can break quickly
             for _ in range(max(1, tick_seconds * 10)):
                 if ctl.stop:
                     break
                 time.sleep(0.1)
 
-        # Graceful shutdown: enqueue stop hook and do one final poll/flush pass
+        # Graceful shutdown: let in-flight runs finish, enqueue stop hook and
+        # do one final poll/flush pass
+        _stop_pollers()
+        _dispatch_ready()
+        pool.wait_idle()
+        refresh_config()
         _enqueue_daemon_event("stop")
-        for source in active_sources:
-            events = source.poll(db) or []
-            for event in events:
-                script = get_script(db, event.script_id)
-                policy = getattr(script, "concurrency_policy", "allow") or "allow"
-
-                if policy == "skip":
-                    if is_script_running(db, event.script_id):
-                        pending_id = event.payload.get("_pending_id")
-                        if pending_id is not None:
-                            mark_processed(db, int(pending_id))
-                        continue
-
-                elif policy == "queue_one":
-                    if is_script_running(db, event.script_id):
-                        pending_id = event.payload.get("_pending_id")
-
-                        if pending_id is not None:
-                            from .pending_events_repo import has_other_pending_event, unclaim_event
-
-                            if has_other_pending_event(db, event.script_id, exclude_id=int(pending_id)):
-                                mark_processed(db, int(pending_id))
-                            else:
-                                unclaim_event(db, int(pending_id))
-                            continue
-
-                        enqueue_queue_one(
-                            db,
-                            trigger_id=event.trigger_id,
-                            script_id=event.script_id,
-                            payload=event.payload,
-                        )
-                        continue
-
-                pending_id = event.payload.get("_pending_id")
-
-                def on_finished(status, run_id):
-                    if pending_id is not None:
-                        mark_processed(db, int(pending_id))
-                    delivery_id = event.payload.get("delivery_id")
-                    if delivery_id is not None:
-                        mark_delivery_processed(db, int(delivery_id))
-
-                execute_event(db, event, owner, on_finished=on_finished)
+        _poll_due(force=True)
+        pool.wait_idle()
 
     finally:
         # Always release lock + close DB, even on Ctrl+C or exceptions.
         try:
+            _stop_pollers()
+            pool.shutdown()
+            workers.shutdown()
+            if waker is not None:
+                waker.close()
+            save_source_stats(db, stats)
             release_daemon_lock(db, owner)
         finally:
             db.close()
\ No newline at end of file
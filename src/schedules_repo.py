@@ -1,73 +1,167 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone, timedelta
-from typing import Optional
-from croniter import croniter
-from zoneinfo import ZoneInfo
+from typing import Any, Iterable, Optional
 from .database import Database
+from .wakeup import notify_daemon
 
 def _now() -> datetime:
     return datetime.now(timezone.utc)
 
+def _iso(dt: datetime) -> str:
+    # Fixed width, so next_run_at_utc sorts correctly as text.
+    return dt.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+def next_run_after(row: Any, last_run: Optional[datetime], now: datetime) -> Optional[datetime]:
+    """
+    When a schedule fires next (UTC), given when it last ran. A schedule
+    that never ran is due right away (interval) or at the first cron time
+    after a minute ago.
+    """
+    interval = row["interval_seconds"]
+    cron = row["cron"]
+    tz = row["tz"]
+
+    if interval is not None:
+        if last_run is None:
+            return now
+        return last_run + timedelta(seconds=int(interval))
+
+    if cron:
+        # Deferred so `schedule list` and friends don't pay for croniter.
+        from croniter import croniter
+        from zoneinfo import ZoneInfo
+
+        if tz:
+            zone = ZoneInfo(tz)
+        else:
+            zone = datetime.now().astimezone().tzinfo
+
+        if last_run is None:
+            base = now.astimezone(zone) - timedelta(minutes=1)
+        else:
+            base = last_run.astimezone(zone)
+
+        it = croniter(cron, base)
+        return it.get_next(datetime).astimezone(timezone.utc)
+    return None
+
 def add_schedule(db: Database, script_id: int, interval_seconds: int) -> int:
     db.init()
-    now = _now().isoformat()
+    now = _now()
     cur = db.execute(
         """
-        INSERT INTO schedules (script_id, interval_seconds, last_run, created_at)
-        VALUES (?, ?, ?, ?)
+        INSERT INTO schedules (script_id, interval_seconds, last_run, created_at, next_run_at_utc)
+        VALUES (?, ?, ?, ?, ?)
         """,
-        (script_id, interval_seconds, None, now),
+        (script_id, interval_seconds, None, now.isoformat(), _iso(now)),
     )
+    notify_daemon(db)
     return int(cur.lastrowid)
 
+def fill_next_runs(db: Database) -> int:
+    """
+    Computes next_run_at_utc for rows that have none (schedules created
+    before the column existed). Returns how many were filled.
+    """
+    rows = db.query("SELECT * FROM schedules WHERE next_run_at_utc IS NULL")
+    now = _now()
+    for r in rows:
+        last_run = datetime.fromisoformat(r["last_run"]) if r["last_run"] else None
+        next_run = next_run_after(r, last_run, now)
+        if next_run is not None:
+            db.execute(
+                "UPDATE schedules SET next_run_at_utc = ? WHERE id = ?",
+                (_iso(next_run), r["id"]),
+            )
+    return len(rows)
+
+def recompute_next_runs(db: Database, schedule_ids: Iterable[int]) -> list[tuple[datetime, int]]:
+    """
+    Stores a fresh next_run_at_utc for schedules whose definition changed
+    (or that were just added), from their last_run and current interval,
+    cron and tz. Returns (next_run_at_utc, id) for those that still fire;
+    ids that no longer exist are skipped.
+    """
+    now = _now()
+    entries = []
+    with db.transaction():
+        for r in get_schedules(db, schedule_ids):
+            last_run = datetime.fromisoformat(r["last_run"]) if r["last_run"] else None
+            next_run = next_run_after(r, last_run, now)
+            db.execute(
+                "UPDATE schedules SET next_run_at_utc = ? WHERE id = ?",
+                (_iso(next_run) if next_run else None, r["id"]),
+            )
+            if next_run is not None:
+                entries.append((next_run, int(r["id"])))
+    return entries
+
 def due_schedules(db: Database):
     db.init()
-    rows = db.query("SELECT * FROM schedules")
-    due = []
-    now_utc = _now()
+    fill_next_runs(db)
+    return db.query(
+        "SELECT * FROM schedules WHERE next_run_at_utc <= ? ORDER BY next_run_at_utc",
+        (_iso(_now()),),
+    )
 
-    for r in rows:
-        interval = r["interval_seconds"]
-        cron = r["cron"]
-        tz = r["tz"]
-        last_run = r["last_run"]
-
-        if interval is not None:
-            if last_run is None:
-                due.append(r)
-                continue
-            last_dt = datetime.fromisoformat(last_run)
-            if now_utc >= last_dt + timedelta(seconds=int(interval)):
-                due.append(r)
-            continue
-        
-        if cron:
-            if tz:
-                zone = ZoneInfo(tz)
-            else:
-                zone = datetime.now().astimezone().tzinfo
-            
-            now_local = now_utc.astimezone(zone)
-
-            if last_run is None:
-                base = now_local - timedelta(minutes=1)
-            else:
-                base = datetime.fromisoformat(last_run).astimezone(zone)
-            
-            it = croniter(cron, base)
-            next_time = it.get_next(datetime)
-
-            if next_time <= now_local:
-                due.append(r)
-    return due 
-
-def mark_run(db: Database, schedule_id: int):
-    now = _now().isoformat()
+def schedule_heap_entries(db: Database) -> list[tuple[datetime, int]]:
+    """
+    (next_run_at_utc, id) for every schedule, for ScheduleSource's heap.
+    """
+    db.init()
+    fill_next_runs(db)
+    rows = db.query(
+        "SELECT id, next_run_at_utc FROM schedules WHERE next_run_at_utc IS NOT NULL"
+    )
+    return [(datetime.fromisoformat(r["next_run_at_utc"]), int(r["id"])) for r in rows]
+
+def schedule_change_seq(db: Database) -> int:
+    """
+    The newest entry of the schedule_changes log (0 when empty).
+    """
+    rows = db.query("SELECT MAX(seq) AS seq FROM schedule_changes")
+    return int(rows[0]["seq"] or 0)
+
+def schedule_changes_since(db: Database, seq: int) -> tuple[int, set[int]]:
+    """
+    Ids of schedules added, removed or edited after log entry seq, and
+    the newest entry seen.
+    """
+    rows = db.query(
+        "SELECT seq, schedule_id FROM schedule_changes WHERE seq > ? ORDER BY seq", (seq,)
+    )
+    if not rows:
+        return seq, set()
+    return int(rows[-1]["seq"]), {int(r["schedule_id"]) for r in rows}
+
+def prune_schedule_changes(db: Database, seq: int) -> None:
+    db.execute("DELETE FROM schedule_changes WHERE seq <= ?", (seq,))
+
+def get_schedules(db: Database, schedule_ids: Iterable[int]):
+    ids = list(schedule_ids)
+    if not ids:
+        return []
+    marks = ",".join("?" * len(ids))
+    return db.query(f"SELECT * FROM schedules WHERE id IN ({marks})", ids)
+
+def mark_run(db: Database, schedule_id: int, row: Any = None) -> Optional[datetime]:
+    """
+    Records that a schedule fired now and stores its next fire time,
+    which is returned. Pass the schedule row if you already have it.
+    """
+    if row is None:
+        rows = get_schedules(db, [schedule_id])
+        if not rows:
+            return None
+        row = rows[0]
+    now = _now()
+    next_run = next_run_after(row, now, now)
     db.execute(
-        "UPDATE schedules SET last_run = ? WHERE id = ?",
-        (now, schedule_id),
+        "UPDATE schedules SET last_run = ?, next_run_at_utc = ? WHERE id = ?",
+        (now.isoformat(), _iso(next_run) if next_run else None, schedule_id),
     )
+    return next_run
 
 def list_schedules(db: Database):
     db.init()
@@ -80,7 +174,8 @@ def list_schedules(db: Database):
             sc.interval_seconds,
             sc.cron,
             sc.tz,
-            sc.last_run
+            sc.last_run,
+            sc.next_run_at_utc
         FROM schedules sc
         JOIN scripts s ON s.id = sc.script_id
         ORDER BY sc.id ASC
@@ -89,12 +184,14 @@ def list_schedules(db: Database):
 
 def add_cron_schedule(db: Database, script_id: int, cron: str, tz: Optional[str] = None) -> int:
     db.init()
-    now = _now().isoformat()
+    now = _now()
+    next_run = next_run_after({"interval_seconds": None, "cron": cron, "tz": tz}, None, now)
     cur = db.execute(
         """
-        INSERT INTO schedules (script_id, interval_seconds, cron, tz, last_run, created_at)
-        VALUES (?, NULL, ?, ?, NULL, ?)
+        INSERT INTO schedules (script_id, interval_seconds, cron, tz, last_run, created_at, next_run_at_utc)
+        VALUES (?, NULL, ?, ?, NULL, ?, ?)
         """,
-        (script_id, cron, tz, now),
+        (script_id, cron, tz, now.isoformat(), _iso(next_run)),
     )
+    notify_daemon(db)
     return int(cur.lastrowid)
\ No newline at end of file
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 from typing import Optional
+from .config_cache import cached
 from .database import Database
-from .models import Script
+from .models import SCRIPT_COLUMNS, Script
 
 def _now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -22,19 +23,80 @@ def add_script(db: Database, name: str, command: str, working_dir: Optional[str]
 
 def list_scripts(db: Database) -> list[Script]:
     db.init()
-    rows = db.query("SELECT * FROM scripts ORDER BY id ASC")
-    return [Script(**dict(r)) for r in rows]
+    rows = db.query(f"SELECT {SCRIPT_COLUMNS} FROM scripts ORDER BY id ASC")
+    return [Script(*r) for r in rows]
 
 def get_script(db: Database, script_id: int) -> Optional[Script]:
     db.init()
-    rows = db.query("SELECT * FROM scripts WHERE id = ?", (script_id,))
-    if not rows:
-        return None
-    return Script(**dict(rows[0]))
+
+    def load() -> Optional[Script]:
+        rows = db.query(f"SELECT {SCRIPT_COLUMNS} FROM scripts WHERE id = ?", (script_id,))
+        if not rows:
+            return None
+        return Script(*rows[0])
+
+    return cached(db, ("script", script_id), load)
 
 def set_concurrency_policy(db: Database, script_id: int, policy: str) -> int:
     cur = db.execute(
         "UPDATE scripts SET concurrency_policy = ? WHERE id = ?",
         (policy, script_id),
     )
-    return int(cur.rowcount)
\ No newline at end of file
+    return int(cur.rowcount)
+
+def set_output_compression(
+    db: Database,
+    script_id: int,
+    codec: Optional[str],
+    level: Optional[int] = None,
+    min_bytes: Optional[int] = None,
+) -> int:
+    cur = db.execute(
+        """
+        UPDATE scripts
+        SET compress_codec = ?, compress_level = ?, compress_min_bytes = ?
+        WHERE id = ?
+        """,
+        (codec, level, min_bytes, script_id),
+    )
+    return int(cur.rowcount)
+
+def set_capture_policy(
+    db: Database,
+    script_id: int,
+    head_bytes: Optional[int],
+    tail_bytes: Optional[int],
+) -> int:
+    cur = db.execute(
+        "UPDATE scripts SET capture_head_bytes = ?, capture_tail_bytes = ? WHERE id = ?",
+        (head_bytes, tail_bytes, script_id),
+    )
+    return int(cur.rowcount)
+
+def set_mode(db: Database, script_id: int, mode: str) -> int:
+    cur = db.execute(
+        "UPDATE scripts SET mode = ? WHERE id = ?",
+        (mode, script_id),
+    )
+    return int(cur.rowcount)
+
+def set_batch(db: Database, script_id: int, max_events: Optional[int], max_wait_ms: Optional[int]) -> int:
+    """
+    max_events=None turns batching off for the script.
+    """
+    cur = db.execute(
+        "UPDATE scripts SET batch_max_events = ?, batch_max_wait_ms = ? WHERE id = ?",
+        (max_events, max_wait_ms if max_events is not None else None, script_id),
+    )
+    return int(cur.rowcount)
+
+def list_batch_scripts(db: Database) -> list[Script]:
+    db.init()
+
+    def load() -> list[Script]:
+        rows = db.query(
+            f"SELECT {SCRIPT_COLUMNS} FROM scripts WHERE batch_max_events IS NOT NULL ORDER BY id ASC"
+        )
+        return [Script(*r) for r in rows]
+
+    return cached(db, ("batch_scripts",), load)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 from datetime import datetime, timezone
+from .config_cache import cached
 from .database import Database
 
 def add_signal_hook(db: Database, sig: str, script_id: int) -> int:
@@ -19,8 +20,11 @@ def list_signal_hooks(db: Database) -> list[dict]:
     return [dict(r) for r in rows]
 
 def hooks_for_signal(db: Database, sig: str) -> list[int]:
-    rows = db.query("SELECT script_id FROM signal_hooks WHERE signal = ? ORDER BY id", (sig,))
-    return [int(r["script_id"]) for r in rows]
+    def load() -> list[int]:
+        rows = db.query("SELECT script_id FROM signal_hooks WHERE signal = ? ORDER BY id", (sig,))
+        return [int(r["script_id"]) for r in rows]
+
+    return cached(db, ("signal_hooks", sig), load)
 
 def remove_signal_hook(db: Database, hook_id: int) -> int:
     cur = db.execute("DELETE FROM signal_hooks WHERE id = ?", (hook_id,))
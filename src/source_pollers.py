@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+import traceback
+from contextlib import nullcontext
+from typing import Callable, List, NamedTuple, Optional
+
+from .database import Database
+from .source_stats_repo import SourceStats
+from .trigger_sources.base import TriggerSource
+from .triggers.base import TriggerEvent
+
+class PolledBatch(NamedTuple):
+    """
+    What one poll produced, as handed to the daemon's dispatch queue.
+    due is the monotonic time the poll was scheduled for.
+    """
+
+    index: int
+    due: float
+    events: List[TriggerEvent]
+
+class SourcePoller:
+    """
+    Polls one trigger source on its own thread every interval seconds and
+    puts non-empty results on the shared dispatch queue, so a slow file
+    walk or process scan never holds up schedules on the daemon thread.
+    on_ready is called after each put to wake the daemon.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        source: TriggerSource,
+        interval: float,
+        db: Database,
+        out: "queue.Queue[PolledBatch]",
+        stats: SourceStats,
+        on_ready: Optional[Callable[[], None]] = None,
+        group_commit: bool = True,
+    ) -> None:
+        self.index = index
+        self.source = source
+        self.interval = interval
+        self._db = db
+        self._out = out
+        self._stats = stats
+        self._on_ready = on_ready
+        self._group_commit = group_commit
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"scripter-poll-{source.name}",
+            daemon=True,
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Returns once the thread exited; a poll in progress is finished.
+        """
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self) -> None:
+        due = time.monotonic()
+        while not self._stop.wait(max(0.0, due - time.monotonic())):
+            started = time.monotonic()
+            try:
+                # The daemon thread may sleep for a long while between
+                # wakeups; pick up CLI edits before every poll instead.
+                cache = getattr(self._db, "config_cache", None)
+                if cache is not None:
+                    cache.refresh(self._db)
+                with self._db.transaction() if self._group_commit else nullcontext():
+                    events = self.source.poll(self._db) or []
+            except Exception:
+                # One bad poll mustn't end the source for the daemon's lifetime.
+                traceback.print_exc()
+                events = []
+            self._stats.record((time.monotonic() - started) * 1000, len(events))
+            if events:
+                self._out.put(PolledBatch(self.index, due, events))
+                if self._on_ready is not None:
+                    self._on_ready()
+            # Don't try to catch up on polls missed while this one ran long.
+            due = max(due + self.interval, time.monotonic())
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from .database import Database
+
+def _utc_now_iso() -> str:
+    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+
+@dataclass(slots=True)
+class SourceStats:
+    """
+    Running poll totals of one trigger source in this daemon.
+    """
+
+    name: str
+    interval_seconds: Optional[float]
+    polls: int = 0
+    events: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_ms: float = 0.0
+    last_poll_at_utc: Optional[str] = None
+    max_lag_ms: float = 0.0
+    last_lag_ms: float = 0.0
+
+    def record(self, elapsed_ms: float, events: int) -> None:
+        self.polls += 1
+        self.events += events
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.last_ms = elapsed_ms
+        self.last_poll_at_utc = _utc_now_iso()
+
+    def record_lag(self, lag_ms: float) -> None:
+        """
+        How long after they were due this source's events were dispatched.
+        """
+        lag_ms = max(0.0, lag_ms)
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        self.last_lag_ms = lag_ms
+
+def save_source_stats(db: Database, stats: Iterable[SourceStats]) -> None:
+    with db.transaction():
+        for s in stats:
+            db.execute(
+                """
+                INSERT INTO source_stats
+                    (name, interval_seconds, polls, events, total_ms, max_ms, last_ms, last_poll_at_utc,
+                     max_lag_ms, last_lag_ms)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    interval_seconds = excluded.interval_seconds,
+                    polls = excluded.polls,
+                    events = excluded.events,
+                    total_ms = excluded.total_ms,
+                    max_ms = excluded.max_ms,
+                    last_ms = excluded.last_ms,
+                    last_poll_at_utc = excluded.last_poll_at_utc,
+                    max_lag_ms = excluded.max_lag_ms,
+                    last_lag_ms = excluded.last_lag_ms
+                """,
+                (
+                    s.name,
+                    s.interval_seconds,
+                    s.polls,
+                    s.events,
+                    s.total_ms,
+                    s.max_ms,
+                    s.last_ms,
+                    s.last_poll_at_utc,
+                    s.max_lag_ms,
+                    s.last_lag_ms,
+                ),
+            )
+
+def clear_source_stats(db: Database) -> None:
+    db.execute("DELETE FROM source_stats")
+
+def list_source_stats(db: Database) -> List[Dict[str, Any]]:
+    rows = db.query(
+        """
+        SELECT name, interval_seconds, polls, events, total_ms, max_ms, last_ms, last_poll_at_utc,
+               max_lag_ms, last_lag_ms
+        FROM source_stats
+        ORDER BY total_ms DESC, name ASC
+        """
+    )
+    return [dict(r) for r in rows]
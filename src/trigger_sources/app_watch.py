@@ -36,6 +36,11 @@ class AppWatchSource(TriggerSource):
     Polls running processes and fires events on transitions:
       - app:launch:<process>
       - app:exit:<process>
+
+    Walking the process table is the most expensive poll there is. It
+    still runs every tick by default, on a poller thread so it never holds
+    up the loop; `--poll-interval app_watch=10` trades launch/exit latency
+    for less CPU.
     """
 
     def __init__(self) -> None:
@@ -44,7 +49,6 @@ class AppWatchSource(TriggerSource):
 
     def poll(self, db: Database) -> List[TriggerEvent]:
         triggers = list_app_triggers(db)
-        running = _running_process_names()
         if not triggers:
             return []
 
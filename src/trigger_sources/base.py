@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import re
 from abc import ABC, abstractmethod
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
 from src.database import Database
 from src.triggers.base import TriggerEvent
@@ -9,8 +11,31 @@ from src.triggers.base import TriggerEvent
 class TriggerSource(ABC):
     """
     A source of TriggerEvents polled by scheduler.
+
+    Between ticks the daemon sleeps until a wakeup notification or the
+    earliest next_due() of any source. Sources that can only notice work
+    by looking (files, processes, ...) keep needs_polling and are polled
+    every poll_interval seconds (tick_seconds when None); the daemon's
+    --poll-interval overrides it per source name.
     """
 
+    needs_polling: bool = True
+    poll_interval: Optional[float] = None
+
+    @property
+    def name(self) -> str:
+        """
+        Short name used for --poll-interval and in `dctl sources`.
+        """
+        base = type(self).__name__.removesuffix("Source")
+        return re.sub(r"(?<!^)(?=[A-Z])", "_", base).lower()
+
     @abstractmethod
     def poll(self, db: Database) -> List[TriggerEvent]:
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def next_due(self, db: Database) -> Optional[datetime]:
+        """
+        When this source will next have work without being notified (UTC).
+        """
+        return None
\ No newline at end of file
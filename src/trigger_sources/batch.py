@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from .base import TriggerSource
+from ..database import Database
+from ..event_bus_repo import claim_delivery_batch, waiting_delivery_summary
+from ..pending_events_repo import claim_batch, waiting_summary
+from ..runs_repo import is_script_running
+from ..scripts_repo import list_batch_scripts
+from ..triggers.base import TriggerEvent
+
+def _oldest(*isos: Optional[str]) -> Optional[datetime]:
+    found = [datetime.fromisoformat(s) for s in isos if s]
+    return min(found) if found else None
+
+class BatchSource(TriggerSource):
+    """
+    Coalesces waiting pending_events and event-bus deliveries of scripts
+    with a batch setting into one TriggerEvent. A batch fires once
+    max_events are waiting or the oldest has waited max_wait_ms. Nothing is
+    claimed while the script is running, so the next batch keeps growing.
+    """
+
+    def __init__(self, owner: str) -> None:
+        self._owner = owner
+
+    def poll(self, db: Database) -> List[TriggerEvent]:
+        events: List[TriggerEvent] = []
+        now = datetime.now(timezone.utc)
+
+        for script in list_batch_scripts(db):
+            max_events = max(1, int(script.batch_max_events))
+            max_wait = timedelta(milliseconds=int(script.batch_max_wait_ms or 0))
+
+            pending = waiting_summary(db, script.id)
+            deliveries = waiting_delivery_summary(db, script.id)
+            waiting = pending["count"] + deliveries["count"]
+            if waiting == 0:
+                continue
+
+            oldest = _oldest(pending["oldest"], deliveries["oldest"])
+            if waiting < max_events and oldest is not None and now - oldest < max_wait:
+                continue
+            if is_script_running(db, script.id):
+                continue
+
+            claimed = claim_batch(db, script.id, self._owner, max_events)
+            delivered = claim_delivery_batch(db, script.id, self._owner, max_events - len(claimed))
+            if not claimed and not delivered:
+                continue
+
+            batch: List[Dict[str, Any]] = []
+            for row in claimed:
+                payload: Any = None
+                if row.get("payload_json"):
+                    try:
+                        payload = json.loads(row["payload_json"])
+                    except Exception:
+                        payload = {"payload_json": row["payload_json"]}
+                batch.append({"source": "pending", "trigger_id": row["trigger_id"], "payload": payload})
+            for row in delivered:
+                batch.append(
+                    {
+                        "source": "event",
+                        "topic": row["topic"],
+                        "event_id": int(row["event_id"]),
+                        "payload_json": row.get("payload_json"),
+                    }
+                )
+
+            events.append(
+                TriggerEvent(
+                    trigger_id=f"batch:{script.id}",
+                    script_id=script.id,
+                    payload={
+                        "batch": batch,
+                        "_pending_ids": [int(r["id"]) for r in claimed],
+                        "delivery_ids": [int(r["delivery_id"]) for r in delivered],
+                    },
+                )
+            )
+        return events
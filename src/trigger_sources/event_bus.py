@@ -8,6 +8,9 @@ from ..triggers.base import TriggerEvent
 from ..event_bus_repo import claim_ready_deliveries
 
 class EventBusSource(TriggerSource):
+    # publish_event() notifies the daemon.
+    needs_polling = False
+
     def __init__(self, owner: str) -> None:
         self._owner = owner
 
@@ -1,24 +1,80 @@
 from __future__ import annotations
 
+import os
 from datetime import datetime, timezone
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 from .base import TriggerSource
 from ..database import Database
-from ..file_triggers_repo import list_file_triggers
+from ..file_triggers_repo import file_trigger_filter, list_file_triggers
 from ..file_watcher import FileWatcher
+from ..inotify_watcher import InotifyWatcher
+from ..path_filter import PathFilter
 from ..triggers.base import TriggerEvent
 
+BACKENDS = ("auto", "inotify", "poll")
+
+Key = Tuple[str, bool]
+
+def _ancestors(path: str) -> Iterable[str]:
+    parent = os.path.dirname(path)
+    while parent != path:
+        yield parent
+        path, parent = parent, os.path.dirname(parent)
+
+def scan_roots(dirs: Iterable[Key]) -> List[Key]:
+    """
+    The fewest directory scans that cover every (path, recursive) in dirs:
+    anything below a recursive path, or the same path watched both ways,
+    is seen by that one scan.
+    """
+    dirs = set(dirs)
+    recursive = {path for path, rec in dirs if rec}
+    roots = []
+    for path, rec in sorted(dirs):
+        if not rec and path in recursive:
+            continue
+        if any(a in recursive for a in _ancestors(path)):
+            continue
+        roots.append((path, rec))
+    return roots
+
+def _with_ancestors(paths: Iterable[str]) -> Set[str]:
+    found: Set[str] = set()
+    for path in paths:
+        found.add(path)
+        for a in _ancestors(path):
+            if a in found:
+                break
+            found.add(a)
+    return found
+
 class FileWatchSource(TriggerSource):
     """
-    Polls file triggers using the existing FileWatcher.
+    Fires file triggers once their path has been quiet for QUIET_SECONDS
+    after a change, at most every MIN_INTERVAL_SECONDS.
+
+    Changes come from inotify where available ("auto") and from polling
+    with FileWatcher otherwise, or for paths inotify can't watch.
+    Overlapping triggers share one scan (see scan_roots), which reports
+    the directories that changed; each trigger then checks whether one of
+    them is its own, so the cost follows distinct paths, not triggers.
+    Triggers only share scans with triggers that have the same
+    include/exclude globs.
     """
 
     QUIET_SECONDS = 3
     MIN_INTERVAL_SECONDS = 30
 
-    def __init__(self) -> None:
+    def __init__(self, backend: str = "auto") -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown file watch backend: {backend}")
         self._watcher = FileWatcher()
+        self._inotify = InotifyWatcher.create() if backend != "poll" else None
+        if backend == "inotify" and self._inotify is None:
+            raise RuntimeError("inotify is not available on this system")
+        # Bases inotify failed to watch, polled instead.
+        self._polled: Set[Tuple[str, bool, Optional[PathFilter]]] = set()
         self._last_change_seen: Dict[int, datetime] = {}
         self._last_executed_for_change: Dict[int, datetime] = {}
         self._last_exec_time: Dict[int, datetime] = {}
@@ -26,18 +82,44 @@ class FileWatchSource(TriggerSource):
     def poll(self, db: Database) -> List[TriggerEvent]:
         events: List[TriggerEvent] = []
         now = datetime.now(timezone.utc)
+        triggers = list_file_triggers(db)
+        keys = {
+            int(ft["id"]): (os.path.abspath(ft["path"]), bool(ft["recursive"]), file_trigger_filter(ft))
+            for ft in triggers
+        }
+        groups: Dict[Optional[PathFilter], Set[Key]] = {}
+        for path, recursive, path_filter in keys.values():
+            groups.setdefault(path_filter, set()).add((path, recursive))
+
+        roots = []
+        for path_filter, members in groups.items():
+            dirs = {k for k in members if os.path.isdir(k[0])}
+            if path_filter is None or path_filter.position_independent:
+                merged = scan_roots(dirs)
+            else:
+                merged = sorted(dirs)
+            # Files (and paths that don't exist yet) are watched on their own.
+            roots += [(path, recursive, path_filter) for path, recursive in merged + sorted(members - dirs)]
+        self._watcher.retain(roots)
+        if self._inotify is not None:
+            self._inotify.retain(roots)
 
-        for ft in list_file_triggers(db):
+        changed: Dict[Optional[PathFilter], Set[str]] = {}
+        for root in roots:
+            try:
+                changed.setdefault(root[2], set()).update(self._changes(*root))
+            except Exception:
+                continue
+        touched = {path_filter: _with_ancestors(dirs) for path_filter, dirs in changed.items()}
+
+        for ft in triggers:
             ft_id = int(ft["id"])
             script_id = int(ft["script_id"])
             path = ft["path"]
             recursive = bool(ft["recursive"])
 
-            try:
-                changed = self._watcher.scan(path, recursive)
-            except Exception:
-                continue 
-            if changed:
+            key_path, _, path_filter = keys[ft_id]
+            if key_path in (touched if recursive else changed).get(path_filter, ()):
                 self._last_change_seen[ft_id] = now
                 continue
                 
@@ -71,4 +153,14 @@ class FileWatchSource(TriggerSource):
                 )
             ) 
         
-        return events
\ No newline at end of file
+        return events
+
+    def _changes(self, path: str, recursive: bool, path_filter: Optional[PathFilter]) -> Set[str]:
+        key = (path, recursive, path_filter)
+        if self._inotify is not None and key not in self._polled:
+            try:
+                return self._inotify.changes(path, recursive, path_filter)
+            except OSError:
+                # Typically out of inotify watches; this path gets polled.
+                self._polled.add(key)
+        return self._watcher.changes(path, recursive, path_filter)
@@ -9,6 +9,9 @@ from ..triggers.base import TriggerEvent
 from ..pending_events_repo import claim_ready_events
 
 class InternalQueueSource(TriggerSource):
+    # enqueue_event() notifies the daemon.
+    needs_polling = False
+
     def __init__(self, owner: str) -> None:
         self._owner = owner
 
@@ -1,17 +1,23 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional
 
 from .base import TriggerSource
 from ..database import Database
 from ..triggers.base import TriggerEvent
-from ..oneshots_repo import claim_due_one_shots
+from ..oneshots_repo import claim_due_one_shots, next_one_shot_at
 
 def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
 
 class OneShotSource(TriggerSource):
+    # add_one_shot() notifies the daemon; next_due() covers the rest.
+    needs_polling = False
+
+    def next_due(self, db: Database) -> Optional[datetime]:
+        return next_one_shot_at(db)
+
     def poll(self, db: Database) -> List[TriggerEvent]:
         now = _utc_now_iso()
         claimed = claim_due_one_shots(db, now)
@@ -1,21 +1,73 @@
 from __future__ import annotations
 
-from typing import List
+import heapq
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 
 from .base import TriggerSource
 from ..database import Database
-from ..schedules_repo import due_schedules, mark_run
+from ..schedules_repo import (
+    get_schedules,
+    mark_run,
+    prune_schedule_changes,
+    recompute_next_runs,
+    schedule_change_seq,
+    schedule_changes_since,
+    schedule_heap_entries,
+)
 from ..triggers.base import TriggerEvent
 
 class ScheduleSource(TriggerSource):
+    """
+    Keeps (next_run_at_utc, schedule_id) in a min-heap, so a tick only
+    peeks at the top and loads the schedules that are due. The heap is
+    loaded once from the next_run index; after that only schedules named
+    in the schedule_changes log get their next run recomputed and pushed
+    again, and the entries they replace are skipped when popped. Due entries are checked
+    against their row before firing, since the database stays the source
+    of truth.
+    """
+
+    needs_polling = False
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[datetime, int]] = []
+        # The live entry per schedule; anything else in the heap is stale.
+        self._next: Dict[int, datetime] = {}
+        self._seq: Optional[int] = None
+
     def poll(self, db: Database) -> List[TriggerEvent]:
-        events: List[TriggerEvent] = []
+        db.init()
+        if self._seq is None:
+            self._load(db)
+        else:
+            self._apply_changes(db)
+
+        now = datetime.now(timezone.utc)
+        due_ids: list[int] = []
+        while self._heap and self._heap[0][0] <= now:
+            when, schedule_id = heapq.heappop(self._heap)
+            if self._next.get(schedule_id) == when:
+                del self._next[schedule_id]
+                due_ids.append(schedule_id)
+        if not due_ids:
+            return []
 
-        for sched in due_schedules(db):
+        events: List[TriggerEvent] = []
+        for sched in get_schedules(db, due_ids):
             schedule_id = int(sched["id"])
             script_id = int(sched["script_id"])
 
-            mark_run(db, schedule_id)
+            stored = sched["next_run_at_utc"]
+            if stored is None:
+                continue
+            if datetime.fromisoformat(stored) > now:
+                self._push(schedule_id, datetime.fromisoformat(stored))
+                continue
+
+            next_run = mark_run(db, schedule_id, sched)
+            if next_run is not None:
+                self._push(schedule_id, next_run)
 
             events.append(
                 TriggerEvent(
@@ -24,4 +76,39 @@ class ScheduleSource(TriggerSource):
                     payload={"schedule_id": schedule_id},
                 )
             )
-        return events 
\ No newline at end of file
+        return events
+
+    def next_due(self, db: Database) -> Optional[datetime]:
+        while self._heap and self._next.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def _load(self, db: Database) -> None:
+        # Read the log position first, so edits racing the load are replayed.
+        self._seq = schedule_change_seq(db)
+        self._heap = schedule_heap_entries(db)
+        heapq.heapify(self._heap)
+        self._next = {schedule_id: when for when, schedule_id in self._heap}
+        prune_schedule_changes(db, self._seq)
+
+    def _apply_changes(self, db: Database) -> None:
+        seq, changed = schedule_changes_since(db, self._seq)
+        if not changed:
+            return
+        for schedule_id in changed:
+            self._next.pop(schedule_id, None)
+        # An edited interval, cron or tz applies from now on, not only
+        # after the next firing under the old definition.
+        for when, schedule_id in recompute_next_runs(db, changed):
+            self._push(schedule_id, when)
+        self._seq = seq
+        prune_schedule_changes(db, seq)
+
+        if len(self._heap) > 2 * len(self._next) + 64:
+            # Mostly replaced entries by now; drop them.
+            self._heap = [(when, schedule_id) for schedule_id, when in self._next.items()]
+            heapq.heapify(self._heap)
+
+    def _push(self, schedule_id: int, when: datetime) -> None:
+        self._next[schedule_id] = when
+        heapq.heappush(self._heap, (when, schedule_id))
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import os
+import selectors
+import signal
+import socket
+from pathlib import Path
+from typing import Any, Optional
+
+from .database import DEFAULT_DB_PATH
+
+_sender: Optional[socket.socket] = None
+
+def wake_path(db_path: Optional[Path]) -> Path:
+    """
+    The daemon's notification socket lives next to its database.
+    """
+    path = Path(db_path or DEFAULT_DB_PATH)
+    return path.with_name(path.name + ".wake")
+
+def notify_daemon(db: Any) -> None:
+    """
+    Tells a daemon running on this database that there is new work. Fire
+    and forget: without a daemon, or on platforms without AF_UNIX, this
+    does nothing and the daemon finds the work on its next poll.
+    """
+    global _sender
+    if not hasattr(socket, "AF_UNIX"):
+        return
+    try:
+        if _sender is None:
+            _sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            _sender.setblocking(False)
+        _sender.sendto(b"!", str(wake_path(db.path)))
+    except OSError:
+        # No daemon listening, or its queue is full and it is waking anyway.
+        pass
+
+class Waker:
+    """
+    What the daemon blocks on between ticks: a datagram socket that
+    notify_daemon() writes to, plus a socketpair used as the signal wakeup
+    fd and for wake() from the daemon's own threads.
+    """
+
+    def __init__(self, db_path: Optional[Path]) -> None:
+        self._selector = selectors.DefaultSelector()
+        self._recv, self._send = socket.socketpair()
+        self._recv.setblocking(False)
+        self._send.setblocking(False)
+        self._selector.register(self._recv, selectors.EVENT_READ)
+
+        self._old_wakeup_fd: Optional[int] = None
+        try:
+            self._old_wakeup_fd = signal.set_wakeup_fd(self._send.fileno(), warn_on_full_buffer=False)
+        except ValueError:
+            # Not the main thread: signals still work, they just wait for the next wakeup.
+            pass
+
+        self.path = wake_path(db_path)
+        self._sock: Optional[socket.socket] = None
+        if hasattr(socket, "AF_UNIX"):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            try:
+                # The daemon lock guarantees a leftover socket is stale.
+                if self.path.exists():
+                    self.path.unlink()
+                sock.bind(str(self.path))
+                sock.setblocking(False)
+                self._selector.register(sock, selectors.EVENT_READ)
+                self._sock = sock
+            except OSError:
+                # e.g. a path longer than AF_UNIX allows; fall back to polling.
+                sock.close()
+
+    @property
+    def listening(self) -> bool:
+        return self._sock is not None
+
+    def wake(self) -> None:
+        try:
+            self._send.send(b"!")
+        except OSError:
+            pass
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """
+        Blocks until a notification, a signal or the timeout. Returns True
+        if something woke us before the timeout.
+        """
+        ready = self._selector.select(timeout)
+        for key, _ in ready:
+            _drain(key.fileobj)
+        return bool(ready)
+
+    def close(self) -> None:
+        if self._old_wakeup_fd is not None:
+            signal.set_wakeup_fd(self._old_wakeup_fd)
+        self._selector.close()
+        self._recv.close()
+        self._send.close()
+        if self._sock is not None:
+            self._sock.close()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+def _drain(sock: Any) -> None:
+    while True:
+        try:
+            if not sock.recv(4096):
+                return
+        except OSError:
+            return
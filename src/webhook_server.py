@@ -2,14 +2,17 @@ from __future__ import annotations
 
 import json
 import os 
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from urllib.parse import urlparse
 
+from .config_cache import ConfigCache
 from .database import Database
 from .webhooks_repo import get_webhook
 from .scripts_repo import get_script
 from .runs_repo import create_run, finish_run
 from .executor import run_command
+from .output_capture import capture_for
+from .run_output_repo import RunOutputWriter, compression_for
 from .locks import try_acquire, release, owner_id
 
 WEBHOOK_TOKEN = os.environ.get("SCRIPTER_WEBHOOK_TOKEN")
@@ -27,6 +30,7 @@ class WebhookHandler(BaseHTTPRequestHandler):
         self.wfile.write(body)
 
     def do_POST(self):
+        self.db.config_cache.refresh(self.db)
         parsed = urlparse(self.path)
         parts = parsed.path.strip("/").split("/")
 
@@ -49,10 +53,25 @@ class WebhookHandler(BaseHTTPRequestHandler):
                 return self._json(409, {"ok": False, "error": "script is already running"})
             run_id = create_run(self.db, script.id, trigger=f"webhook:{name}")
 
+            output = RunOutputWriter(
+                self.db,
+                run_id,
+                compression=compression_for(script),
+                capture=capture_for(script),
+            )
             try:
-                result = run_command(script.command, working_dir=script.working_dir)
+                try:
+                    result = run_command(
+                        script.command,
+                        working_dir=script.working_dir,
+                        on_stdout=output.stdout,
+                        on_stderr=output.stderr,
+                        capture=False,
+                    )
+                finally:
+                    output.close()
                 status = "success" if result.exit_code == 0 else "failed"
-                finish_run(self.db, run_id, status, result.exit_code, result.stdout, result.stderr)
+                finish_run(self.db, run_id, status, result.exit_code)
                 return self._json(200, {"ok": True, "run_id": run_id, "status": status})
             except Exception as e:
                 finish_run(self.db, run_id, "failed", None, "", f"{type(e).__name__}: {e}")
@@ -64,9 +83,10 @@ class WebhookHandler(BaseHTTPRequestHandler):
 def serve(db_path, host: str, port: int):
     db = Database(db_path)
     db.init()
+    db.config_cache = ConfigCache()
 
     WebhookHandler.db = db
     WebhookHandler
-    server = HTTPServer((host, port), WebhookHandler)
+    server = ThreadingHTTPServer((host, port), WebhookHandler)
     print(f"Webhook server listening on http://{host}:{port}")
     server.serve_forever()
\ No newline at end of file
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 from typing import Optional
+from .config_cache import cached
 from .database import Database
 
 def _now_iso() -> str:
@@ -31,16 +32,20 @@ def list_webhooks(db: Database) -> int:
 
 def get_webhook(db: Database, name: str) -> Optional[dict]:
     db.init()
-    rows = db.query(
-        """
-        SELECT w.id, w.name, w.script_id, s.name AS script_name
-        FROM webhooks w
-        JOIN scripts s ON s.id = w.script_id
-        WHERE w.name = ?
-        """,
-        (name,),
-    )
-    return dict(rows[0]) if rows else None 
+
+    def load() -> Optional[dict]:
+        rows = db.query(
+            """
+            SELECT w.id, w.name, w.script_id, s.name AS script_name
+            FROM webhooks w
+            JOIN scripts s ON s.id = w.script_id
+            WHERE w.name = ?
+            """,
+            (name,),
+        )
+        return dict(rows[0]) if rows else None
+
+    return cached(db, ("webhook", name), load)
 
 def remove_webhook(db: Database, name: str) -> int:
     db.init()
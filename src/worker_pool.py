@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import sys
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Deque, Dict, Optional, Set
+
+from .config_cache import ConfigCache
+from .database import Database
+from .event_bus_repo import mark_delivery_processed
+from .executor import DEFAULT_EXECUTOR
+from .pending_events_repo import mark_processed
+from .run_service import StartedRun, submit_event
+from .triggers.base import TriggerEvent
+
+DEFAULT_MAX_WORKERS = 4
+
+class WorkerPool:
+    """
+    Bounded pool that runs TriggerEvents off the scheduler thread.
+
+    Events for the same script never run in parallel: while a script is
+    in flight, further events for it wait in a per-script backlog and are
+    run by the same worker once the current run finishes. All workers
+    share one Database pool, which hands each thread its own connection.
+
+    With the asyncio executor a worker doesn't wait for the child: it
+    returns to the pool while the child runs on the event loop, and the
+    run is finished on a worker thread once the child exits. max_workers
+    then bounds the threads doing database work, not the children.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path],
+        owner: str,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        executor: str = DEFAULT_EXECUTOR,
+        config_cache: Optional[ConfigCache] = None,
+        on_done: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._db = Database(db_path)
+        self._db.config_cache = config_cache
+        # Called whenever a script goes idle, so the daemon can dispatch
+        # what was waiting on it right away.
+        self._on_done = on_done
+        self._owner = owner
+        self._executor = executor
+        self._threads = ThreadPoolExecutor(
+            max_workers=max(1, int(max_workers)),
+            thread_name_prefix="scripter-worker",
+        )
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._inflight: Set[int] = set()
+        self._backlog: Dict[int, Deque[TriggerEvent]] = {}
+
+    def is_busy(self, script_id: int) -> bool:
+        with self._lock:
+            return script_id in self._inflight
+
+    def submit(self, event: TriggerEvent) -> None:
+        with self._lock:
+            if event.script_id in self._inflight:
+                self._backlog.setdefault(event.script_id, deque()).append(event)
+                return
+            self._inflight.add(event.script_id)
+        self._threads.submit(self._run, event)
+
+    def wait_idle(self) -> None:
+        with self._idle:
+            while self._inflight:
+                self._idle.wait()
+
+    def shutdown(self) -> None:
+        self.wait_idle()
+        self._threads.shutdown(wait=True)
+        self._db.close()
+
+    def _run(self, event: TriggerEvent) -> None:
+        while event is not None:
+            started = self._start(self._db, event)
+            if started is not None and not started.future.done():
+                started.future.add_done_callback(
+                    lambda _, started=started: self._threads.submit(self._resume, started)
+                )
+                return
+            if started is not None:
+                self._finish(started)
+            event = self._next_for(event.script_id)
+
+    def _resume(self, started: StartedRun) -> None:
+        self._finish(started)
+        event = self._next_for(started.event.script_id)
+        if event is not None:
+            self._run(event)
+
+    def _next_for(self, script_id: int) -> Optional[TriggerEvent]:
+        with self._lock:
+            backlog = self._backlog.get(script_id)
+            if backlog:
+                return backlog.popleft()
+            self._backlog.pop(script_id, None)
+            self._inflight.discard(script_id)
+            self._idle.notify_all()
+        if self._on_done is not None:
+            self._on_done()
+        return None
+
+    def _start(self, db: Database, event: TriggerEvent) -> Optional[StartedRun]:
+        pending_ids = list(event.payload.get("_pending_ids") or [])
+        delivery_ids = list(event.payload.get("delivery_ids") or [])
+        if event.payload.get("_pending_id") is not None:
+            pending_ids.append(event.payload["_pending_id"])
+        if event.payload.get("delivery_id") is not None:
+            delivery_ids.append(event.payload["delivery_id"])
+
+        def on_finished(status, run_id):
+            for pending_id in pending_ids:
+                mark_processed(db, int(pending_id))
+            for delivery_id in delivery_ids:
+                mark_delivery_processed(db, int(delivery_id))
+
+        try:
+            return submit_event(db, event, self._owner, on_finished=on_finished, executor=self._executor)
+        except Exception:
+            # A failing event must not take the worker (or its backlog) down.
+            _log_failure(event)
+            return None
+
+    def _finish(self, started: StartedRun) -> None:
+        try:
+            started.finish()
+        except Exception:
+            _log_failure(started.event)
+
+def _log_failure(event: TriggerEvent) -> None:
+    print(
+        f"scripter: event {event.trigger_id} for script {event.script_id} failed:",
+        file=sys.stderr,
+    )
+    traceback.print_exc()
@@ -0,0 +1,34 @@
+from pathlib import Path
+
+from src.database import Database
+from src.event_bus_repo import publish_event, subscribe
+from src.pending_events_repo import enqueue_event, pending_stats
+from src.run_output_repo import read_output
+from src.runs_repo import list_runs
+from src.scheduler import run_loop
+from src.scripts_repo import add_script, set_batch
+
+
+def test_waiting_events_are_coalesced_into_one_run(tmp_path: Path):
+    db_path = tmp_path / "test.db"
+    db = Database(db_path)
+    sid = add_script(db, name="fan_in", command="wc -l")
+    set_batch(db, sid, max_events=100, max_wait_ms=0)
+    subscribe(db, topic="files", script_id=sid)
+
+    for i in range(5):
+        enqueue_event(db, trigger_id="manual", script_id=sid, payload={"n": i})
+    for i in range(3):
+        publish_event(db, topic="files", payload_json=f'{{"n": {i}}}')
+
+    run_loop(db_path=db_path, tick_seconds=0, once=True)
+
+    runs = list_runs(db, limit=10)
+    assert len(runs) == 1
+    assert runs[0]["trigger"] == f"batch:{sid}"
+    assert runs[0]["status"] == "success"
+    assert read_output(db, runs[0]["id"], "stdout").strip() == "8"
+
+    assert pending_stats(db, script_id=sid) == {"inflight": 0, "waiting": 0, "processed": 5}
+    left = db.query("SELECT COUNT(*) AS n FROM deliveries WHERE processed_at_utc IS NULL")
+    assert left[0]["n"] == 0
@@ -0,0 +1,52 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# `-X importtime` cumulative budget for `import src.cli`, in microseconds.
+# Measured ~70ms (most of it click) after subcommands became lazy, ~285ms before.
+IMPORT_BUDGET_US = 150_000
+
+HEAVY_MODULES = (
+    "asyncio",
+    "croniter",
+    "dateutil",
+    "http.server",
+    "psutil",
+    "pydantic",
+    "yaml",
+    "zoneinfo",
+    "src.scheduler",
+    "src.webhook_server",
+)
+
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_cli_import_skips_subcommand_dependencies():
+    code = f"import sys, src.cli; print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    assert _python("-c", code).stdout.strip() == "[]"
+
+
+def _import_time_us() -> int:
+    err = _python("-X", "importtime", "-c", "import src.cli").stderr
+    for line in err.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == "src.cli":
+            return int(parts[1])
+    raise AssertionError(f"src.cli missing from importtime output:\n{err}")
+
+
+def test_cli_import_time_within_budget():
+    # Best of three, so a busy machine doesn't fail the build.
+    best = min(_import_time_us() for _ in range(3))
+    assert best < IMPORT_BUDGET_US, f"import src.cli took {best / 1000:.1f}ms"
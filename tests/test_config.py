@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from src import scheduler
+from src.cli import cli
+from src.config import load_settings
+from src.worker_pool import DEFAULT_MAX_WORKERS
+
+
+def test_missing_settings_fall_back_to_defaults(tmp_path: Path):
+    cfg = tmp_path / "scripter.yml"
+    cfg.write_text("settings:\n  executor: asyncio\n")
+
+    settings = load_settings(cfg)
+    assert settings.executor == "asyncio"
+    assert settings.max_workers == DEFAULT_MAX_WORKERS
+    assert settings.group_commit is True
+
+
+@pytest.mark.parametrize("value, expected", [("false", False), ("'false'", False), ("off", False), ("'yes'", True)])
+def test_group_commit_accepts_strings(tmp_path: Path, value, expected):
+    cfg = tmp_path / "scripter.yml"
+    cfg.write_text(f"settings:\n  group_commit: {value}\n")
+
+    assert load_settings(cfg).group_commit is expected
+
+
+def test_bad_settings_are_rejected(tmp_path: Path):
+    cfg = tmp_path / "scripter.yml"
+    cfg.write_text("settings:\n  group_commit: maybe\n")
+    with pytest.raises(ValueError, match="maybe"):
+        load_settings(cfg)
+
+    cfg.write_text("settings:\n  executor: threads\n")
+    with pytest.raises(ValueError, match="threads"):
+        load_settings(cfg)
+
+
+def test_daemon_takes_defaults_from_config(tmp_path: Path, monkeypatch):
+    cfg = tmp_path / "scripter.yml"
+    cfg.write_text(
+        f"settings:\n  db_path: {tmp_path / 'x.db'}\n  max_workers: 7\n  executor: asyncio\n  group_commit: 'false'\n"
+    )
+    calls = []
+    monkeypatch.setattr(scheduler, "run_loop", lambda **kw: calls.append(kw))
+
+    result = CliRunner().invoke(cli, ["daemon", "--once", "--config", str(cfg), "--max-workers", "2"])
+
+    assert result.exit_code == 0, result.output
+    kw = calls[0]
+    assert kw["db_path"] == tmp_path / "x.db"
+    assert (kw["max_workers"], kw["executor"], kw["group_commit"]) == (2, "asyncio", False)
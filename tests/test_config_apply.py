@@ -1,9 +1,15 @@
 from pathlib import Path
+
+import pytest
+import yaml
+from pydantic import ValidationError
+
 from src.database import Database
 from src.config_apply import apply_config
 from src.scripts_repo import list_scripts
 from src.schedules_repo import list_schedules
 
+
 def test_apply_config_creates_script_and_schedule(tmp_path: Path):
     db = Database(tmp_path / "test.db")
 
@@ -30,4 +36,48 @@ schedules:
     schedules = list_schedules(db)
     assert len(schedules) == 1
     assert schedules[0]["script_name"] == "hello"
-    assert schedules[0]["interval_seconds"] == 10
\ No newline at end of file
+    assert schedules[0]["interval_seconds"] == 10
+
+
+def test_apply_config_writes_defaults_for_omitted_settings(tmp_path: Path):
+    db = Database(tmp_path / "test.db")
+
+    cfg = tmp_path / "scripter.yml"
+    cfg.write_text(
+        """
+scripts:
+  - name: tuned
+    command: echo tuned
+    mode: worker
+    batch: {max_events: 10, max_wait_ms: 500}
+    compression: {codec: lzma, level: 9}
+    capture: {head_kb: 1, tail_kb: 2}
+  - name: plain
+    command: echo plain
+"""
+    )
+
+    apply_config(db, cfg)
+
+    tuned, plain = list_scripts(db)
+    assert (tuned.mode, tuned.batch_max_events, tuned.compress_codec, tuned.capture_tail_bytes) == (
+        "worker", 10, "lzma", 2048,
+    )
+    assert (plain.mode, plain.batch_max_events, plain.compress_codec, plain.capture_head_bytes) == (
+        "process", None, None, None,
+    )
+
+
+@pytest.mark.parametrize("entry", [
+    {"mode": "threads"},
+    {"compression": {"codec": "gzip"}},
+    {"compression": {"level": 12}},
+])
+def test_apply_config_rejects_invalid_settings(tmp_path: Path, entry):
+    db = Database(tmp_path / "test.db")
+
+    cfg = tmp_path / "scripter.yml"
+    cfg.write_text(yaml.safe_dump({"scripts": [{"name": "bad", "command": "true", **entry}]}))
+
+    with pytest.raises(ValidationError):
+        apply_config(db, cfg)
@@ -0,0 +1,98 @@
+import os
+import signal
+import threading
+import time
+from pathlib import Path
+
+from src.config_cache import ConfigCache
+from src.database import Database
+from src.file_triggers_repo import add_file_trigger, list_file_triggers
+from src.pending_events_repo import enqueue_event
+from src.runs_repo import list_runs
+from src.scheduler import run_loop
+from src.scripts_repo import add_script, get_script, set_mode
+from src.trigger_sources.base import TriggerSource
+
+
+def test_cache_serves_hits_until_another_connection_edits(tmp_path: Path):
+    db = Database(tmp_path / "test.db")
+    sid = add_script(db, name="a", command="echo a")
+    cache = ConfigCache()
+    db.config_cache = cache
+    cache.refresh(db)
+
+    assert get_script(db, sid).mode == "process"
+    assert get_script(db, sid).mode == "process"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Nothing changed: refresh keeps the entries.
+    assert cache.refresh(db) is False
+
+    cli = Database(tmp_path / "test.db")
+    set_mode(cli, sid, "worker")
+    assert cache.refresh(db) is True
+    assert get_script(db, sid).mode == "worker"
+
+
+def test_writes_to_other_tables_do_not_invalidate(tmp_path: Path):
+    db = Database(tmp_path / "test.db")
+    sid = add_script(db, name="a", command="echo a")
+    cache = ConfigCache()
+    db.config_cache = cache
+    cache.refresh(db)
+    get_script(db, sid)
+
+    other = Database(tmp_path / "test.db")
+    enqueue_event(other, trigger_id="manual", script_id=sid)
+    assert cache.refresh(db) is False
+    assert cache.stats()["entries"] == 1
+
+
+def test_daemon_runs_with_cache(tmp_path: Path):
+    db_path = tmp_path / "test.db"
+    db = Database(db_path)
+    sid = add_script(db, name="a", command="echo a")
+    enqueue_event(db, trigger_id="manual", script_id=sid)
+
+    cache = ConfigCache()
+    run_loop(db_path=db_path, tick_seconds=0, once=True, config_cache=cache)
+
+    assert [r["status"] for r in list_runs(db, limit=10)] == ["success"]
+    assert cache.misses > 0
+
+
+class _TriggerWatcher(TriggerSource):
+    # Polled on a poller thread; stops the daemon once it sees a trigger.
+    poll_interval = 0.1
+
+    def __init__(self):
+        self.polls = 0
+        self.seen_at = None
+
+    def poll(self, db):
+        self.polls += 1
+        if self.seen_at is None and list_file_triggers(db):
+            self.seen_at = time.monotonic()
+        if self.seen_at is not None or self.polls > 50:
+            os.kill(os.getpid(), signal.SIGTERM)
+        return []
+
+
+def test_threaded_pollers_see_edits_while_the_loop_is_idle(tmp_path: Path):
+    db_path = tmp_path / "test.db"
+    sid = add_script(Database(db_path), name="a", command="echo a")
+    source = _TriggerWatcher()
+    edited = []
+
+    def edit():
+        # A CLI edit: no notify_daemon, so the daemon thread stays asleep.
+        add_file_trigger(Database(db_path), sid, str(tmp_path))
+        edited.append(time.monotonic())
+
+    timer = threading.Timer(0.3, edit)
+    timer.start()
+    run_loop(db_path=db_path, tick_seconds=1, sources=[source], config_cache=ConfigCache())
+    timer.join()
+
+    assert source.seen_at is not None
+    assert source.seen_at - edited[0] < 1.0
@@ -26,3 +26,35 @@ def test_export_config_writes_yaml(tmp_path: Path):
     assert "schedules" in data and len(data["schedules"]) >= 1
     assert "file_triggers" in data and len(data["file_triggers"]) == 1
     assert "webhooks" in data and len(data["webhooks"]) == 1
+
+
+
+def test_file_trigger_globs_round_trip(tmp_path: Path):
+    from src.config_apply import apply_config
+    from src.file_triggers_repo import globs, list_file_triggers
+
+    cfg = tmp_path / "in.yml"
+    cfg.write_text(
+        """
+scripts:
+  - name: build
+    command: make
+file_triggers:
+  - script: build
+    path: src
+    recursive: true
+    include: "*.c"
+    exclude: [build, .git]
+"""
+    )
+    db = Database(tmp_path / "t.db")
+    apply_config(db, cfg)
+    [ft] = list_file_triggers(db)
+    assert globs(ft["include_globs"]) == ["*.c"]
+    assert globs(ft["exclude_globs"]) == ["build", ".git"]
+
+    out = tmp_path / "out.yml"
+    export_config(db, out)
+    [entry] = yaml.safe_load(out.read_text())["file_triggers"]
+    assert entry["include"] == ["*.c"]
+    assert entry["exclude"] == ["build", ".git"]
@@ -0,0 +1,115 @@
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+
+from src import database
+from src.database import SCHEMA_VERSION, Database
+from src.scripts_repo import add_script, list_scripts
+
+
+def test_transaction_commits_once_at_the_end(tmp_path: Path):
+    db = Database(tmp_path / "test.db")
+    db.init()
+    other = Database(tmp_path / "test.db")
+
+    with db.transaction():
+        add_script(db, name="a", command="echo a")
+        with db.transaction():
+            add_script(db, name="b", command="echo b")
+        assert list_scripts(other) == []
+
+    assert [s.name for s in list_scripts(other)] == ["a", "b"]
+
+
+def test_transaction_rolls_back_on_error(tmp_path: Path):
+    db = Database(tmp_path / "test.db")
+    db.init()
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            add_script(db, name="a", command="echo a")
+            raise RuntimeError("boom")
+
+    assert list_scripts(db) == []
+    assert not db.in_transaction
+
+
+def test_init_records_schema_version_and_runs_once(tmp_path: Path):
+    db = Database(tmp_path / "test.db")
+    db.init()
+    conn = db.connect()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+    statements: list[str] = []
+    conn.set_trace_callback(statements.append)
+    db.init()
+    add_script(db, name="a", command="echo a")
+    assert not any("CREATE TABLE" in s or "table_info" in s for s in statements)
+
+
+def test_migrate_only_runs_newer_steps(tmp_path: Path, monkeypatch):
+    db = Database(tmp_path / "test.db")
+    db.init()
+    db.close()
+
+    applied: list[int] = []
+    monkeypatch.setattr(database, "MIGRATIONS", database.MIGRATIONS + [lambda conn: applied.append(1)])
+    monkeypatch.setattr(database, "SCHEMA_VERSION", SCHEMA_VERSION + 1)
+    db.init()
+    db.close()
+    db.init()
+
+    assert applied == [1]
+    assert db.connect().execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION + 1
+
+
+def test_pool_is_shared_between_threads(tmp_path: Path):
+    db = Database(tmp_path / "test.db", max_readers=2)
+    db.init()
+    errors: list[BaseException] = []
+
+    def work(n: int) -> None:
+        try:
+            for i in range(20):
+                add_script(db, name=f"s{n}-{i}", command="true")
+                list_scripts(db)
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert len(list_scripts(db)) == 80
+    db.close()
+
+
+def test_query_uses_read_only_connections(tmp_path: Path):
+    db = Database(tmp_path / "test.db")
+    db.init()
+
+    with pytest.raises(sqlite3.OperationalError):
+        db.query("INSERT INTO locks (key, owner, acquired_at) VALUES ('a', 'me', '') RETURNING key")
+
+    with db.transaction():
+        db.execute("INSERT INTO locks (key, owner, acquired_at) VALUES ('a', 'me', '')")
+        assert len(db.query("SELECT * FROM locks")) == 1
+
+
+def test_readonly_database_reads_but_never_writes(tmp_path: Path):
+    path = tmp_path / "test.db"
+    ro = Database(path, readonly=True)
+    ro.init()
+    assert list_scripts(ro) == []
+
+    add_script(Database(path), name="a", command="echo a")
+    assert [s.name for s in list_scripts(ro)] == ["a"]
+
+    with pytest.raises(sqlite3.OperationalError):
+        add_script(ro, name="b", command="echo b")
+    assert ro.connect().execute("PRAGMA query_only").fetchone()[0] == 1
@@ -1,8 +1,33 @@
-from src.executor import run_command
+import pytest
+
+from src.executor import get_executor, run_command
 
 def test_run_command_echo():
     result = run_command("echo hi")
 
     assert result.exit_code == 0
     assert "hi" in result.stdout.strip()
-    assert result.stderr == ""
\ No newline at end of file
+    assert result.stderr == ""
+
+def test_asyncio_executor_streams_output():
+    chunks = []
+    run = get_executor("asyncio")
+    result = run("echo hi; echo oops >&2; exit 3", on_stdout=chunks.append)
+
+    assert result.exit_code == 3
+    assert result.stdout.strip() == "hi"
+    assert result.stderr.strip() == "oops"
+    assert "".join(chunks) == result.stdout
+
+@pytest.mark.parametrize("executor", ["subprocess", "asyncio"])
+def test_failing_callback_does_not_stop_draining(executor, capsys):
+    def on_stdout(text):
+        raise RuntimeError("boom")
+
+    # Far more than a pipe buffer: the child would block if reading stopped.
+    run = get_executor(executor)
+    result = run("head -c 1000000 /dev/zero | tr '\\0' x", on_stdout=on_stdout, timeout=10)
+
+    assert result.exit_code == 0
+    assert len(result.stdout) == 1000000
+    assert "RuntimeError: boom" in capsys.readouterr().err
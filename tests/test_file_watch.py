@@ -0,0 +1,198 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from src.database import Database
+from src.file_triggers_repo import add_file_trigger
+from src.file_watcher import FileWatcher
+from src.inotify_watcher import InotifyWatcher
+from src.path_filter import make_filter
+from src.scripts_repo import add_script
+from src.trigger_sources.file_watch import FileWatchSource, scan_roots
+
+
+def _watchers():
+    params = [pytest.param(FileWatcher, id="poll")]
+    if InotifyWatcher.create() is not None:
+        params.append(pytest.param(InotifyWatcher.create, id="inotify"))
+    return params
+
+
+def _touch(path: Path, mtime: int) -> None:
+    path.write_text(str(mtime))
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture(params=_watchers())
+def watcher(request):
+    return request.param()
+
+
+def test_baseline_then_changes(watcher, tmp_path: Path):
+    _touch(tmp_path / "a.txt", 1000)
+    assert watcher.scan(str(tmp_path), False) is False
+    assert watcher.scan(str(tmp_path), False) is False
+
+    _touch(tmp_path / "a.txt", 2000)
+    assert watcher.scan(str(tmp_path), False) is True
+    assert watcher.scan(str(tmp_path), False) is False
+
+    (tmp_path / "a.txt").unlink()
+    assert watcher.scan(str(tmp_path), False) is True
+
+
+def test_recursive_sees_new_subdirectories(watcher, tmp_path: Path):
+    assert watcher.scan(str(tmp_path), True) is False
+
+    (tmp_path / "sub" / "deeper").mkdir(parents=True)
+    _touch(tmp_path / "sub" / "deeper" / "b.txt", 1000)
+    assert watcher.scan(str(tmp_path), True) is True
+    assert watcher.scan(str(tmp_path), True) is False
+
+    _touch(tmp_path / "sub" / "deeper" / "b.txt", 2000)
+    assert watcher.scan(str(tmp_path), True) is True
+
+
+def test_non_recursive_ignores_subdirectories(watcher, tmp_path: Path):
+    (tmp_path / "sub").mkdir()
+    assert watcher.scan(str(tmp_path), False) is False
+
+    _touch(tmp_path / "sub" / "b.txt", 1000)
+    assert watcher.scan(str(tmp_path), False) is False
+
+
+def test_missing_path_is_picked_up_later(watcher, tmp_path: Path):
+    base = tmp_path / "later"
+    assert watcher.scan(str(base), True) is False
+
+    base.mkdir()
+    assert watcher.scan(str(base), True) is False
+    _touch(base / "c.txt", 1000)
+    assert watcher.scan(str(base), True) is True
+
+
+def test_inotify_stops_watching_removed_bases(tmp_path: Path):
+    watcher = InotifyWatcher.create()
+    if watcher is None:
+        pytest.skip("inotify not available")
+    watcher.scan(str(tmp_path), True)
+    watcher.retain([])
+    _touch(tmp_path / "a.txt", 1000)
+    # Re-added as a fresh baseline; the earlier write isn't reported.
+    assert watcher.scan(str(tmp_path), True) is False
+
+
+def _age(*dirs: Path) -> None:
+    # Old enough that the directory listings are trusted between scans.
+    for d in dirs:
+        os.utime(d, (1000, 1000))
+
+
+def test_unchanged_directories_are_not_relisted(tmp_path: Path, monkeypatch):
+    (tmp_path / "sub").mkdir()
+    _touch(tmp_path / "sub" / "a.txt", 1000)
+    _age(tmp_path, tmp_path / "sub")
+    watcher = FileWatcher(stat_budget_seconds=None)
+    assert watcher.scan(str(tmp_path), True) is False
+
+    listed = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda p: listed.append(p) or real_scandir(p))
+
+    assert watcher.scan(str(tmp_path), True) is False
+    assert listed == []
+
+    # In-place writes don't touch the directory; the file stat pass sees them.
+    (tmp_path / "sub" / "a.txt").write_text("changed")
+    _age(tmp_path / "sub")
+    assert watcher.scan(str(tmp_path), True) is True
+    assert listed == []
+
+    (tmp_path / "sub" / "b.txt").write_text("new")
+    assert watcher.scan(str(tmp_path), True) is True
+    assert listed == [str(tmp_path / "sub")]
+
+
+def test_stat_budget_covers_the_tree_round_robin(tmp_path: Path):
+    dirs = [tmp_path / name for name in ("a", "b", "c")]
+    for d in dirs:
+        d.mkdir()
+        _touch(d / "f.txt", 1000)
+    _age(tmp_path, *dirs)
+
+    watcher = FileWatcher(stat_budget_seconds=0)
+    assert watcher.scan(str(tmp_path), True) is False
+
+    (dirs[2] / "f.txt").write_text("changed")
+    _age(dirs[2])
+    seen = [watcher.scan(str(tmp_path), True) for _ in range(len(dirs) + 1)]
+    assert seen.count(True) == 1
+
+
+def test_scan_roots_cover_nested_and_duplicate_paths():
+    roots = scan_roots([
+        ("/data", True),
+        ("/data/sub", False),
+        ("/data/sub/deep", True),
+        ("/data2", False),
+        ("/other", False),
+        ("/other", True),
+    ])
+    assert roots == [("/data", True), ("/data2", False), ("/other", True)]
+
+
+@pytest.mark.parametrize("backend", ["poll", "auto"])
+def test_overlapping_triggers_share_one_scan(backend, tmp_path: Path, monkeypatch):
+    db = Database(tmp_path / "test.db")
+    sid = add_script(db, name="a", command="true")
+    tree = tmp_path / "tree"
+    (tree / "sub").mkdir(parents=True)
+    (tree / "other").mkdir()
+    whole = add_file_trigger(db, sid, str(tree), recursive=True)
+    sub = add_file_trigger(db, sid, str(tree / "sub"), recursive=False)
+    also_sub = add_file_trigger(db, sid, str(tree / "sub") + "/", recursive=True)
+    top = add_file_trigger(db, sid, str(tree), recursive=False)
+    other = add_file_trigger(db, sid, str(tree / "other"), recursive=True)
+
+    source = FileWatchSource(backend)
+    monkeypatch.setattr(source, "QUIET_SECONDS", 0)
+    scanned = []
+    real_changes = source._changes
+    monkeypatch.setattr(source, "_changes", lambda p, r, f: scanned.append(p) or real_changes(p, r, f))
+
+    assert source.poll(db) == []
+    assert scanned == [str(tree)]
+
+    (tree / "sub" / "a.txt").write_text("x")
+    assert source.poll(db) == []
+    fired = {e.payload["file_trigger_id"] for e in source.poll(db)}
+    assert fired == {whole, sub, also_sub}
+    assert top not in fired and other not in fired
+
+
+def test_globs_filter_files_and_excluded_directories(watcher, tmp_path: Path):
+    (tmp_path / "node_modules" / "pkg").mkdir(parents=True)
+    (tmp_path / "src").mkdir()
+    path_filter = make_filter(include=["*.py"], exclude=["node_modules", "src/gen"])
+    assert watcher.scan(str(tmp_path), True, path_filter) is False
+
+    _touch(tmp_path / "node_modules" / "pkg" / "x.py", 1000)
+    _touch(tmp_path / "src" / "notes.txt", 1000)
+    (tmp_path / "src" / "gen").mkdir()
+    _touch(tmp_path / "src" / "gen" / "y.py", 1000)
+    assert watcher.scan(str(tmp_path), True, path_filter) is False
+
+    _touch(tmp_path / "src" / "app.py", 1000)
+    assert watcher.scan(str(tmp_path), True, path_filter) is True
+
+
+def test_excluded_directories_are_not_walked(tmp_path: Path, monkeypatch):
+    (tmp_path / ".git" / "objects").mkdir(parents=True)
+    (tmp_path / "src").mkdir()
+    listed = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda p: listed.append(p) or real_scandir(p))
+
+    FileWatcher().scan(str(tmp_path), True, make_filter(exclude=[".git"]))
+    assert sorted(listed) == [str(tmp_path), str(tmp_path / "src")]
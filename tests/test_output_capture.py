@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+from pydantic import ValidationError
+
+from src.cli import cli
+from src.config_models import CaptureConfig
+from src.database import Database
+from src.output_capture import CapturePolicy, HeadTailCapture, RingBuffer
+from src.runs_repo import create_run
+from src.run_output_repo import RunOutputWriter, read_output
+from src.scripts_repo import add_script
+
+
+def test_ring_buffer_keeps_last_bytes():
+    ring = RingBuffer(5)
+    assert ring.write(b"abc") == 0
+    assert ring.getvalue() == b"abc"
+    assert ring.write(b"defg") == 2
+    assert ring.getvalue() == b"cdefg"
+    assert ring.write(b"0123456789") == 10
+    assert ring.getvalue() == b"56789"
+
+
+def test_writer_keeps_head_and_tail(tmp_path: Path):
+    db = Database(tmp_path / "test.db")
+    script_id = add_script(db, name="t", command="echo t")
+    run_id = create_run(db, script_id=script_id)
+
+    writer = RunOutputWriter(db, run_id, capture=CapturePolicy(head_bytes=4, tail_bytes=3))
+    for piece in ["ab", "cdef", "ghij", "kl"]:
+        writer.stdout(piece)
+    writer.close()
+
+    assert read_output(db, run_id, "stdout") == "abcd\n[5 bytes elided]\njkl"
+    assert read_output(db, run_id, "stderr") == ""
+
+
+def test_head_and_tail_are_cut_on_character_boundaries():
+    capture = HeadTailCapture(CapturePolicy(head_bytes=4, tail_bytes=3))
+    # "é" and "€" are 2 and 3 bytes: the head budget ends inside "€",
+    # and the tail ring starts inside the second one.
+    assert capture.feed("ab€é") == "ab"
+    assert capture.feed("€x") == ""
+
+    tail, dropped = capture.finish()
+    assert tail == "x"
+    assert dropped == len("€é€".encode())
+
+
+def test_negative_capture_sizes_are_rejected(tmp_path: Path):
+    db = Database(tmp_path / "test.db")
+    script_id = add_script(db, name="t", command="echo t")
+
+    result = CliRunner().invoke(
+        cli, ["script", "set-capture", "--db", str(tmp_path / "test.db"), "--id", str(script_id), "--head-kb", "-1"]
+    )
+    assert result.exit_code != 0
+    assert "-1" in result.output
+
+    with pytest.raises(ValidationError):
+        CaptureConfig(tail_kb=-4)
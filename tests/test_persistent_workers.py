@@ -0,0 +1,94 @@
+import sys
+import time
+from pathlib import Path
+
+from src.database import Database
+from src.locks import owner_id
+from src.persistent_workers import workers
+from src.run_output_repo import read_output
+from src.run_service import execute_event
+from src.runs_repo import get_run
+from src.scripts_repo import add_script, set_mode
+from src.triggers.base import TriggerEvent
+
+WORKER = '''
+import json, os, sys
+for line in sys.stdin:
+    req = json.loads(line)
+    if req["payload"].get("crash"):
+        sys.exit(3)
+    print("log line", flush=True)
+    ok = not req["payload"].get("fail")
+    print(json.dumps({"id": req["id"], "status": "success" if ok else "failed",
+                      "stdout": "pid=%d" % os.getpid()}), flush=True)
+'''
+
+
+def test_worker_mode_reuses_process_and_records_runs(tmp_path: Path):
+    worker = tmp_path / "worker.py"
+    worker.write_text(WORKER)
+    db = Database(tmp_path / "test.db")
+    sid = add_script(db, name="w", command=f"{sys.executable} {worker}")
+    set_mode(db, sid, "worker")
+
+    statuses = []
+    def run(payload):
+        execute_event(
+            db,
+            TriggerEvent(trigger_id="manual", script_id=sid, payload=payload),
+            owner_id(),
+            on_finished=lambda status, run_id: statuses.append((status, run_id)),
+        )
+
+    try:
+        run({})
+        run({"fail": True})
+        run({"crash": True})
+        run({})
+    finally:
+        workers.shutdown()
+
+    assert [s for s, _ in statuses] == ["success", "failed", "failed", "success"]
+    outs = [read_output(db, run_id, "stdout") for _, run_id in statuses]
+    assert outs[0].startswith("log line\npid=")
+    assert outs[0] == outs[1]
+    assert "worker exited" in read_output(db, statuses[2][1], "stderr")
+    assert outs[3] != outs[0]
+    assert get_run(db, statuses[0][1])["trigger"] == "manual"
+
+
+NOISY_WORKER = '''
+import json, sys
+for line in sys.stdin:
+    req = json.loads(line)
+    print("log line", flush=True)
+    print(json.dumps({"id": req["id"], "status": "success"}), flush=True)
+    print("after the response", flush=True)
+    sys.stdout.buffer.write(b"bad byte \\xff\\n")
+    sys.stdout.flush()
+'''
+
+
+def test_worker_output_between_requests_is_dropped(tmp_path: Path):
+    worker = tmp_path / "worker.py"
+    worker.write_text(NOISY_WORKER)
+    db = Database(tmp_path / "test.db")
+    sid = add_script(db, name="w", command=f"{sys.executable} {worker}")
+    set_mode(db, sid, "worker")
+
+    statuses = []
+    try:
+        for _ in range(3):
+            execute_event(
+                db,
+                TriggerEvent(trigger_id="manual", script_id=sid),
+                owner_id(),
+                on_finished=lambda status, run_id: statuses.append((status, run_id)),
+            )
+            time.sleep(0.1)
+    finally:
+        workers.shutdown()
+
+    # The invalid byte didn't take the reader down: later requests answer.
+    assert [s for s, _ in statuses] == ["success"] * 3
+    assert [read_output(db, run_id, "stdout") for _, run_id in statuses] == ["log line\n"] * 3
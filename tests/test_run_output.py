@@ -0,0 +1,165 @@
+import threading
+import time
+from pathlib import Path
+
+from src import run_output_repo
+from src.database import Database
+from src.executor import get_executor
+from src.scripts_repo import add_script
+from src.runs_repo import create_run, finish_run
+from src.run_output_repo import (
+    Compression,
+    RunOutputWriter,
+    append_chunk,
+    chunks_after,
+    iter_output,
+    output_stats,
+    read_output,
+)
+
+
+def test_writer_streams_output_into_chunks(tmp_path: Path):
+    db = Database(tmp_path / "test.db")
+    script_id = add_script(db, name="t", command="echo t")
+    run_id = create_run(db, script_id=script_id)
+
+    writer = RunOutputWriter(db, run_id, chunk_chars=4)
+    for line in ["one\n", "two\n", "three\n"]:
+        writer.stdout(line)
+    writer.stderr("warn\n")
+    writer.close()
+    finish_run(db, run_id, "success", 0)
+
+    assert list(iter_output(db, run_id, "stdout")) == ["one\n", "two\n", "three\n"]
+    assert read_output(db, run_id, "stdout", limit=6) == "one\ntw"
+    assert read_output(db, run_id, "stderr") == "warn\n"
+
+
+def test_quiet_output_is_stored_before_close(tmp_path: Path):
+    db = Database(tmp_path / "test.db")
+    script_id = add_script(db, name="t", command="echo t")
+    run_id = create_run(db, script_id=script_id)
+
+    writer = RunOutputWriter(db, run_id, flush_interval=0.05)
+    writer.stdout("one\n")
+    deadline = time.monotonic() + 2
+    while read_output(db, run_id, "stdout") == "" and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert read_output(db, run_id, "stdout") == "one\n"
+    writer.close()
+    assert read_output(db, run_id, "stdout") == "one\n"
+
+
+def test_asyncio_output_is_not_stored_on_the_event_loop(tmp_path: Path, monkeypatch):
+    db = Database(tmp_path / "test.db")
+    script_id = add_script(db, name="t", command="echo t")
+    run_id = create_run(db, script_id=script_id)
+
+    threads = set()
+    real_append = run_output_repo.append_chunk
+
+    def append(*args, **kwargs):
+        threads.add(threading.current_thread().name)
+        real_append(*args, **kwargs)
+
+    monkeypatch.setattr(run_output_repo, "append_chunk", append)
+    writer = RunOutputWriter(db, run_id, chunk_chars=1024)
+    get_executor("asyncio")(
+        "head -c 100000 /dev/zero | tr '\\0' x", on_stdout=writer.stdout, capture=False, timeout=10
+    )
+    writer.close()
+
+    assert threads and "scripter-asyncio" not in threads
+    assert read_output(db, run_id, "stdout") == "x" * 100000
+
+
+def test_buffered_output_stays_bounded_while_storage_is_slow(tmp_path: Path, monkeypatch):
+    db = Database(tmp_path / "test.db")
+    script_id = add_script(db, name="t", command="echo t")
+    run_id = create_run(db, script_id=script_id)
+
+    writer = RunOutputWriter(db, run_id, chunk_chars=1000)
+    peak = {"pending": 0, "buffered": 0}
+    real_append = run_output_repo.append_chunk
+
+    def slow_append(*args, **kwargs):
+        peak["pending"] = max(peak["pending"], len(writer._pending))
+        peak["buffered"] = max(peak["buffered"], sum(writer._size.values()))
+        time.sleep(0.002)
+        real_append(*args, **kwargs)
+
+    monkeypatch.setattr(run_output_repo, "append_chunk", slow_append)
+
+    def produce(stream):
+        for _ in range(200):
+            writer.write(stream, "x" * 500)
+
+    producers = [threading.Thread(target=produce, args=(s,)) for s in ("stdout", "stderr")]
+    for t in producers:
+        t.start()
+    for t in producers:
+        t.join()
+    writer.close()
+
+    # 100 chunks per stream went through; at most one per stream waited.
+    assert peak["pending"] <= 2
+    assert peak["buffered"] <= 2 * 1000
+    assert len(read_output(db, run_id, "stdout")) == 200 * 500
+
+
+def test_chunks_after_resumes_from_offset(tmp_path: Path):
+    db = Database(tmp_path / "test.db")
+    script_id = add_script(db, name="t", command="echo t")
+    run_id = create_run(db, script_id=script_id)
+
+    finish_run(db, run_id, "success", 0, stdout="out", stderr="err")
+
+    first = chunks_after(db, run_id, after_id=0, limit=1)
+    assert [(c["stream"], c["data"]) for c in first] == [("stdout", "out")]
+
+    rest = chunks_after(db, run_id, after_id=int(first[-1]["id"]))
+    assert [(c["stream"], c["data"]) for c in rest] == [("stderr", "err")]
+
+
+def test_output_is_compressed_and_read_back(tmp_path: Path):
+    db = Database(tmp_path / "test.db")
+    script_id = add_script(db, name="t", command="echo t")
+    run_id = create_run(db, script_id=script_id)
+
+    text = "the same log line again\n" * 2000
+    append_chunk(db, run_id, "stdout", text, Compression(codec="lzma", level=6, min_bytes=16))
+    append_chunk(db, run_id, "stderr", "tiny", Compression(codec="zlib", level=6, min_bytes=16))
+
+    assert read_output(db, run_id, "stdout") == text
+    assert read_output(db, run_id, "stderr") == "tiny"
+
+    codecs = {r["stream"]: r["codec"] for r in db.query("SELECT stream, codec FROM run_output_chunks")}
+    assert codecs == {"stdout": "lzma", "stderr": None}
+
+    stats = output_stats(db, run_id=run_id)
+    assert stats["raw_bytes"] == len(text) + 4
+    assert stats["stored_bytes"] < stats["raw_bytes"] // 10
+
+
+def test_migrate_moves_legacy_output_out_of_runs(tmp_path: Path):
+    db = Database(tmp_path / "test.db")
+    script_id = add_script(db, name="t", command="echo t")
+    conn = db.connect()
+    conn.execute("ALTER TABLE runs ADD COLUMN stdout TEXT")
+    conn.execute("ALTER TABLE runs ADD COLUMN stderr TEXT")
+    conn.execute(
+        "INSERT INTO runs (script_id, status, stdout, stderr) VALUES (?, 'success', 'old out', '')",
+        (script_id,),
+    )
+    # Databases with inline output predate versioned migrations.
+    conn.execute("PRAGMA user_version = 0")
+    conn.commit()
+    db.close()
+
+    db.init()
+
+    cols = [r["name"] for r in db.query("PRAGMA table_info(runs)")]
+    assert "stdout" not in cols and "stderr" not in cols
+    assert read_output(db, 1, "stdout") == "old out"
+    assert read_output(db, 1, "stderr") == ""
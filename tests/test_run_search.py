@@ -0,0 +1,61 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src import run_output_repo
+from src.database import Database
+from src.scripts_repo import add_script
+from src.runs_repo import create_run, finish_run
+from src.run_output_repo import RunOutputWriter, append_chunk, read_output
+from src.run_search_repo import enable_search_index, search_runs
+
+
+def test_search_finds_runs_by_output(tmp_path: Path):
+    db = Database(tmp_path / "test.db")
+    a = add_script(db, name="a", command="echo a")
+    b = add_script(db, name="b", command="echo b")
+
+    old = create_run(db, script_id=a)
+    finish_run(db, old, "failed", 1, stderr="ERROR: disk quota exceeded on /data")
+
+    assert enable_search_index(db) == 1
+
+    new = create_run(db, script_id=b)
+    finish_run(db, new, "success", 0, stdout="all good\n" * 100 + "quota at 80%")
+    other = create_run(db, script_id=b)
+    finish_run(db, other, "success", 0, stdout="nothing to see")
+
+    hits = search_runs(db, "quota")
+    assert [h["run_id"] for h in hits] == [new, old]
+    assert "disk quota exceeded" in hits[1]["snippet"]
+    assert hits[1]["stream"] == "stderr"
+
+    assert [h["run_id"] for h in search_runs(db, "quota", script_id=a)] == [old]
+    assert search_runs(db, "quota", since_iso="2999-01-01T00:00:00+00:00") == []
+
+
+def test_writer_checks_for_the_index_once_and_indexes_atomically(tmp_path: Path, monkeypatch):
+    db = Database(tmp_path / "test.db")
+    s = add_script(db, name="s", command="echo s")
+    enable_search_index(db)
+
+    checks = []
+    real_enabled = run_output_repo.search_index_enabled
+    monkeypatch.setattr(run_output_repo, "search_index_enabled", lambda d: checks.append(1) or real_enabled(d))
+
+    run_id = create_run(db, script_id=s)
+    writer = RunOutputWriter(db, run_id, chunk_chars=4)
+    for line in ["alpha\n", "beta\n", "gamma\n"]:
+        writer.stdout(line)
+    writer.close()
+    assert len(checks) == 1
+    assert [h["run_id"] for h in search_runs(db, "gamma")] == [run_id]
+
+    def broken(*args):
+        raise sqlite3.OperationalError("index is broken")
+
+    monkeypatch.setattr(run_output_repo, "index_chunk", broken)
+    with pytest.raises(sqlite3.OperationalError):
+        append_chunk(db, run_id, "stdout", "delta\n")
+    assert read_output(db, run_id, "stdout") == "alpha\nbeta\ngamma\n"
@@ -1,6 +1,15 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
 from src.database import Database
 from src.scripts_repo import add_script
-from src.schedules_repo import add_schedule, due_schedules
+from src.schedules_repo import add_schedule, due_schedules, list_schedules
+from src import schedules_repo
+from src.trigger_sources import schedules
+from src.trigger_sources.schedules import ScheduleSource
+from src.webhooks_repo import add_webhook
+
 
 def test_add_due_schedule(tmp_path):
     db_path = tmp_path / "test.db"
@@ -12,4 +21,74 @@ def test_add_due_schedule(tmp_path):
     assert sid > 0
 
     due = due_schedules(db)
-    assert len(due) == 1
\ No newline at end of file
+    assert len(due) == 1
+
+
+def test_schedule_source_fires_due_schedules_once(tmp_path):
+    db = Database(tmp_path / "test.db")
+    script_id = add_script(db, name="test", command="echo test")
+    sid = add_schedule(db, script_id=script_id, interval_seconds=3600)
+
+    source = ScheduleSource()
+    assert [e.trigger_id for e in source.poll(db)] == [f"schedule:{sid}"]
+    assert source.poll(db) == []
+
+    row = list_schedules(db)[0]
+    next_run = datetime.fromisoformat(row["next_run_at_utc"])
+    assert next_run - datetime.fromisoformat(row["last_run"]) == timedelta(hours=1)
+
+    # A schedule added later is picked up without restarting the source.
+    sid2 = add_schedule(db, script_id=script_id, interval_seconds=60)
+    assert [e.trigger_id for e in source.poll(db)] == [f"schedule:{sid2}"]
+
+
+def test_rows_without_next_run_are_filled_in(tmp_path):
+    db = Database(tmp_path / "test.db")
+    script_id = add_script(db, name="test", command="echo test")
+    add_schedule(db, script_id=script_id, interval_seconds=60)
+    db.execute("UPDATE schedules SET next_run_at_utc = NULL")
+
+    assert len(ScheduleSource().poll(db)) == 1
+    assert list_schedules(db)[0]["next_run_at_utc"] is not None
+
+
+def test_only_changed_schedules_are_reloaded(tmp_path, monkeypatch):
+    db = Database(tmp_path / "test.db")
+    script_id = add_script(db, name="test", command="echo test")
+    hourly = add_schedule(db, script_id=script_id, interval_seconds=3600)
+    ran = datetime.now(timezone.utc) - timedelta(minutes=30)
+    db.execute(
+        "UPDATE schedules SET last_run = ?, next_run_at_utc = ?",
+        (ran.isoformat(), (ran + timedelta(hours=1)).isoformat()),
+    )
+
+    source = ScheduleSource()
+    assert source.poll(db) == []
+
+    loaded = []
+    real_get = schedules_repo.get_schedules
+    monkeypatch.setattr(schedules_repo, "get_schedules", lambda d, ids: loaded.append(set(ids)) or real_get(d, ids))
+    monkeypatch.setattr(schedules, "schedule_heap_entries", lambda d: pytest.fail("heap reloaded"))
+
+    # Unrelated config edits don't touch the heap.
+    add_webhook(db, "hook", script_id)
+    assert source.poll(db) == []
+    assert loaded == []
+
+    sid = add_schedule(db, script_id=script_id, interval_seconds=60)
+    assert [e.trigger_id for e in source.poll(db)] == [f"schedule:{sid}"]
+    assert loaded == [{sid}]
+
+    # A longer interval moves the stored next run without firing.
+    db.execute("UPDATE schedules SET interval_seconds = 7200 WHERE id = ?", (hourly,))
+    assert source.poll(db) == []
+    stored = {r["id"]: r["next_run_at_utc"] for r in list_schedules(db)}
+    assert datetime.fromisoformat(stored[hourly]) == ran + timedelta(hours=2)
+
+    # A shorter one applies right away rather than after the next firing.
+    db.execute("UPDATE schedules SET interval_seconds = 600 WHERE id = ?", (hourly,))
+    assert [e.trigger_id for e in source.poll(db)] == [f"schedule:{hourly}"]
+
+    db.execute("DELETE FROM schedules WHERE id = ?", (sid,))
+    assert source.poll(db) == []
+    assert db.query("SELECT COUNT(*) AS n FROM schedule_changes")[0]["n"] == 0
@@ -1,7 +1,10 @@
+import subprocess
+import sys
 from pathlib import Path
 from src.database import Database
 from src.scripts_repo import add_script, list_scripts, get_script
 
+
 def test_add_list_get_script(tmp_path: Path):
     db_path = tmp_path / "test.db"
     db = Database(db_path)
@@ -15,4 +18,16 @@ def test_add_list_get_script(tmp_path: Path):
 
     s = get_script(db, sid)
     assert s is not None
-    assert s.command == "echo hello"
\ No newline at end of file
+    assert s.command == "echo hello"
+
+
+def test_daemon_imports_do_not_need_pydantic():
+    code = "import sys, src.cli, src.scheduler; print('pydantic' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert out.stdout.strip() == "False"
@@ -0,0 +1,92 @@
+import os
+import signal
+import time
+from pathlib import Path
+
+import pytest
+
+from src.database import Database
+from src.scheduler import run_loop
+from src.source_stats_repo import list_source_stats
+from src.trigger_sources.base import TriggerSource
+
+
+class _Counting(TriggerSource):
+    def __init__(self, poll_interval=None, stop_after=None):
+        self.poll_interval = poll_interval
+        self.stop_after = stop_after
+        self.polls = 0
+
+    def poll(self, db):
+        self.polls += 1
+        if self.polls == self.stop_after:
+            os.kill(os.getpid(), signal.SIGTERM)
+        return []
+
+
+class FastSource(_Counting):
+    pass
+
+
+class SlowSource(_Counting):
+    pass
+
+
+def test_once_records_stats_for_every_source(tmp_path: Path):
+    db_path = tmp_path / "test.db"
+    run_loop(db_path=db_path, tick_seconds=2, once=True, poll_intervals={"file_watch": 30})
+
+    rows = {r["name"]: r for r in list_source_stats(Database(db_path))}
+    assert set(rows) == {
+        "schedule", "one_shot", "event_bus", "app_watch", "internal_queue", "batch", "file_watch",
+    }
+    assert all(r["polls"] >= 1 for r in rows.values())
+    # Polled every tick unless configured otherwise.
+    assert rows["app_watch"]["interval_seconds"] == 2
+    assert rows["file_watch"]["interval_seconds"] == 30
+    assert rows["schedule"]["interval_seconds"] is None
+
+
+def test_unknown_source_name_is_rejected(tmp_path: Path):
+    with pytest.raises(ValueError, match="nope"):
+        run_loop(db_path=tmp_path / "test.db", once=True, poll_intervals={"nope": 1})
+
+
+def test_sources_are_polled_at_their_own_interval(tmp_path: Path):
+    fast = FastSource(poll_interval=0.1, stop_after=5)
+    slow = SlowSource(poll_interval=30)
+    run_loop(db_path=tmp_path / "test.db", tick_seconds=1, sources=[fast, slow])
+
+    # The first pass, then once more on the way out.
+    assert slow.polls == 2
+    assert fast.polls == 6
+
+    rows = {r["name"]: r for r in list_source_stats(Database(tmp_path / "test.db"))}
+    assert rows["fast"]["polls"] == 6
+    assert rows["slow"]["polls"] == 2
+
+
+class SlowScanSource(_Counting):
+    def poll(self, db):
+        time.sleep(1.0)
+        return super().poll(db)
+
+
+class TimerSource(_Counting):
+    needs_polling = False
+
+    def __init__(self, **kw):
+        super().__init__(**kw)
+        self.times = []
+
+    def poll(self, db):
+        self.times.append(time.monotonic())
+        return super().poll(db)
+
+
+def test_slow_source_does_not_delay_timers(tmp_path: Path):
+    slow = SlowScanSource(poll_interval=0.1)
+    timer = TimerSource(poll_interval=0.1, stop_after=5)
+    run_loop(db_path=tmp_path / "test.db", tick_seconds=1, sources=[slow, timer])
+
+    assert timer.times[4] - timer.times[0] < 0.9
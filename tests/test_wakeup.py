@@ -0,0 +1,71 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from src.database import Database
+from src.pending_events_repo import enqueue_event
+from src.runs_repo import list_runs
+from src.scripts_repo import add_script
+from src.wakeup import Waker, notify_daemon
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_notify_wakes_the_waiting_daemon(tmp_path: Path):
+    db = Database(tmp_path / "test.db")
+    waker = Waker(db.path)
+    try:
+        assert waker.listening
+        assert waker.wait(0.01) is False
+
+        notify_daemon(db)
+        started = time.monotonic()
+        assert waker.wait(5) is True
+        assert time.monotonic() - started < 1
+        # Drained: the next wait times out again.
+        assert waker.wait(0.01) is False
+    finally:
+        waker.close()
+    assert not waker.path.exists()
+
+
+def test_notify_without_daemon_is_a_no_op(tmp_path: Path):
+    notify_daemon(Database(tmp_path / "test.db"))
+
+
+def test_daemon_dispatches_without_waiting_for_the_tick(tmp_path: Path):
+    db_path = tmp_path / "test.db"
+    db = Database(db_path)
+    sid = add_script(db, name="a", command="echo a")
+
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "src", "daemon", "--db", str(db_path), "--tick", "60"],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wake = Path(str(db_path) + ".wake")
+        deadline = time.monotonic() + 10
+        while not wake.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        enqueue_event(db, trigger_id="manual", script_id=sid)
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            runs = list_runs(db, limit=1)
+            if runs and runs[0]["status"] == "success":
+                break
+            time.sleep(0.01)
+        assert runs and runs[0]["status"] == "success"
+        assert time.monotonic() - (deadline - 10) < 5
+
+        os.kill(proc.pid, signal.SIGTERM)
+        assert proc.wait(timeout=10) == 0
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
@@ -0,0 +1,81 @@
+import time
+from pathlib import Path
+
+from src.database import Database
+from src.scripts_repo import add_script
+from src.runs_repo import list_runs
+from src.locks import owner_id
+from src.triggers.base import TriggerEvent
+from src import worker_pool
+from src.worker_pool import WorkerPool
+
+
+def test_pool_runs_scripts_in_parallel(tmp_path: Path):
+    db_path = tmp_path / "test.db"
+    db = Database(db_path)
+    a = add_script(db, name="a", command="sleep 0.5")
+    b = add_script(db, name="b", command="sleep 0.5")
+
+    pool = WorkerPool(db_path, owner_id(), max_workers=2)
+    started = time.monotonic()
+    pool.submit(TriggerEvent(trigger_id="manual", script_id=a))
+    pool.submit(TriggerEvent(trigger_id="manual", script_id=b))
+    pool.shutdown()
+    elapsed = time.monotonic() - started
+
+    runs = list_runs(db, limit=10)
+    assert sorted(r["script_id"] for r in runs) == [a, b]
+    assert all(r["status"] == "success" for r in runs)
+    assert elapsed < 0.9
+
+
+def test_pool_serializes_events_for_same_script(tmp_path: Path):
+    db_path = tmp_path / "test.db"
+    db = Database(db_path)
+    s = add_script(db, name="s", command="echo hi")
+
+    pool = WorkerPool(db_path, owner_id(), max_workers=4)
+    for _ in range(3):
+        pool.submit(TriggerEvent(trigger_id="manual", script_id=s))
+    pool.shutdown()
+
+    runs = list_runs(db, limit=10)
+    assert len(runs) == 3
+    assert all(r["status"] == "success" for r in runs)
+
+
+def test_asyncio_children_do_not_hold_a_worker_thread(tmp_path: Path):
+    db_path = tmp_path / "test.db"
+    db = Database(db_path)
+    a = add_script(db, name="a", command="sleep 0.5")
+    b = add_script(db, name="b", command="sleep 0.5")
+
+    pool = WorkerPool(db_path, owner_id(), max_workers=1, executor="asyncio")
+    started = time.monotonic()
+    pool.submit(TriggerEvent(trigger_id="manual", script_id=a))
+    pool.submit(TriggerEvent(trigger_id="manual", script_id=b))
+    pool.shutdown()
+    elapsed = time.monotonic() - started
+
+    runs = list_runs(db, limit=10)
+    assert sorted(r["script_id"] for r in runs) == [a, b]
+    assert all(r["status"] == "success" for r in runs)
+    assert elapsed < 0.9
+
+
+def test_failing_event_is_logged_with_its_script(tmp_path: Path, monkeypatch, capsys):
+    db_path = tmp_path / "test.db"
+    db = Database(db_path)
+    s = add_script(db, name="s", command="echo hi")
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("no such table")
+
+    monkeypatch.setattr(worker_pool, "submit_event", broken)
+    pool = WorkerPool(db_path, owner_id(), max_workers=1)
+    pool.submit(TriggerEvent(trigger_id="manual", script_id=s))
+    pool.shutdown()
+
+    err = capsys.readouterr().err
+    assert f"event manual for script {s} failed" in err
+    assert "RuntimeError: no such table" in err
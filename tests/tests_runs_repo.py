@@ -2,6 +2,7 @@ from pathlib import Path
 from src.database import Database
 from src.scripts_repo import add_script
 from src.runs_repo import create_run, finish_run
+from src.run_output_repo import read_output
 
 def test_create_and_finish_run(tmp_path: Path):
     db_path = tmp_path / "test.db"
@@ -28,6 +29,6 @@ def test_create_and_finish_run(tmp_path: Path):
 
     assert row["status"] == "success"
     assert row["exit_code"] == 0
-    assert row["stdout"] == "hello"
-    assert row["stderr"] == ""
+    assert read_output(db, run_id, "stdout") == "hello"
+    assert read_output(db, run_id, "stderr") == ""
     assert row["finished_at"] is not None
\ No newline at end of file